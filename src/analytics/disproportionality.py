@@ -0,0 +1,191 @@
+"""
+Drug-reaction disproportionality (PRR and ROR with confidence intervals) over the SQLite schema.
+
+patient_drug_history and reaction are read once into binary report x drug and report x reaction
+sparse matrices. A single product of the two gives the number of reports for every
+(drug, reaction) pair, and the 2x2 tables and statistics of all pairs are computed as arrays.
+
+    a = reports with the drug and the reaction    b = with the drug, without the reaction
+    c = without the drug, with the reaction       d = with neither
+
+The report universe is every report with at least one (suspect, with suspect_only) drug and one
+coded reaction, received in [start, end) when a window is given. Drugs are counted per drug_id.
+"""
+
+import argparse
+import csv
+import sqlite3
+import sys
+from collections import namedtuple
+from statistics import NormalDist
+
+import numpy as np
+
+try:
+    from scipy import sparse
+except ImportError:
+    sparse = None
+
+# drugs: reports x drugs, reactions: reports x reactions (binary CSR, same report rows);
+# drug_ids / reaction_terms label their columns
+Matrices = namedtuple("Matrices", "drugs reactions drug_ids reaction_terms")
+
+STATISTICS = ("prr", "prr_lower", "prr_upper", "ror", "ror_lower", "ror_upper", "chi2")
+COLUMNS = ("drug_id", "medicinalproduct", "reactionmeddrapt", "a", "b", "c", "d") + STATISTICS
+
+
+def require_scipy():
+    if sparse is None:
+        raise ImportError("The disproportionality engine needs scipy (pip install scipy)")
+
+
+def _window(alias, start, end):
+    """JOIN and WHERE conditions keeping the rows of reports received in [start, end)."""
+    conditions, params = [], []
+    if start:
+        conditions.append("r.receivedate >= ?")
+        params.append(start)
+    if end:
+        conditions.append("r.receivedate < ?")
+        params.append(end)
+    join = f" JOIN report r ON r.safetyreportid = {alias}.safetyreportid" if conditions else ""
+    return join, conditions, params
+
+
+def _pairs(conn, sql, params, code=None):
+    rows = conn.execute(sql, params)
+    if code is not None:
+        rows = ((rid, code(value)) for rid, value in rows)
+    return np.fromiter(rows, dtype=[("report", np.int64), ("item", np.int64)])
+
+
+def _binary_matrix(rows, columns, shape):
+    matrix = sparse.csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, columns)), shape=shape)
+    matrix.sum_duplicates()
+    matrix.data[:] = 1  # a drug listed twice in one report still counts once
+    return matrix
+
+
+def load_matrices(conn, suspect_only=False, start=None, end=None):
+    """Reads the (report, drug_id) and (report, reaction term) pairs into integer-coded sparse
+    matrices. suspect_only keeps drugcharacterization = 1; start/end are receivedates (YYYY-MM-DD)."""
+    require_scipy()
+    join, conditions, params = _window("pdh", start, end)
+    conditions = ["pdh.drug_id IS NOT NULL"] + conditions
+    if suspect_only:
+        conditions.append("pdh.drugcharacterization = 1")
+    drugs = _pairs(conn, f"SELECT pdh.safetyreportid, pdh.drug_id FROM patient_drug_history pdh{join}"
+                         f" WHERE {' AND '.join(conditions)}", params)
+
+    join, conditions, params = _window("rx", start, end)
+    conditions = ["rx.reactionmeddrapt IS NOT NULL"] + conditions
+    terms = {}
+    reactions = _pairs(conn, f"SELECT rx.safetyreportid, rx.reactionmeddrapt FROM reaction rx{join}"
+                             f" WHERE {' AND '.join(conditions)}", params,
+                       code=lambda term: terms.setdefault(term, len(terms)))
+
+    reports = np.intersect1d(drugs["report"], reactions["report"])
+    drugs = drugs[np.isin(drugs["report"], reports)]
+    reactions = reactions[np.isin(reactions["report"], reports)]
+    drug_ids, drug_columns = np.unique(drugs["item"], return_inverse=True)
+    term_codes, reaction_columns = np.unique(reactions["item"], return_inverse=True)
+    reaction_terms = np.array(list(terms), dtype=object)[term_codes]
+    return Matrices(
+        _binary_matrix(np.searchsorted(reports, drugs["report"]), drug_columns, (len(reports), len(drug_ids))),
+        _binary_matrix(np.searchsorted(reports, reactions["report"]), reaction_columns,
+                       (len(reports), len(reaction_terms))),
+        drug_ids, reaction_terms)
+
+
+def pair_counts(matrices):
+    """(drug column, reaction column, reports) for every pair reported together at least once."""
+    counts = (matrices.drugs.T @ matrices.reactions).tocoo()
+    return counts.row, counts.col, counts.data.astype(np.int64)
+
+
+def signal_statistics(a, b, c, d, confidence=0.95):
+    """PRR and ROR with their `confidence` intervals (log-normal approximation) and the
+    Yates-corrected chi-square of each 2x2 table. Zero cells give inf or nan."""
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    a, b, c, d = (np.asarray(x, dtype=np.float64) for x in (a, b, c, d))
+    n = a + b + c + d
+    with np.errstate(divide="ignore", invalid="ignore"):
+        prr = (a / (a + b)) / (c / (c + d))
+        prr_se = np.sqrt(1 / a - 1 / (a + b) + 1 / c - 1 / (c + d))
+        ror = (a * d) / (b * c)
+        ror_se = np.sqrt(1 / a + 1 / b + 1 / c + 1 / d)
+        chi2 = (n * np.maximum(np.abs(a * d - b * c) - n / 2, 0) ** 2
+                / ((a + b) * (c + d) * (a + c) * (b + d)))
+        return {
+            "prr": prr, "prr_lower": prr * np.exp(-z * prr_se), "prr_upper": prr * np.exp(z * prr_se),
+            "ror": ror, "ror_lower": ror * np.exp(-z * ror_se), "ror_upper": ror * np.exp(z * ror_se),
+            "chi2": chi2,
+        }
+
+
+def disproportionality(conn, suspect_only=False, start=None, end=None, min_count=3, confidence=0.95):
+    """Statistics for every (drug, reaction) pair reported together in at least `min_count`
+    reports, as a dict of equal-length arrays keyed by COLUMNS (pandas.DataFrame(result) makes
+    it a table)."""
+    matrices = load_matrices(conn, suspect_only, start, end)
+    n = matrices.drugs.shape[0]
+    drug_totals = np.asarray(matrices.drugs.sum(axis=0), dtype=np.int64).ravel()
+    reaction_totals = np.asarray(matrices.reactions.sum(axis=0), dtype=np.int64).ravel()
+    drug_columns, reaction_columns, a = pair_counts(matrices)
+    keep = a >= min_count
+    drug_columns, reaction_columns, a = drug_columns[keep], reaction_columns[keep], a[keep]
+    b = drug_totals[drug_columns] - a
+    c = reaction_totals[reaction_columns] - a
+    d = n - a - b - c
+    names = dict(conn.execute("SELECT drug_id, medicinalproduct FROM drug_catalog"))
+    drug_names = np.array([names.get(int(drug_id)) for drug_id in matrices.drug_ids], dtype=object)
+    result = {
+        "drug_id": matrices.drug_ids[drug_columns],
+        "medicinalproduct": drug_names[drug_columns],
+        "reactionmeddrapt": matrices.reaction_terms[reaction_columns],
+        "a": a, "b": b, "c": c, "d": d,
+    }
+    result.update(signal_statistics(a, b, c, d, confidence))
+    return result
+
+
+def ranked(result, by="prr"):
+    """Row indexes of `result` sorted by one statistic, highest first (nan last)."""
+    return np.argsort(-np.nan_to_num(result[by], nan=-np.inf), kind="stable")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default="sql/openfda_final_v10.db")
+    parser.add_argument("--suspect_only", action="store_true", help="Only count drugs with drugcharacterization = 1")
+    parser.add_argument("--start", default=None, help="First receivedate included (YYYY-MM-DD)")
+    parser.add_argument("--end", default=None, help="First receivedate excluded (YYYY-MM-DD)")
+    parser.add_argument("--min_count", type=int, default=3, help="Minimum reports per (drug, reaction) pair")
+    parser.add_argument("--confidence", type=float, default=0.95, help="Confidence level of the intervals")
+    parser.add_argument("--sort", choices=["prr", "ror", "chi2", "a"], default="prr")
+    parser.add_argument("--top", type=int, default=50, help="Pairs printed")
+    parser.add_argument("--csv", default=None, help="Write every pair (sorted) to this CSV file")
+    args = parser.parse_args()
+
+    try:
+        require_scipy()
+    except ImportError as e:
+        sys.exit(str(e))
+    conn = sqlite3.connect(args.db)
+    result = disproportionality(conn, args.suspect_only, args.start, args.end, args.min_count, args.confidence)
+    conn.close()
+    order = ranked(result, args.sort)
+    print(f"{len(order)} pairs with at least {args.min_count} reports")
+    print("\t".join(("medicinalproduct", "reactionmeddrapt", "a", "prr", "prr_ci", "ror", "ror_ci", "chi2")))
+    for i in order[:args.top]:
+        print(f"{result['medicinalproduct'][i]}\t{result['reactionmeddrapt'][i]}\t{result['a'][i]}\t"
+              f"{result['prr'][i]:.2f}\t[{result['prr_lower'][i]:.2f}, {result['prr_upper'][i]:.2f}]\t"
+              f"{result['ror'][i]:.2f}\t[{result['ror_lower'][i]:.2f}, {result['ror_upper'][i]:.2f}]\t"
+              f"{result['chi2'][i]:.1f}")
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS)
+            for i in order:
+                writer.writerow([result[column][i] for column in COLUMNS])
+        print(f"Wrote {len(order)} pairs to {args.csv}")
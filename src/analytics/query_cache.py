@@ -0,0 +1,283 @@
+"""
+Result cache for the dashboard queries: SQLite statements, MongoDB pipelines and query functions.
+
+Results are keyed by their source (database file or collection) and its random database id, its
+ingest generation, the normalized query text or pipeline and the parameters. Every loader commit
+that changes data bumps the generation (the ingest_generation table / collection), so results
+computed before a load are never served after it; the id keeps a database rebuilt at the same
+path, whose generation starts over, from hitting the old results. A size-bounded in-memory LRU sits in front of an optional
+on-disk tier of pickled results that survives restarts.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from src.db_sql.ingest_state import read_generation as read_sqlite_generation
+from src.db_sql.queries import SQLITE_QUERIES
+from src.db_mongo.queries import MONGO_QUERIES
+
+try:
+    from src.db_mongo.insert_pipeline_mongo_limited import read_generation as read_mongo_generation
+except ImportError:  # pymongo not installed
+    read_mongo_generation = None
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_MB = 64
+
+# Quoted literals and identifiers are kept verbatim; whitespace elsewhere is collapsed
+SQL_QUOTED = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")""")
+WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)  # dashboards repeat the same statements
+def normalize_sql(sql):
+    parts = SQL_QUOTED.split(sql)
+    text = "".join(part if i % 2 else WHITESPACE.sub(" ", part) for i, part in enumerate(parts))
+    return text.strip().rstrip(";").rstrip()
+
+
+def normalize_document(value):
+    """Canonical text of a pipeline, filter or parameter list. Key order is kept ($sort depends on it)."""
+    return json.dumps(value, separators=(",", ":"), default=repr)
+
+
+def _digest(*parts):
+    return hashlib.sha256("\0".join(str(part) for part in parts).encode()).hexdigest()
+
+
+class QueryCache:
+    """LRU of query results bounded by entry count and by their pickled size, with an optional
+    on-disk tier in `disk_dir`. Entries are stored per (namespace, generation, key); once a
+    newer generation of a namespace is seen, its older entries are dropped from memory and disk."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_mb=DEFAULT_MAX_MB, disk_dir=None):
+        self.max_entries = max_entries
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()  # digest -> (namespace digest, generation, value, size)
+        self._bytes = 0
+        self._generations = {}  # namespace digest -> newest generation seen
+        self._lock = threading.Lock()
+        self.hits = self.disk_hits = self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def get_or_compute(self, namespace, generation, key, compute):
+        """The cached result of `key` at this generation, or compute()'s result (then cached).
+        Cached results are shared between callers; treat them as read-only."""
+        space = _digest(namespace)
+        self._observe(space, generation)
+        digest = _digest(space, generation, key)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                self._entries.move_to_end(digest)
+                self.hits += 1
+                return entry[2]
+        path = self._path(space, generation, digest)
+        if path and os.path.exists(path):
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                value = pickle.loads(data)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                pass  # unreadable or half-written: recompute
+            else:
+                self._remember(digest, space, generation, value, len(data))
+                with self._lock:
+                    self.disk_hits += 1
+                return value
+        value = compute()
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self._remember(digest, space, generation, value, len(data))
+        if path:
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        with self._lock:
+            self.misses += 1
+        return value
+
+    def _path(self, space, generation, digest):
+        if not self.disk_dir:
+            return None
+        return os.path.join(self.disk_dir, f"{space[:16]}.{generation}.{digest[:32]}.pickle")
+
+    def _remember(self, digest, space, generation, value, size):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(digest, None)
+            if old is not None:
+                self._bytes -= old[3]
+            self._entries[digest] = (space, generation, value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[3]
+
+    def _observe(self, space, generation):
+        with self._lock:
+            seen = self._generations.get(space)
+            if seen is not None and generation <= seen:
+                return
+            self._generations[space] = generation
+            if seen is None and not self.disk_dir:
+                return
+            stale = [digest for digest, entry in self._entries.items() if entry[0] == space and entry[1] != generation]
+            for digest in stale:
+                self._bytes -= self._entries.pop(digest)[3]
+        if self.disk_dir:
+            prefix, current = space[:16] + ".", f"{space[:16]}.{generation}."
+            for name in os.listdir(self.disk_dir):
+                if name.startswith(prefix) and not name.startswith(current):
+                    try:
+                        os.remove(os.path.join(self.disk_dir, name))
+                    except OSError:
+                        pass
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._generations.clear()
+        if self.disk_dir:
+            for name in os.listdir(self.disk_dir):
+                if name.endswith(".pickle"):
+                    os.remove(os.path.join(self.disk_dir, name))
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "mb": self._bytes / 1024 / 1024, "hits": self.hits,
+                    "disk_hits": self.disk_hits, "misses": self.misses}
+
+
+class _Generation:
+    """Reads a source's ingest generation, at most once per `check_interval` seconds."""
+
+    def __init__(self, read, check_interval):
+        self.read = read
+        self.check_interval = check_interval
+        self.value = None
+        self.checked = 0.0
+
+    def __call__(self):
+        now = time.monotonic()
+        if self.value is None or now - self.checked >= self.check_interval:
+            self.value = self.read()
+            self.checked = now
+        return self.value
+
+
+class CachedSQLite:
+    """Runs SQLite statements through a QueryCache; results are lists of row tuples.
+
+    The generation is read before every lookup (a few microseconds) unless `check_interval`
+    allows reusing it for that many seconds. `namespace` defaults to the database file path."""
+
+    def __init__(self, conn, cache=None, check_interval=0.0, namespace=None):
+        self.conn = conn
+        self.cache = cache or QueryCache()
+        if namespace is None:
+            path = conn.execute("PRAGMA database_list").fetchone()[2]
+            namespace = "sqlite:" + (os.path.abspath(path) if path else f"memory:{id(conn)}")
+        self.namespace = namespace
+        self.generation = _Generation(lambda: read_sqlite_generation(conn), check_interval)
+
+    def execute(self, sql, params=()):
+        key = normalize_sql(sql) + "\0" + normalize_document(params)
+        database_id, generation = self.generation()
+        return self.cache.get_or_compute(f"{self.namespace}\0{database_id}", generation, key,
+                                         lambda: self.conn.execute(sql, params).fetchall())
+
+    def query(self, qid):
+        """One of the benchmark queries (src/db_sql/queries.py) by id."""
+        return self.execute(SQLITE_QUERIES[qid])
+
+
+class CachedMongo:
+    """Runs aggregation pipelines, count_documents filters and query functions such as
+    MONGO_QUERIES (called with the collection) through a QueryCache.
+
+    `namespace` defaults to the collection's full name; pass one that includes the server when
+    several deployments share a disk cache."""
+
+    def __init__(self, collection, cache=None, check_interval=0.0, namespace=None):
+        if read_mongo_generation is None:
+            raise ImportError("CachedMongo needs pymongo (pip install pymongo)")
+        self.collection = collection
+        self.cache = cache or QueryCache()
+        self.namespace = namespace or "mongo:" + collection.full_name
+        self.generation = _Generation(lambda: read_mongo_generation(collection), check_interval)
+
+    def _cached(self, key, compute):
+        database_id, generation = self.generation()
+        return self.cache.get_or_compute(f"{self.namespace}\0{database_id}", generation, key, compute)
+
+    def aggregate(self, pipeline):
+        return self._cached("aggregate\0" + normalize_document(pipeline),
+                            lambda: list(self.collection.aggregate(pipeline)))
+
+    def count_documents(self, filter):
+        return self._cached("count\0" + normalize_document(filter),
+                            lambda: self.collection.count_documents(filter))
+
+    def call(self, func, *args):
+        """func(collection, *args), keyed by the function's qualified name and the arguments."""
+        key = f"call\0{func.__module__}.{func.__qualname__}\0" + normalize_document(list(args))
+        return self._cached(key, lambda: func(self.collection, *args))
+
+    def query(self, qid):
+        """One of the benchmark queries (src/db_mongo/queries.py) by id."""
+        return self.call(MONGO_QUERIES[qid])
+
+
+def _timed(run):
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--engine", choices=["sqlite", "mongo"], default="sqlite")
+    parser.add_argument("--db", default="sql/openfda_final_v10.db", help="SQLite database")
+    parser.add_argument("--uri", default="mongodb://localhost:27017", help="MongoDB URI")
+    parser.add_argument("--mongo_db", default="openfda_converted", help="MongoDB database name")
+    parser.add_argument("--collection", default="full_reports", help="MongoDB collection name")
+    parser.add_argument("--queries", nargs="*", default=None, help="Subset of query ids, e.g. Q4 Q5 Q7")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per query (the first one fills the cache)")
+    parser.add_argument("--cache_dir", default=None, help="On-disk cache tier (e.g. data/query_cache)")
+    parser.add_argument("--max_entries", type=int, default=DEFAULT_MAX_ENTRIES)
+    parser.add_argument("--max_mb", type=float, default=DEFAULT_MAX_MB, help="In-memory size bound")
+    args = parser.parse_args()
+
+    cache = QueryCache(args.max_entries, args.max_mb, args.cache_dir)
+    if args.engine == "sqlite":
+        conn = sqlite3.connect(args.db)
+        runner = CachedSQLite(conn, cache)
+        qids = args.queries or list(SQLITE_QUERIES)
+    else:
+        from pymongo import MongoClient
+        client = MongoClient(args.uri)
+        runner = CachedMongo(client[args.mongo_db][args.collection], cache)
+        qids = args.queries or list(MONGO_QUERIES)
+    database_id, generation = runner.generation()
+    print(f"generation {generation} (database {database_id})")
+    for qid in qids:
+        times = [_timed(lambda: runner.query(qid)) for _ in range(args.repeat)]
+        repeats = ", ".join(f"{t * 1e6:.0f} us" for t in times[1:])
+        print(f"{qid}\tfirst {times[0] * 1000:.2f} ms\trepeat {repeats}")
+    print(json.dumps(cache.stats()))
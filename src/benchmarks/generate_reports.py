@@ -0,0 +1,552 @@
+"""
+Synthetic openFDA drug-event partitions for load testing (no real data needed):
+- files look like the downloads ({"meta": ..., "results": [...]}, `drug-event-0001-of-0010.json`,
+  optionally .json.gz / .json.zip) and load with both pipelines unchanged
+- field presence follows reports/evaluation_results/value_fields_presence.csv; drug and reaction
+  counts, narrative lengths and drug date formats (102/610/602) follow the distributions in the
+  profile (DEFAULT_PROFILE, overridable with --profile profile.json)
+- drug and reaction names are drawn Zipf-distributed from fixed vocabularies, and each drug name
+  keeps one openFDA block (with occasional variants), so catalog sizes behave like the real data
+- pathological cases: ~25 MB reports over the 16 MB BSON limit, exact duplicates, republished
+  versions, unparseable numbers/dates, near-empty reports, case/whitespace name variants, non-ASCII
+  narratives
+
+Reports are written one at a time, so memory does not grow with --reports; every file has its own
+seed and id range, which makes the output identical for any --workers.
+
+    python src/benchmarks/generate_reports.py --reports 36000 --scale 10 --output data/raw/synthetic
+"""
+
+import argparse
+import bisect
+import datetime
+import gzip
+import json
+import logging
+import math
+import os
+import random
+import sys
+import time
+import zipfile
+from collections import deque
+from multiprocessing import Pool
+
+try:
+    import orjson
+
+    def dumps(obj):
+        return orjson.dumps(obj)
+except ImportError:
+    def dumps(obj):
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+DEFAULT_PROFILE = {
+    "start_id": 10_000_000,
+    "years": [2004, 2024],
+    # {"dist": "fixed", "value"} | {"dist": "uniform", "low", "high"} | {"dist": "geometric", "mean"}
+    # | {"dist": "lognormal", "median", "sigma"}; "min" / "max" clamp any of them
+    "drugs_per_report": {"dist": "lognormal", "median": 4, "sigma": 0.8, "min": 1, "max": 300},
+    "reactions_per_report": {"dist": "lognormal", "median": 2, "sigma": 0.8, "min": 1, "max": 150},
+    "narrative_chars": {"dist": "lognormal", "median": 500, "sigma": 1.0, "min": 20, "max": 30_000},
+    "literature_references": {"dist": "geometric", "mean": 1.2, "min": 1, "max": 10},
+    "date_formats": {"102": 0.75, "610": 0.18, "602": 0.07},
+    "drug_vocabulary": 20_000,
+    "reaction_vocabulary": 5_000,
+    "zipf_exponent": 1.1,
+    "serious_rate": 0.6,
+    "death_rate": 0.12,  # among serious reports
+    "characterization": {"1": 0.45, "2": 0.5, "3": 0.05},  # suspect / concomitant / interacting
+    "case_event_date_rate": 0.5,  # narratives starting with "CASE EVENT DATE: YYYYMMDD"
+    "openfda_variant_rate": 0.02,
+    # Share of reports / drugs / reactions carrying each optional field (value_fields_presence.csv)
+    "presence": {
+        "authoritynumb": 0.105, "companynumb": 0.891, "duplicate": 0.325, "occurcountry": 0.929,
+        "reporttype": 0.999, "primarysource.literaturereference": 0.092, "primarysource.qualification": 0.994,
+        "patient.patientagegroup": 0.339, "patient.patientonsetage": 0.654, "patient.patientsex": 0.86,
+        "patient.patientweight": 0.191, "patient.summary": 0.471,
+        "patient.reaction.reactionoutcome": 0.964,
+        "patient.drug.actiondrug": 0.958, "patient.drug.drugadditional": 0.781,
+        "patient.drug.drugadministrationroute": 0.856, "patient.drug.drugauthorizationnumb": 0.927,
+        "patient.drug.drugbatchnumb": 0.428, "patient.drug.drugcumulativedosagenumb": 0.037,
+        "patient.drug.drugdosageform": 0.796, "patient.drug.drugdosagetext": 0.83,
+        "patient.drug.drugenddate": 0.234, "patient.drug.drugindication": 0.945,
+        "patient.drug.drugintervaldosagedefinition": 0.489, "patient.drug.drugrecurreadministration": 0.129,
+        "patient.drug.drugseparatedosagenumb": 0.509, "patient.drug.drugstartdate": 0.501,
+        "patient.drug.drugstructuredosagenumb": 0.652, "patient.drug.drugtreatmentduration": 0.173,
+        "patient.drug.openfda": 0.991,
+        "patient.drug.openfda.nui": 0.82, "patient.drug.openfda.pharm_class_cs": 0.425,
+        "patient.drug.openfda.pharm_class_epc": 0.816, "patient.drug.openfda.pharm_class_moa": 0.696,
+        "patient.drug.openfda.pharm_class_pe": 0.212, "patient.drug.openfda.route": 0.973,
+        "patient.drug.openfda.rxcui": 0.869, "patient.drug.openfda.substance_name": 0.972,
+    },
+    "pathological": {
+        "oversized_every": 100_000,  # one report per this many is blown up to oversized_mb (0: none)
+        "oversized_mb": 25,
+        "duplicate_rate": 0.001,  # exact copy of a recent report of the same file
+        "republish_rate": 0.002,  # recent report id again with a higher safetyreportversion
+        "malformed_rate": 0.001,  # a number or date field that does not parse
+        "sparse_rate": 0.001,  # ids, dates, mandatory objects and a patient without drugs/reactions
+        "name_variant_rate": 0.01,  # medicinalproduct in lower case / with stray whitespace
+        "unicode_rate": 0.01,  # narrative with non-ASCII text
+    },
+}
+
+KNOWN_DRUGS = ["ASPIRIN", "HUMIRA", "METFORMIN", "IBUPROFEN", "ACETAMINOPHEN", "LISINOPRIL", "ATORVASTATIN",
+               "PREDNISONE", "OMEPRAZOLE", "METHOTREXATE", "ENBREL", "XARELTO", "REVLIMID", "WARFARIN",
+               "GABAPENTIN", "AMLODIPINE", "SIMVASTATIN", "LEVOTHYROXINE", "FUROSEMIDE", "INSULIN GLARGINE"]
+KNOWN_REACTIONS = ["DRUG INEFFECTIVE", "DEATH", "NAUSEA", "FATIGUE", "HEADACHE", "DIARRHOEA", "PAIN",
+                   "DYSPNOEA", "DIZZINESS", "RASH", "VOMITING", "PNEUMONIA", "ARTHRALGIA", "PYREXIA",
+                   "OFF LABEL USE", "MALAISE", "ASTHENIA", "PRURITUS", "HYPERTENSION", "INJECTION SITE PAIN"]
+SYLLABLES = ["al", "bra", "cor", "dex", "en", "fla", "gal", "hex", "ix", "jo", "ka", "lo", "mab", "nor",
+             "ox", "pra", "quin", "ro", "sar", "tin", "ul", "vas", "xa", "zol", "pril", "cil", "fen", "mid"]
+SUFFIXES = ["ITIS", "OSIS", "ALGIA", "AEMIA", "OPATHY", " DISORDER", " INCREASED", " DECREASED"]
+WORDS = ["patient", "reported", "the", "and", "with", "after", "was", "received", "dose", "treatment",
+         "event", "hospitalized", "recovered", "therapy", "discontinued", "on", "mg", "daily", "symptoms",
+         "physician", "history", "of", "onset", "days", "laboratory", "values", "within", "normal", "limits"]
+UNICODE_WORDS = ["naïve", "Größe", "déjà", "señal", "café", "μg", "±", "≥", "患者", "Übelkeit"]
+COUNTRIES = ["US", "GB", "JP", "DE", "FR", "CA", "IT", "ES", "BR", "CN", "IN", "AU", "NL", "COUNTRY NOT SPECIFIED"]
+MALFORMED = [("drugauthorizationnumb", "2202729.00.00"), ("patientweight", "UNK"), ("patientonsetage", "45.5"),
+             ("drugstartdate", "2012"), ("drugstructuredosagenumb", "1,5"), ("reactionmeddraversionpt", "V.24")]
+
+META = {
+    "disclaimer": "Synthetic data generated by src/benchmarks/generate_reports.py; not openFDA data.",
+    "terms": "https://open.fda.gov/terms/",
+    "license": "https://open.fda.gov/license/",
+}
+
+
+def merge_profile(overrides):
+    """DEFAULT_PROFILE with `overrides` applied; nested dicts are merged one level deep."""
+    profile = json.loads(json.dumps(DEFAULT_PROFILE))
+    for key, value in (overrides or {}).items():
+        if key not in profile:
+            raise ValueError(f"Unknown profile key: {key}")
+        if isinstance(value, dict) and isinstance(profile[key], dict) and "dist" not in value:
+            profile[key].update(value)
+        else:
+            profile[key] = value
+    return profile
+
+
+def sample(rng, spec):
+    """One integer drawn from a distribution spec (see DEFAULT_PROFILE)."""
+    kind = spec["dist"]
+    if kind == "fixed":
+        n = spec["value"]
+    elif kind == "uniform":
+        n = rng.randint(spec["low"], spec["high"])
+    elif kind == "geometric":
+        p = 1 / max(spec["mean"], 1)
+        n = 1 if p >= 1 else 1 + int(math.log(1 - rng.random()) / math.log(1 - p))
+    elif kind == "lognormal":
+        n = int(round(rng.lognormvariate(math.log(spec["median"]), spec["sigma"])))
+    else:
+        raise ValueError(f"Unknown distribution: {kind}")
+    return max(spec.get("min", 0), min(n, spec.get("max", n)))
+
+
+def cumulative(weights):
+    total, cum = 0.0, []
+    for w in weights:
+        total += w
+        cum.append(total)
+    return cum
+
+
+def zipf_cumulative(size, exponent):
+    return cumulative(1 / (k + 1) ** exponent for k in range(size))
+
+
+def weighted_picker(weights):
+    """(rng -> key) for a {key: weight} mapping."""
+    keys = list(weights)
+    cum = cumulative(weights[k] for k in keys)
+    return lambda rng: keys[bisect.bisect(cum, rng.random() * cum[-1])]
+
+
+def coined_name(i, suffix=""):
+    parts = []
+    while True:
+        i, digit = divmod(i, len(SYLLABLES))
+        parts.append(SYLLABLES[digit])
+        if not i:
+            break
+        i -= 1
+    return ("".join(parts) + suffix).upper()
+
+
+def drug_name(i):
+    return KNOWN_DRUGS[i] if i < len(KNOWN_DRUGS) else coined_name(i, "")
+
+
+def reaction_name(i):
+    return KNOWN_REACTIONS[i] if i < len(KNOWN_REACTIONS) else coined_name(i, SUFFIXES[i % len(SUFFIXES)])
+
+
+def yyyymmdd(d):
+    return f"{d.year:04d}{d.month:02d}{d.day:02d}"
+
+
+def formatted_date(d, fmt):
+    text = yyyymmdd(d)
+    return text if fmt == "102" else text[:6] if fmt == "610" else text[:4]
+
+
+class ReportGenerator:
+    """Builds report dicts for one file; `seed` and `file_index` fix the output."""
+
+    def __init__(self, profile, seed, file_index):
+        self.profile = profile
+        self.seed = seed
+        self.rng = random.Random(f"{seed}:{file_index}")
+        self.presence = profile["presence"]
+        self.drug_cum = zipf_cumulative(profile["drug_vocabulary"], profile["zipf_exponent"])
+        self.reaction_cum = zipf_cumulative(profile["reaction_vocabulary"], profile["zipf_exponent"])
+        self.date_format = weighted_picker(profile["date_formats"])
+        self.characterization = weighted_picker(profile["characterization"])
+        first, last = profile["years"]
+        self.first_day = datetime.date(first, 1, 1).toordinal()
+        self.last_day = datetime.date(last, 12, 31).toordinal()
+        self.openfda_blocks = {}  # drug index -> openFDA block, built on first use
+
+    def has(self, field):
+        return self.rng.random() < self.presence.get(field, 1.0)
+
+    def zipf(self, cum):
+        return bisect.bisect(cum, self.rng.random() * cum[-1])
+
+    def openfda(self, index):
+        block = self.openfda_blocks.get(index)
+        if block is None:
+            rng = random.Random(f"{self.seed}:drug:{index}")  # same block in every file / worker
+            name = drug_name(index)
+            presence = self.presence
+            block = {
+                "application_number": [f"NDA{rng.randint(10000, 219999):06d}"],
+                "brand_name": [name],
+                "generic_name": [name if index < len(KNOWN_DRUGS) else coined_name(index + 7)],
+                "manufacturer_name": [f"{coined_name(rng.randrange(400)).title()} Pharmaceuticals Inc."],
+                "product_ndc": [f"{rng.randint(1000, 99999)}-{rng.randint(100, 999)}"],
+                "product_type": [rng.choice(["HUMAN PRESCRIPTION DRUG", "HUMAN OTC DRUG"])],
+                "spl_id": [f"{rng.getrandbits(128):032x}"],
+                "spl_set_id": [f"{rng.getrandbits(128):032x}"],
+                "package_ndc": [f"{rng.randint(1000, 99999)}-{rng.randint(100, 999)}-{rng.randint(10, 99)}"],
+            }
+            for field, value in (("route", [rng.choice(["ORAL", "INTRAVENOUS", "SUBCUTANEOUS", "TOPICAL"])]),
+                                 ("substance_name", [name]), ("unii", [f"{rng.getrandbits(40):010X}"]),
+                                 ("rxcui", [str(rng.randint(1000, 2000000))]),
+                                 ("nui", [f"N{rng.randint(10**9, 10**10 - 1)}"]),
+                                 ("pharm_class_epc", [f"{coined_name(rng.randrange(300)).title()} [EPC]"]),
+                                 ("pharm_class_moa", [f"{coined_name(rng.randrange(300)).title()} [MoA]"]),
+                                 ("pharm_class_cs", [f"{coined_name(rng.randrange(300)).title()} [CS]"]),
+                                 ("pharm_class_pe", [f"{coined_name(rng.randrange(300)).title()} [PE]"])):
+                if rng.random() < presence.get(f"patient.drug.openfda.{field}", 1.0):
+                    block[field] = value
+            self.openfda_blocks[index] = block
+        return block
+
+    def narrative(self, length, event_day=None, unicode=False):
+        words = WORDS + UNICODE_WORDS if unicode else WORDS
+        text = " ".join(self.rng.choices(words, k=length // 6 + 1))[:length]  # ~6 chars per word
+        if event_day:
+            text = f"CASE EVENT DATE: {yyyymmdd(event_day)} {text}"
+        return text[0].upper() + text[1:] + "."
+
+    def drug(self, received):
+        rng, has, p = self.rng, self.has, self.profile["pathological"]
+        index = self.zipf(self.drug_cum)
+        name = drug_name(index)
+        if rng.random() < p["name_variant_rate"]:
+            name = rng.choice([name.lower(), name + " ", " " + name.title(), name.replace(" ", "  ")])
+        drug = {"drugcharacterization": self.characterization(rng), "medicinalproduct": name}
+        if has("patient.drug.drugauthorizationnumb"):
+            drug["drugauthorizationnumb"] = f"{rng.randint(10000, 999999):06d}"
+        if has("patient.drug.drugstructuredosagenumb"):
+            drug["drugstructuredosagenumb"] = str(rng.choice([1, 2, 5, 10, 20, 40, 100, 500]))
+            drug["drugstructuredosageunit"] = rng.choice(["003", "004", "012"])
+        if has("patient.drug.drugseparatedosagenumb"):
+            drug["drugseparatedosagenumb"] = str(rng.randint(1, 3))
+        if has("patient.drug.drugintervaldosagedefinition"):
+            drug["drugintervaldosageunitnumb"] = str(rng.randint(1, 4))
+            drug["drugintervaldosagedefinition"] = rng.choice(["801", "802", "803", "804"])
+        if has("patient.drug.drugcumulativedosagenumb"):
+            drug["drugcumulativedosagenumb"] = f"{rng.uniform(1, 5000):.1f}"
+            drug["drugcumulativedosageunit"] = "003"
+        if has("patient.drug.drugdosagetext"):
+            drug["drugdosagetext"] = f"{rng.choice([1, 2, 5, 10, 20, 40])} MG, {rng.choice(['QD', 'BID', 'TID', 'PRN'])}"
+        if has("patient.drug.drugdosageform"):
+            drug["drugdosageform"] = rng.choice(["TABLET", "CAPSULE", "INJECTION", "SOLUTION", "CREAM"])
+        if has("patient.drug.drugadministrationroute"):
+            drug["drugadministrationroute"] = rng.choice(["048", "042", "058", "061", "065"])
+        if has("patient.drug.drugindication"):
+            drug["drugindication"] = reaction_name(self.zipf(self.reaction_cum))
+        start = received - rng.randint(0, 3650)
+        if has("patient.drug.drugstartdate"):
+            fmt = self.date_format(rng)
+            drug["drugstartdateformat"] = fmt
+            drug["drugstartdate"] = formatted_date(datetime.date.fromordinal(start), fmt)
+        if has("patient.drug.drugenddate"):
+            fmt = self.date_format(rng)
+            drug["drugenddateformat"] = fmt
+            drug["drugenddate"] = formatted_date(datetime.date.fromordinal(min(start + rng.randint(0, 365), received)), fmt)
+        if has("patient.drug.drugtreatmentduration"):
+            drug["drugtreatmentduration"] = str(rng.randint(1, 365))
+            drug["drugtreatmentdurationunit"] = rng.choice(["801", "802", "803", "804"])
+        if has("patient.drug.drugbatchnumb"):
+            drug["drugbatchnumb"] = f"{rng.getrandbits(24):06X}"
+        if has("patient.drug.actiondrug"):
+            drug["actiondrug"] = str(rng.randint(1, 6))
+        if has("patient.drug.drugrecurreadministration"):
+            drug["drugrecurreadministration"] = str(rng.randint(1, 3))
+        if has("patient.drug.drugadditional"):
+            drug["drugadditional"] = str(rng.randint(1, 3))
+        drug["activesubstance"] = {"activesubstancename": drug_name(index)}
+        if has("patient.drug.openfda"):
+            block = self.openfda(index)
+            if rng.random() < self.profile["openfda_variant_rate"]:
+                block = {**block, "spl_id": [f"{rng.getrandbits(128):032x}"]}  # relabelled product
+            drug["openfda"] = block
+        return drug
+
+    def reaction(self):
+        reaction = {"reactionmeddraversionpt": self.rng.choice(["19.0", "20.1", "21.1", "22.0", "23.1", "24.0"]),
+                    "reactionmeddrapt": reaction_name(self.zipf(self.reaction_cum))}
+        if self.has("patient.reaction.reactionoutcome"):
+            reaction["reactionoutcome"] = str(self.rng.randint(1, 6))
+        return reaction
+
+    def report(self, rid, version=1):
+        rng, has, profile = self.rng, self.has, self.profile
+        p = profile["pathological"]
+        received = rng.randint(self.first_day, self.last_day)
+        received_text = yyyymmdd(datetime.date.fromordinal(received))
+        serious = rng.random() < profile["serious_rate"]
+        report = {
+            "safetyreportid": str(rid),
+            "safetyreportversion": str(version),
+            "receivedateformat": "102",
+            "receivedate": received_text,
+            "receiptdateformat": "102",
+            "receiptdate": received_text,
+            "transmissiondateformat": "102",
+            "transmissiondate": yyyymmdd(datetime.date.fromordinal(min(received + rng.randint(1, 400), self.last_day))),
+            "serious": "1" if serious else "2",
+        }
+        if rng.random() < p["sparse_rate"]:
+            # Only the objects every real report has (value_fields_presence.csv: 100%)
+            report["primarysource"] = {"reportercountry": "COUNTRY NOT SPECIFIED"}
+            report["sender"] = {"sendertype": "2", "senderorganization": "FDA-Public Use"}
+            report["receiver"] = {"receivertype": "6", "receiverorganization": "FDA"}
+            report["patient"] = {"drug": [], "reaction": []} if rng.random() < 0.5 else {}
+            return report
+        if serious:
+            death = rng.random() < profile["death_rate"]
+            for flag in ("seriousnessdeath", "seriousnesslifethreatening", "seriousnesshospitalization",
+                         "seriousnessdisabling", "seriousnesscongenitalanomali", "seriousnessother"):
+                if flag == "seriousnessdeath" and death or flag != "seriousnessdeath" and rng.random() < 0.3:
+                    report[flag] = "1"
+        country = rng.choice(COUNTRIES)
+        if has("occurcountry"):
+            report["occurcountry"] = country
+        report["primarysourcecountry"] = country
+        report["fulfillexpeditecriteria"] = rng.choice(["1", "2"])
+        if has("reporttype"):
+            report["reporttype"] = rng.choice(["1", "2", "3", "4"])
+        if has("companynumb"):
+            report["companynumb"] = f"{country}-{coined_name(rng.randrange(200))}-{rng.randint(10**6, 10**9)}"
+        if has("authoritynumb"):
+            report["authoritynumb"] = f"{country}-MHRA-{rng.randint(10**6, 10**8)}"
+        if has("duplicate"):
+            report["duplicate"] = "1"
+            report["reportduplicate"] = [{"duplicatesource": coined_name(rng.randrange(200)),
+                                          "duplicatenumb": f"{country}-{rng.randint(10**6, 10**9)}"}]
+        primarysource = {"reportercountry": country}
+        if has("primarysource.qualification"):
+            primarysource["qualification"] = str(rng.randint(1, 5))
+        if has("primarysource.literaturereference"):
+            refs = [f"{coined_name(rng.randrange(5000)).title()} A, et al. {coined_name(rng.randrange(500)).title()} "
+                    f"J. {rng.randint(1990, 2024)};{rng.randint(1, 80)}({rng.randint(1, 12)}):{rng.randint(1, 999)}."
+                    for _ in range(sample(rng, profile["literature_references"]))]
+            primarysource["literaturereference"] = refs[0] if len(refs) == 1 else refs
+        report["primarysource"] = primarysource
+        report["sender"] = {"sendertype": "2", "senderorganization": "FDA-Public Use"}
+        report["receiver"] = {"receivertype": "6", "receiverorganization": "FDA"}
+
+        patient = {}
+        if has("patient.patientonsetage"):
+            patient["patientonsetage"] = str(rng.randint(0, 95))
+            patient["patientonsetageunit"] = "801"
+        if has("patient.patientagegroup"):
+            patient["patientagegroup"] = str(rng.randint(1, 6))
+        if has("patient.patientweight"):
+            patient["patientweight"] = f"{rng.uniform(3, 150):.2f}"
+        if has("patient.patientsex"):
+            patient["patientsex"] = rng.choice(["0", "1", "2"])
+        patient["reaction"] = [self.reaction() for _ in range(sample(rng, profile["reactions_per_report"]))]
+        patient["drug"] = [self.drug(received) for _ in range(sample(rng, profile["drugs_per_report"]))]
+        if has("patient.summary"):
+            event_day = None
+            if rng.random() < profile["case_event_date_rate"]:
+                event_day = datetime.date.fromordinal(received - rng.randint(0, 365))
+            text = self.narrative(sample(rng, profile["narrative_chars"]), event_day,
+                                  unicode=rng.random() < p["unicode_rate"])
+            patient["summary"] = {"narrativeincludeclinical": text}
+        report["patient"] = patient
+
+        if rng.random() < p["malformed_rate"]:
+            field, value = rng.choice(MALFORMED)
+            if field.startswith("drug") and patient["drug"]:
+                target = patient["drug"][0]
+                if field == "drugstartdate":
+                    target["drugstartdateformat"] = "102"  # claims a full date
+            elif field.startswith("reaction") and patient["reaction"]:
+                target = patient["reaction"][0]
+            else:
+                target = patient
+                if not field.startswith("patient"):
+                    field, value = "patientweight", "UNK"
+            target[field] = value
+        return report
+
+    def oversized(self, rid, target_bytes):
+        """A report padded with drugs and reactions until it serializes to about target_bytes."""
+        report = self.report(rid)
+        patient = report.setdefault("patient", {})
+        received = datetime.datetime.strptime(report["receivedate"], "%Y%m%d").toordinal()
+        drugs = patient.setdefault("drug", [])
+        reactions = patient.setdefault("reaction", [])
+        size = len(dumps(report))
+        while size < target_bytes:
+            chunk = [self.drug(received) for _ in range(50)]
+            extra = [self.reaction() for _ in range(10)]
+            drugs.extend(chunk)
+            reactions.extend(extra)
+            size += len(dumps(chunk)) + len(dumps(extra))
+        return report
+
+
+def partition_name(index, total, compression):
+    name = f"drug-event-{index + 1:04d}-of-{total:04d}.json"
+    return name + {"none": "", "gz": ".gz", "zip": ".zip"}[compression]
+
+
+def open_partition(path, compression):
+    if compression == "gz":
+        return gzip.open(path, "wb", compresslevel=3)
+    if compression == "zip":
+        archive = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, compresslevel=3)
+        member = archive.open(os.path.basename(path)[:-len(".zip")], "w", force_zip64=True)
+        member.close_archive = archive.close
+        return member
+    return open(path, "wb", buffering=4 * 1024 * 1024)
+
+
+def write_partition(task):
+    """Writes one file; returns (path, reports written, distinct ids, oversized ids)."""
+    output_dir, index, total_files, first_slot, count, total_reports, profile, seed, compression = task
+    p = profile["pathological"]
+    generator = ReportGenerator(profile, seed, index)
+    rng = generator.rng
+    path = os.path.join(output_dir, partition_name(index, total_files, compression))
+    every = p["oversized_every"]
+    recent = deque(maxlen=64)  # (rid, latest version, serialized report) for duplicates / republishing
+    distinct = 0
+    oversized = []
+    f = open_partition(path, compression)
+    try:
+        meta = {**META, "last_updated": f"{profile['years'][1]}-12-31",
+                "results": {"skip": first_slot, "limit": count, "total": total_reports}}
+        f.write(b'{"meta":' + dumps(meta) + b',"results":[\n')
+        for slot in range(first_slot, first_slot + count):
+            rid = profile["start_id"] + slot
+            draw = rng.random()
+            if recent and draw < p["duplicate_rate"]:
+                body = rng.choice(recent)[2]
+            elif recent and draw < p["duplicate_rate"] + p["republish_rate"]:
+                # The new version replaces its entry, so every (rid, version) gets exactly one body
+                i = rng.randrange(len(recent))
+                old_rid, version, _ = recent[i]
+                body = dumps(generator.report(old_rid, version + 1))
+                recent[i] = (old_rid, version + 1, body)
+            elif every and (slot % every == every // 2 or (total_reports <= every and slot == total_reports // 2)):
+                body = dumps(generator.oversized(rid, p["oversized_mb"] * 1024 * 1024))
+                oversized.append(rid)
+                distinct += 1
+            else:
+                body = dumps(generator.report(rid))
+                recent.append((rid, 1, body))
+                distinct += 1
+            if slot != first_slot:
+                f.write(b",\n")
+            f.write(body)
+        f.write(b"\n]}\n")
+    finally:
+        f.close()
+        if hasattr(f, "close_archive"):
+            f.close_archive()
+    return path, count, distinct, oversized
+
+
+def main(output_dir, reports, reports_per_file=10_000, seed=0, compression="none", workers=1, profile=None,
+         manifest=None):
+    profile = merge_profile(profile)
+    os.makedirs(output_dir, exist_ok=True)
+    total_files = max(1, math.ceil(reports / reports_per_file))
+    tasks = [(output_dir, i, total_files, i * reports_per_file, min(reports_per_file, reports - i * reports_per_file),
+              reports, profile, seed, compression) for i in range(total_files)]
+    start = time.perf_counter()
+    written = distinct = 0
+    oversized = []
+    with Pool(workers) if workers > 1 else _InlinePool() as pool:
+        for path, count, unique, big in pool.imap(write_partition, tasks):
+            written += count
+            distinct += unique
+            oversized.extend(big)
+            logging.info(f"{os.path.basename(path)}: {count} reports ({written}/{reports})")
+    elapsed = time.perf_counter() - start
+    logging.info(f"Finished. {written} reports ({distinct} distinct ids, {len(oversized)} oversized) in "
+                 f"{total_files} files, {elapsed:.1f} s ({written / elapsed if elapsed else 0:.0f} reports/sec)")
+    summary = {"output": os.path.abspath(output_dir), "seed": seed, "reports": written, "distinct_ids": distinct,
+               "files": total_files, "oversized_ids": oversized, "profile": profile}
+    if manifest:
+        with open(manifest, "w") as f:
+            json.dump(summary, f, indent=2)
+    return summary
+
+
+class _InlinePool:
+    """Pool stand-in for --workers 1."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def imap(self, func, iterable):
+        return map(func, iterable)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", default="data/raw/synthetic", help="Directory for the generated partitions")
+    parser.add_argument("--reports", type=int, default=36_000, help="Reports at scale 1")
+    parser.add_argument("--scale", type=float, default=1, help="Multiplier on --reports (e.g. 1, 10, 100)")
+    parser.add_argument("--reports_per_file", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compression", choices=["none", "gz", "zip"], default="none")
+    parser.add_argument("--workers", type=int, default=1, help="Processes writing files in parallel")
+    parser.add_argument("--profile", default=None, help="JSON file overriding DEFAULT_PROFILE keys")
+    parser.add_argument("--manifest", default=None, help="Write seed, counts, oversized ids and the profile here")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    overrides = None
+    if args.profile:
+        with open(args.profile) as f:
+            overrides = json.load(f)
+    try:
+        main(args.output, int(args.reports * args.scale), args.reports_per_file, args.seed, args.compression,
+             args.workers, overrides, args.manifest)
+    except ValueError as e:
+        sys.exit(str(e))
@@ -0,0 +1,89 @@
+"""
+Query pairs for the benchmark harness: every query id maps to its SQLite statement
+(src/db_sql/queries.py, also run by DuckDB over the Parquet export) and its MongoDB
+function (src/db_mongo/queries.py), plus the shape its result is compared in.
+"""
+
+import os
+import sys
+from collections import namedtuple
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from src.db_sql.queries import SQLITE_QUERIES
+from src.db_mongo.queries import MONGO_QUERIES
+
+# Result shapes: one number, a set of values, or value -> number (group-by queries)
+SCALAR, SET, MAPPING = "scalar", "set", "mapping"
+
+QueryPair = namedtuple("QueryPair", "qid category shape sql mongo")
+
+# Categories and shapes as used in final_performance_evaluation.ipynb
+_SPECS = {
+    "Q1": ("Simple", SCALAR),
+    "Q2": ("Simple", SET),
+    "Q3": ("Simple", SCALAR),
+    "Q4": ("Moderate", MAPPING),
+    "Q5": ("Moderate", MAPPING),
+    "Q6": ("Moderate", MAPPING),
+    "Q7": ("Complex", MAPPING),
+    "Q8": ("Complex", MAPPING),
+    "Q9": ("Complex", SET),
+    "Q10": ("Complex", MAPPING),
+    "Q11": ("Complex", SCALAR),
+    "Q12": ("Complex", SET),
+    "Q13": ("Complex", MAPPING),
+}
+
+QUERY_PAIRS = {
+    qid: QueryPair(qid, category, shape, SQLITE_QUERIES[qid], MONGO_QUERIES[qid])
+    for qid, (category, shape) in _SPECS.items()
+}
+
+
+def _number(value):
+    if isinstance(value, float):
+        return float(f"{value:.9g}")  # summation order differs between engines
+    return value
+
+
+def canonical_rows(shape, rows):
+    """Comparable form of a SQL result (SQLite or DuckDB)."""
+    if shape == SCALAR:
+        return _number(rows[0][0]) if rows else 0
+    if shape == SET:
+        return {row[0] for row in rows}
+    return {row[0]: _number(row[1]) for row in rows}
+
+
+def canonical_documents(shape, result):
+    """Comparable form of a MongoDB result: a count, a list of values, or aggregation output
+    ({"_id": key, <value>: n} documents; {"<name>": n} for a $count stage)."""
+    if isinstance(result, int):
+        return result
+    docs = list(result)
+    if shape == SCALAR:
+        if not docs:
+            return 0
+        return _number(next(v for k, v in docs[0].items() if k != "_id"))
+    if shape == SET:
+        return {doc["_id"] if isinstance(doc, dict) else doc for doc in docs}
+    return {doc["_id"]: _number(next(v for k, v in doc.items() if k != "_id")) for doc in docs}
+
+
+def describe_difference(expected, actual):
+    """Short human-readable summary of how two canonical results differ."""
+    if isinstance(expected, (set, dict)) and isinstance(actual, (set, dict)):
+        only_expected = set(expected) - set(actual)
+        only_actual = set(actual) - set(expected)
+        parts = []
+        if only_expected:
+            parts.append(f"{len(only_expected)} missing (e.g. {sorted(only_expected, key=repr)[:3]})")
+        if only_actual:
+            parts.append(f"{len(only_actual)} extra (e.g. {sorted(only_actual, key=repr)[:3]})")
+        if isinstance(expected, dict) and isinstance(actual, dict):
+            changed = [k for k in set(expected) & set(actual) if expected[k] != actual[k]]
+            if changed:
+                key = sorted(changed, key=repr)[0]
+                parts.append(f"{len(changed)} values differ (e.g. {key!r}: {expected[key]} vs {actual[key]})")
+        return "; ".join(parts)
+    return f"{expected!r} vs {actual!r}"
@@ -0,0 +1,379 @@
+"""
+Benchmark harness for the Q1–Q13 query pairs (replaces the timing loop in
+notebooks/final_performance_evaluation.ipynb):
+- warm runs: `--warmup` untimed executions, then `--runs` timed ones per query and engine
+- cold runs: `--cold_runs` executions, each on a freshly opened connection (SQLite page cache,
+  DuckDB buffers, MongoDB connection pool and plan cache start empty); `--drop_os_cache`
+  also empties the Linux page cache before each one (needs root). MongoDB's WiredTiger cache
+  only empties on a server restart
+- p50/p95/p99, mean, std, min and max per query, engine and mode
+- result equivalence: every engine's result is compared with the first engine's
+- JSON/CSV output (`--json`, `--csv`); `--baseline` takes a previous `--json` file and flags
+  queries whose p50 grew by more than `--threshold`
+
+    python src/benchmarks/run_benchmarks.py --engines sqlite mongo --runs 10 --cold_runs 3 \
+        --json reports/evaluation_results/benchmark.json --baseline reports/evaluation_results/baseline.json
+"""
+
+import argparse
+import csv
+import datetime
+import hashlib
+import json
+import logging
+import math
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from src.benchmarks.query_pairs import QUERY_PAIRS, canonical_rows, canonical_documents, describe_difference
+
+DEFAULT_THRESHOLD = 0.2
+DEFAULT_MIN_DELTA = 0.005  # seconds; smaller p50 differences are timer noise
+
+CSV_COLUMNS = ["query", "category", "db", "mode", "runs", "mean_time", "std_time", "min_time",
+               "p50", "p95", "p99", "max_time", "run_times"]
+
+
+def drop_os_cache():
+    """Flushes dirty pages and empties the Linux page cache; returns False where that is not possible."""
+    try:
+        os.sync()
+        with open("/proc/sys/vm/drop_caches", "w") as f:
+            f.write("3\n")
+        return True
+    except OSError:
+        return False
+
+
+class SQLiteEngine:
+    name = "SQLite"
+
+    def __init__(self, db_path):
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"SQLite database not found: {db_path}")
+        self.uri = Path(db_path).resolve().as_uri() + "?mode=ro"
+        self.conn = sqlite3.connect(self.uri, uri=True)
+
+    def run(self, pair):
+        return self.conn.execute(pair.sql).fetchall()
+
+    def canonical(self, pair, result):
+        return canonical_rows(pair.shape, result)
+
+    def reopen(self):
+        self.conn.close()
+        self.conn = sqlite3.connect(self.uri, uri=True)
+
+    def describe(self):
+        version = self.conn.execute("SELECT sqlite_version()").fetchone()[0]
+        ddl = "\n".join(sql for (sql,) in self.conn.execute(
+            "SELECT sql FROM sqlite_master WHERE sql IS NOT NULL ORDER BY type, name"))
+        return {"version": version, "schema_hash": hashlib.blake2b(ddl.encode(), digest_size=8).hexdigest()}
+
+    def close(self):
+        self.conn.close()
+
+
+class MongoEngine:
+    name = "MongoDB"
+
+    def __init__(self, uri, db_name, collection_name):
+        from pymongo import MongoClient
+        self.client_class = MongoClient
+        self.uri, self.db_name, self.collection_name = uri, db_name, collection_name
+        self._connect()
+
+    def _connect(self):
+        self.client = self.client_class(self.uri)
+        self.collection = self.client[self.db_name][self.collection_name]
+
+    def run(self, pair):
+        return pair.mongo(self.collection)
+
+    def canonical(self, pair, result):
+        return canonical_documents(pair.shape, result)
+
+    def reopen(self):
+        self.client.close()
+        self._connect()
+        try:
+            self.client[self.db_name].command("planCacheClear", self.collection_name)
+        except Exception as e:  # older servers / restricted users
+            logging.debug(f"planCacheClear failed: {e}")
+
+    def describe(self):
+        try:
+            version = self.client.server_info().get("version")
+        except Exception:
+            version = None
+        return {"version": version, "collection": f"{self.db_name}.{self.collection_name}"}
+
+    def close(self):
+        self.client.close()
+
+
+class DuckDBEngine:
+    name = "DuckDB"
+
+    def __init__(self, parquet_dir, threads=None):
+        from src.db_parquet.query_duckdb import ParquetBackend
+        self.backend_class = ParquetBackend
+        self.parquet_dir, self.threads = parquet_dir, threads
+        self.backend = ParquetBackend(parquet_dir, threads)
+
+    def run(self, pair):
+        return self.backend.query(pair.sql)
+
+    def canonical(self, pair, result):
+        return canonical_rows(pair.shape, result)
+
+    def reopen(self):
+        self.backend.close()
+        self.backend = self.backend_class(self.parquet_dir, self.threads)
+
+    def describe(self):
+        return {"version": self.backend.query("SELECT version()")[0][0], "parquet_dir": self.parquet_dir}
+
+    def close(self):
+        self.backend.close()
+
+
+def percentile(sorted_values, p):
+    """Linearly interpolated percentile (numpy's default) of an already sorted list."""
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * p / 100
+    lower, upper = math.floor(k), math.ceil(k)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (k - lower)
+
+
+def summarize(durations):
+    ordered = sorted(durations)
+    return {
+        "runs": len(durations),
+        "mean_time": statistics.mean(durations),
+        "std_time": statistics.stdev(durations) if len(durations) > 1 else 0.0,
+        "min_time": ordered[0],
+        "p50": percentile(ordered, 50),
+        "p95": percentile(ordered, 95),
+        "p99": percentile(ordered, 99),
+        "max_time": ordered[-1],
+        "run_times": durations,
+    }
+
+
+def timed(engine, pair):
+    start = time.perf_counter()
+    result = engine.run(pair)
+    return time.perf_counter() - start, result
+
+
+def benchmark_query(engine, pair, warmup, runs, cold_runs, drop_cache=False):
+    """Returns ([result records], last result) for one query on one engine."""
+    records = []
+    result = None
+    for _ in range(warmup):
+        result = engine.run(pair)
+    warm = []
+    for _ in range(runs):
+        duration, result = timed(engine, pair)
+        warm.append(duration)
+    if warm:
+        records.append({"mode": "warm", **summarize(warm)})
+    cold = []
+    for _ in range(cold_runs):
+        engine.reopen()
+        if drop_cache:
+            drop_os_cache()
+        duration, result = timed(engine, pair)
+        cold.append(duration)
+    if cold:
+        records.append({"mode": "cold", **summarize(cold)})
+    base = {"query": pair.qid, "category": pair.category, "db": engine.name}
+    return [{**base, **record} for record in records], result
+
+
+def run_benchmarks(engines, query_ids, warmup=1, runs=5, cold_runs=0, drop_cache=False, check=True):
+    """Times every query on every engine. Returns (results, equivalence); equivalence compares
+    each engine's result with the first engine's."""
+    results, equivalence = [], []
+    for qid in query_ids:
+        pair = QUERY_PAIRS[qid]
+        reference = None
+        for engine in engines:
+            try:
+                records, result = benchmark_query(engine, pair, warmup, runs, cold_runs, drop_cache)
+            except Exception as e:
+                logging.error(f"{qid} failed on {engine.name}: {e}")
+                results.append({"query": qid, "category": pair.category, "db": engine.name, "error": str(e)})
+                continue
+            results.extend(records)
+            for record in records:
+                logging.info(f"{qid:<4} {engine.name:<8} {record['mode']:<5} p50 {record['p50'] * 1000:9.2f} ms"
+                             f"  p95 {record['p95'] * 1000:9.2f} ms")
+            if not check:
+                continue
+            canonical = engine.canonical(pair, result)
+            if reference is None:
+                reference = (engine.name, canonical)
+                continue
+            same = canonical == reference[1]
+            equivalence.append({"query": qid, "db": engine.name, "reference": reference[0], "equivalent": same,
+                                "detail": "" if same else describe_difference(reference[1], canonical)})
+            if not same:
+                logging.warning(f"{qid}: {engine.name} result differs from {reference[0]}: {equivalence[-1]['detail']}")
+    return results, equivalence
+
+
+def load_baseline(path):
+    """(query, db, mode) -> p50 seconds from a previous --json output."""
+    with open(path) as f:
+        data = json.load(f)
+    return {(r["query"], r["db"], r["mode"]): r["p50"] for r in data["results"] if "p50" in r}
+
+
+def find_regressions(results, baseline, threshold=DEFAULT_THRESHOLD, min_delta=DEFAULT_MIN_DELTA):
+    regressions = []
+    for record in results:
+        key = (record["query"], record["db"], record.get("mode"))
+        if "p50" not in record or key not in baseline:
+            continue
+        before, after = baseline[key], record["p50"]
+        if after - before > min_delta and after > before * (1 + threshold):
+            regressions.append({"query": key[0], "db": key[1], "mode": key[2], "baseline_p50": before,
+                                "p50": after, "ratio": after / before if before else None})
+    return regressions
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_json(path, meta, results, equivalence, regressions):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"meta": meta, "results": results, "equivalence": equivalence, "regressions": regressions},
+                  f, indent=2)
+
+
+def write_csv(path, results):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        for record in results:
+            if "error" not in record:
+                writer.writerow({**record, "run_times": json.dumps(record["run_times"])})
+
+
+def print_table(results, equivalence, regressions):
+    mismatched = {(e["query"], e["db"]) for e in equivalence if not e["equivalent"]}
+    regressed = {(r["query"], r["db"], r["mode"]) for r in regressions}
+    print(f"{'query':<6}{'db':<9}{'mode':<6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}  flags")
+    for r in results:
+        if "error" in r:
+            print(f"{r['query']:<6}{r['db']:<9}{'':<6}  error: {r['error']}")
+            continue
+        flags = []
+        if (r["query"], r["db"]) in mismatched:
+            flags.append("RESULT MISMATCH")
+        if (r["query"], r["db"], r["mode"]) in regressed:
+            flags.append("REGRESSION")
+        print(f"{r['query']:<6}{r['db']:<9}{r['mode']:<6}{r['p50'] * 1000:10.2f}{r['p95'] * 1000:10.2f}"
+              f"{r['p99'] * 1000:10.2f}{r['mean_time'] * 1000:10.2f}  {' '.join(flags)}")
+
+
+def main(args):
+    query_ids = args.queries or list(QUERY_PAIRS)
+    unknown = [q for q in query_ids if q not in QUERY_PAIRS]
+    if unknown:
+        raise ValueError(f"Unknown query ids: {unknown} (known: {list(QUERY_PAIRS)})")
+    if args.runs < 1 and args.cold_runs < 1:
+        raise ValueError("Nothing to time: set --runs and/or --cold_runs")
+    if args.drop_os_cache and not args.cold_runs:
+        raise ValueError("--drop_os_cache only applies to --cold_runs")
+    if args.drop_os_cache and not drop_os_cache():
+        logging.warning("Cannot drop the OS page cache (Linux and root only); cold runs only reopen connections")
+        args.drop_os_cache = False
+
+    engines = []
+    for name in args.engines:
+        if name == "sqlite":
+            engines.append(SQLiteEngine(args.db))
+        elif name == "mongo":
+            engines.append(MongoEngine(args.uri, args.mongo_db, args.collection))
+        elif name == "duckdb":
+            engines.append(DuckDBEngine(args.parquet_dir))
+
+    meta = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "warmup": args.warmup, "runs": args.runs, "cold_runs": args.cold_runs,
+        "drop_os_cache": args.drop_os_cache,
+        "engines": {engine.name: engine.describe() for engine in engines},
+    }
+    try:
+        results, equivalence = run_benchmarks(engines, query_ids, args.warmup, args.runs, args.cold_runs,
+                                              args.drop_os_cache, check=not args.no_check)
+    finally:
+        for engine in engines:
+            engine.close()
+
+    regressions = []
+    if args.baseline:
+        regressions = find_regressions(results, load_baseline(args.baseline), args.threshold, args.min_delta)
+        meta["baseline"] = os.path.abspath(args.baseline)
+    print_table(results, equivalence, regressions)
+    for r in regressions:
+        print(f"REGRESSION {r['query']} {r['db']} {r['mode']}: p50 {r['baseline_p50'] * 1000:.2f} ms"
+              f" -> {r['p50'] * 1000:.2f} ms ({r['ratio']:.2f}x)")
+    if args.json:
+        write_json(args.json, meta, results, equivalence, regressions)
+    if args.csv:
+        write_csv(args.csv, results)
+    failed = any("error" in r for r in results) or any(not e["equivalent"] for e in equivalence)
+    return 1 if regressions or (failed and args.strict) else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--engines", nargs="+", choices=["sqlite", "mongo", "duckdb"], default=["sqlite", "mongo"],
+                        help="Engines to time; the first one is the reference for the result checks")
+    parser.add_argument("--db", default="sql/openfda_final_v10.db", help="SQLite database (opened read-only)")
+    parser.add_argument("--uri", default="mongodb://localhost:27017", help="MongoDB URI")
+    parser.add_argument("--mongo_db", default="openfda_converted", help="MongoDB database name")
+    parser.add_argument("--collection", default="full_reports", help="MongoDB collection name")
+    parser.add_argument("--parquet_dir", default="data/parquet", help="Parquet export for the duckdb engine")
+    parser.add_argument("--queries", nargs="*", default=None, help="Subset of query ids, e.g. Q4 Q5 Q7")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs before the warm runs")
+    parser.add_argument("--runs", type=int, default=5, help="Timed warm runs per query and engine")
+    parser.add_argument("--cold_runs", type=int, default=0, help="Timed runs on a freshly opened connection")
+    parser.add_argument("--drop_os_cache", action="store_true", help="Empty the Linux page cache before each cold run (root)")
+    parser.add_argument("--no_check", action="store_true", help="Skip the cross-engine result comparison")
+    parser.add_argument("--json", default=None, help="Write meta, timings, checks and regressions as JSON")
+    parser.add_argument("--csv", default=None, help="Write one row per query, engine and mode as CSV")
+    parser.add_argument("--baseline", default=None, help="Previous --json output to compare p50 latencies against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative p50 increase flagged as a regression (0.2 = 20%%)")
+    parser.add_argument("--min_delta", type=float, default=DEFAULT_MIN_DELTA,
+                        help="Ignore p50 increases below this many seconds")
+    parser.add_argument("--strict", action="store_true", help="Also exit 1 on query errors or result mismatches")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    try:
+        sys.exit(main(args))
+    except (ImportError, FileNotFoundError, ValueError) as e:
+        sys.exit(str(e))
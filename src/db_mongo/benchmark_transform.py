@@ -0,0 +1,158 @@
+"""
+Microbenchmark for the MongoDB report transform: the previous per-field set_nested_safe
+implementation (kept below as the reference) against the compiled transformer.
+
+Both are run on identical copies of the same reports; the script fails if any transformed
+document differs (compared as encoded BSON, or repr() when bson is unavailable).
+"""
+
+import argparse
+import logging
+import os
+import pickle
+import sys
+import time
+from itertools import islice
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from src.parser.iterate_reports import iterate_reports_ijson
+from src.db_mongo.insert_pipeline_mongo_limited import (
+    transform_report, safe_int, safe_float, normalize_date_iso, extract_case_event_date)
+
+try:
+    from bson import encode as encode_document
+except ImportError:
+    encode_document = repr
+
+
+# -------- Reference implementation (per-field path walk + debug logging) --------
+
+def set_nested_safe(obj, keys, converter):
+    try:
+        for k in keys[:-1]:
+            obj = obj.get(k, {}) if isinstance(obj, dict) else {}
+        if isinstance(obj, dict) and keys[-1] in obj:
+            original = obj[keys[-1]]
+            converted = converter(original)
+            obj[keys[-1]] = converted
+            logging.debug(f"✅ Converted {'.'.join(keys)}: {original} → {converted}")
+        else:
+            logging.debug(f"⚠️ Key {keys[-1]} not in object for {'.'.join(keys)}")
+    except Exception as e:
+        logging.warning(f"Failed to convert {'.'.join(keys)}: {e}")
+
+def transform_report_reference(report):
+    # Convert safetyreportid explicitly
+    report["safetyreportid"] = safe_int(report.get("safetyreportid"))
+
+    # -------- Top-level or nested fields (non-list paths) --------
+    for path, func in [
+        (['patient', 'patientagegroup'], safe_int),
+        (['patient', 'patientonsetage'], safe_int),
+        (['patient', 'patientonsetageunit'], safe_int),
+        (['patient', 'patientsex'], safe_int),
+        (['patient', 'patientweight'], safe_float),
+        (['safetyreportversion'], safe_int),
+        (['receivedateformat'], safe_int),
+        (['receiptdateformat'], safe_int),
+        (['transmissiondateformat'], safe_int),
+        (['reporttype'], safe_int),
+        (['fulfillexpeditecriteria'], safe_int),
+        (['serious'], safe_int),
+        (['seriousnessdeath'], safe_int),
+        (['seriousnesslifethreatening'], safe_int),
+        (['seriousnesshospitalization'], safe_int),
+        (['seriousnessdisabling'], safe_int),
+        (['seriousnesscongenitalanomali'], safe_int),
+        (['seriousnessother'], safe_int),
+        (['duplicate'], safe_int),
+        (['primarysource', 'qualification'], safe_int),
+        (['sender', 'sendertype'], safe_int),
+        (['receiver', 'receivertype'], safe_int),
+    ]:
+        set_nested_safe(report, path, func)
+
+    # -------- Dates (normalize) --------
+    for date_path in [
+        ['receivedate'], ['receiptdate'], ['transmissiondate']
+    ]:
+        set_nested_safe(report, date_path, normalize_date_iso)
+
+    # -------- Extract case_event_date_extracted --------
+    summary = report.get("patient", {}).get("summary", {})
+    if isinstance(summary, dict):
+        narrative = summary.get("narrativeincludeclinical")
+        extracted = extract_case_event_date(narrative)
+        if extracted:
+            summary["case_event_date_extracted"] = extracted
+            logging.debug(f"Extracted case_event_date: {extracted}")
+
+    # -------- patient.drug (list of dicts) --------
+    for drug in report.get("patient", {}).get("drug", []):
+        for path, func in [
+            (["drugcharacterization"], safe_int),
+            (["drugauthorizationnumb"], safe_int),
+            (["drugadministrationroute"], safe_int),
+            (["actiondrug"], safe_int),
+            (["drugadditional"], safe_int),
+            (["drugintervaldosagedefinition"], safe_int),
+            (["drugcumulativedosagenumb"], safe_float),
+            (["drugcumulativedosageunit"], safe_int),
+            (["drugenddateformat"], safe_int),
+            (["drugintervaldosageunitnumb"], safe_float),
+            (["drugrecurreadministration"], safe_int),
+            (["drugseparatedosagenumb"], safe_float),
+            (["drugstartdateformat"], safe_int),
+            (["drugstructuredosagenumb"], safe_float),
+            (["drugstructuredosageunit"], safe_int),
+            (["drugtreatmentduration"], safe_float),
+            (["drugtreatmentdurationunit"], safe_int),
+            (["drugstartdate"], normalize_date_iso),
+            (["drugenddate"], normalize_date_iso),
+        ]:
+            set_nested_safe(drug, path, func)
+
+    # -------- patient.reaction (list of dicts) --------
+    for reaction in report.get("patient", {}).get("reaction", []):
+        set_nested_safe(reaction, ["reactionmeddraversionpt"], safe_float)
+        set_nested_safe(reaction, ["reactionoutcome"], safe_int)
+
+    return report
+
+
+def _time(transform, copies):
+    start = time.perf_counter()
+    for report in copies:
+        transform(report)
+    return time.perf_counter() - start
+
+
+def benchmark(reports, repeat=3):
+    """Returns reports/sec for both implementations and checks they produce identical documents."""
+    blob = pickle.dumps(reports)
+    expected = [transform_report_reference(r) for r in pickle.loads(blob)]
+    actual = [transform_report(r) for r in pickle.loads(blob)]
+    mismatches = [i for i, (a, b) in enumerate(zip(expected, actual)) if encode_document(a) != encode_document(b)]
+    if mismatches:
+        raise AssertionError(f"{len(mismatches)} transformed reports differ (first index {mismatches[0]})")
+
+    results = {}
+    for name, transform in [("reference", transform_report_reference), ("compiled", transform_report)]:
+        best = min(_time(transform, pickle.loads(blob)) for _ in range(repeat))
+        results[name] = len(reports) / best
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--json_path", default="data/raw/source_data", help="Sample file or directory")
+    parser.add_argument("--n", type=int, default=20000, help="Number of reports to transform")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repetitions (best is reported)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    reports = list(islice(iterate_reports_ijson(args.json_path), args.n))
+    results = benchmark(reports, args.repeat)
+    print(f"{len(reports)} reports, identical output")
+    print(f"reference: {results['reference']:>10.0f} reports/sec")
+    print(f"compiled:  {results['compiled']:>10.0f} reports/sec  (x{results['compiled'] / results['reference']:.2f})")
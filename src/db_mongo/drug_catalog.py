@@ -0,0 +1,190 @@
+"""
+Denormalized drug catalog for MongoDB (--drug_catalog on the loader), the counterpart of the
+SQLite DrugRegistry / drug_catalog tables.
+
+`<collection>_drug_catalog` holds one document per medicinalproduct (exactly as stored, like
+the $group of Q2/Q7):
+
+    {_id: medicinalproduct, reports: reports listing it, count: drug entries, suspect: entries
+     with drugcharacterization 1}
+
+The loader keeps it current batch by batch: the previous copies of the batch's reports are read
+first, and the catalog gets the difference between their drugs and the new ones, so replaced,
+duplicated and resumed reports are not counted twice. CATALOG_QUERIES answers Q2, Q3 and Q7
+from it; rebuild_drug_catalog() recomputes it from the collection and check_drug_catalog()
+compares the two.
+"""
+
+import argparse
+import logging
+import os
+import sys
+from collections import defaultdict
+
+from pymongo import MongoClient, UpdateOne, errors
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from src.db_mongo.overflow import MARKER, attach_overflow
+
+# E11000: two upserts of the same new _id raced and one of the inserts lost
+DUPLICATE_KEY = 11000
+
+# Drug fields read from the previous copies of a batch's reports
+DRUG_PROJECTION = {"safetyreportid": 1, "patient.drug.medicinalproduct": 1,
+                   "patient.drug.drugcharacterization": 1, MARKER: 1}
+
+
+def drug_catalog_collection(collection):
+    return collection.database[f"{collection.name}_drug_catalog"]
+
+
+def ensure_catalog_indexes(catalog):
+    catalog.create_index([("suspect", -1)])  # Q7: top suspect drugs
+
+
+def drug_contributions(report):
+    """{medicinalproduct: [drug entries, suspect entries]} of one report."""
+    patient = report.get("patient")
+    drugs = patient.get("drug") if isinstance(patient, dict) else None
+    if isinstance(drugs, dict):
+        drugs = [drugs]  # $unwind treats a single document like a one-element array
+    contributions = {}
+    for drug in drugs or ():
+        if not isinstance(drug, dict):
+            drug = {}  # grouped under a null name, as $group does
+        counts = contributions.setdefault(drug.get("medicinalproduct"), [0, 0])
+        counts[0] += 1
+        counts[1] += drug.get("drugcharacterization") == 1
+    return contributions
+
+
+def previous_contributions(collection, rids):
+    """drug_contributions() of the stored copies of `rids` (reports not stored yet are absent)."""
+    return {doc["safetyreportid"]: drug_contributions(attach_overflow(collection, doc))
+            for doc in collection.find({"safetyreportid": {"$in": list(rids)}}, DRUG_PROJECTION)}
+
+
+def update_drug_catalog(catalog, old, new):
+    """Applies the difference between two lists of drug_contributions() (reports replaced and
+    their new versions) with one unordered bulk_write; drugs no report lists anymore are removed.
+    Concurrent batches may upsert the same new drug; the losing upserts are retried as updates."""
+    delta = defaultdict(lambda: [0, 0, 0])  # reports, count, suspect
+    for contributions, sign in [(c, -1) for c in old] + [(c, 1) for c in new]:
+        for name, (count, suspect) in contributions.items():
+            totals = delta[name]
+            totals[0] += sign
+            totals[1] += sign * count
+            totals[2] += sign * suspect
+    ops = [UpdateOne({"_id": name}, {"$inc": {"reports": r, "count": n, "suspect": s}}, upsert=True)
+           for name, (r, n, s) in delta.items() if r or n or s]
+    while ops:
+        try:
+            catalog.bulk_write(ops, ordered=False)
+            break
+        except errors.BulkWriteError as bwe:
+            write_errors = bwe.details.get("writeErrors", [])
+            if not write_errors or any(err.get("code") != DUPLICATE_KEY for err in write_errors):
+                raise
+            ops = [ops[err["index"]] for err in write_errors]
+    shrunk = [name for name, (r, _, _) in delta.items() if r < 0]
+    if shrunk:
+        catalog.delete_many({"_id": {"$in": shrunk}, "reports": {"$lte": 0}})
+
+
+def computed_catalog(collection):
+    """{medicinalproduct: (reports, count, suspect)} computed from the reports themselves."""
+    pipeline = [
+        {"$unwind": "$patient.drug"},
+        {"$group": {
+            "_id": {"report": "$_id", "name": "$patient.drug.medicinalproduct"},
+            "count": {"$sum": 1},
+            "suspect": {"$sum": {"$cond": [{"$eq": ["$patient.drug.drugcharacterization", 1]}, 1, 0]}},
+        }},
+        {"$group": {"_id": "$_id.name", "reports": {"$sum": 1}, "count": {"$sum": "$count"},
+                    "suspect": {"$sum": "$suspect"}}},
+    ]
+    totals = {doc["_id"]: [doc["reports"], doc["count"], doc["suspect"]]
+              for doc in collection.aggregate(pipeline, allowDiskUse=True)}
+    # Drugs of oversized reports live in the chunks collection (src/db_mongo/overflow.py)
+    for header in collection.find({MARKER: {"$exists": True}}, DRUG_PROJECTION):
+        for name, (count, suspect) in drug_contributions(attach_overflow(collection, header)).items():
+            entry = totals.setdefault(name, [0, 0, 0])
+            entry[0] += 1
+            entry[1] += count
+            entry[2] += suspect
+    return {name: tuple(values) for name, values in totals.items()}
+
+
+def rebuild_drug_catalog(collection):
+    """Recomputes the whole catalog from the collection; returns the number of drugs."""
+    catalog = drug_catalog_collection(collection)
+    totals = computed_catalog(collection)
+    catalog.delete_many({})
+    docs = [{"_id": name, "reports": r, "count": n, "suspect": s} for name, (r, n, s) in totals.items()]
+    for start in range(0, len(docs), 10_000):
+        catalog.insert_many(docs[start:start + 10_000], ordered=False)
+    ensure_catalog_indexes(catalog)
+    return len(docs)
+
+
+def catalog_distinct_drugs(collection):
+    return [doc["_id"] for doc in drug_catalog_collection(collection).find({}, {"_id": 1}).sort("_id", 1)]
+
+
+def catalog_aspirin_reports(collection):
+    doc = drug_catalog_collection(collection).find_one({"_id": "ASPIRIN"}, {"reports": 1})
+    return doc["reports"] if doc else 0
+
+
+def catalog_top_suspect_drugs(collection):
+    cursor = drug_catalog_collection(collection).find({"suspect": {"$gt": 0}}, {"suspect": 1}).sort("suspect", -1)
+    return [{"_id": doc["_id"], "count": doc["suspect"]} for doc in cursor]
+
+
+# Same results as MONGO_QUERIES (src/db_mongo/queries.py), read from the catalog
+CATALOG_QUERIES = {
+    "Q2": catalog_distinct_drugs,
+    "Q3": catalog_aspirin_reports,
+    "Q7": catalog_top_suspect_drugs,
+}
+
+
+def check_drug_catalog(collection):
+    """[(medicinalproduct, stored, expected)] for every drug whose catalog entry differs from the
+    collection (None for a missing entry). Empty means consistent."""
+    stored = {doc["_id"]: (doc["reports"], doc["count"], doc["suspect"])
+              for doc in drug_catalog_collection(collection).find()}
+    expected = computed_catalog(collection)
+    return [(name, stored.get(name), expected.get(name)) for name in stored.keys() | expected.keys()
+            if stored.get(name) != expected.get(name)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uri", default="mongodb://localhost:27017", help="MongoDB URI")
+    parser.add_argument("--db", default="openfda_converted", help="MongoDB database name")
+    parser.add_argument("--collection", default="full_reports", help="Report collection name")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute the drug catalog from the reports")
+    parser.add_argument("--check", action="store_true", help="Compare the drug catalog with the reports")
+    parser.add_argument("--query", choices=sorted(CATALOG_QUERIES), help="Print one query's result from the catalog")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    client = MongoClient(args.uri)
+    collection = client[args.db][args.collection]
+    if args.rebuild:
+        logging.info(f"Rebuilt {drug_catalog_collection(collection).name}: {rebuild_drug_catalog(collection)} drugs")
+    if args.query:
+        result = CATALOG_QUERIES[args.query](collection)
+        for row in result if isinstance(result, list) else [result]:
+            print(row)
+    if args.check:
+        mismatches = check_drug_catalog(collection)
+        for name, stored, expected in mismatches[:20]:
+            print(f"{name!r}\tstored={stored}\texpected={expected}")
+        client.close()
+        if mismatches:
+            sys.exit(f"{len(mismatches)} catalog entries differ from the reports; rerun with --rebuild")
+        print("Drug catalog matches the reports")
+    else:
+        client.close()
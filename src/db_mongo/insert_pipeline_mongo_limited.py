@@ -10,173 +10,380 @@ import argparse
 import os
 import sys
 import logging
-import re
 import json
-from datetime import datetime
-from pymongo import MongoClient, errors
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pymongo import MongoClient, ReplaceOne, errors
 
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
-from src.parser.iterate_reports import iterate_reports_ijson
+from src.parser.iterate_reports import iterate_report_positions, IJSON_BACKEND
+from src.parser.checkpoint import Checkpoint
+from src.parser.incremental import content_hash, classify, NEW, CHANGED, UNCHANGED
+from src.parser.normalize import (
+    safe_int_or_raw as safe_int, safe_float_or_raw as safe_float, normalize_date_iso,
+    extract_case_event_datetime as extract_case_event_date)
+from src.parser.parallel_reader import iterate_reports_parallel
+from src.parser.metrics import NULL_METRICS, add_metrics_arguments, metrics_from_args
+from src.db_mongo.transform import compile_transformer
+from src.db_mongo.overflow import write_overflow, overflowed_ids, delete_chunks
+from src.db_mongo.drug_catalog import (
+    drug_catalog_collection, drug_contributions, previous_contributions, update_drug_catalog,
+    ensure_catalog_indexes, rebuild_drug_catalog)
 
-def safe_int(val):
-    try: return int(val)
-    except: return val
 
-def safe_float(val):
-    try: return float(val)
-    except: return val
+# Compiled once from the conversion spec in src/db_mongo/transform.py
+transform_report = compile_transformer(
+    {"int": safe_int, "float": safe_float, "date": normalize_date_iso},
+    extract_case_event_date,
+)
 
-def normalize_date_iso(date_str):
-    if not isinstance(date_str, str) or not date_str.isdigit():
-        return None
-    try:
-        if len(date_str) == 8:
-            return datetime.strptime(date_str, "%Y%m%d")
-        elif len(date_str) == 6:
-            return datetime.strptime(date_str + "01", "%Y%m%d")
-        elif len(date_str) == 4:
-            return datetime.strptime(date_str + "0101", "%Y%m%d")
-    except ValueError:
-        return None
-    return None
-
-def extract_case_event_date(text):
-    if isinstance(text, str):
-        match = re.search(r"CASE EVENT DATE:\s*(\d{8})", text)
-        if match:
-            return normalize_date_iso(match.group(1))
-    return None
-
-
-def set_nested_safe(obj, keys, converter):
+
+OVERSIZED_LOG = "reports/evaluation_results/oversized_reports_skipped.json"
+
+# Secondary indexes for the benchmark queries (--indexes); safetyreportid is always unique-indexed
+QUERY_INDEXES = [
+    [("patient.drug.medicinalproduct", 1)],  # Q3, Q9
+    [("serious", 1), ("receivedate", 1)],  # Q4, Q9, Q13
+    [("patient.reaction.reactionmeddrapt", 1)],
+]
+
+# Server-side "document too large" error codes (BSONObjectTooLarge and update-size variants)
+TOO_LARGE_CODES = {10334, 17419, 17420}
+
+
+def record_oversized(rid):
+    logging.warning(f"Skipped oversized report {rid}")
+    os.makedirs(os.path.dirname(OVERSIZED_LOG), exist_ok=True)
+    with open(OVERSIZED_LOG, "a") as f:
+        f.write(json.dumps({"safetyreportid": rid}) + "\n")
+
+
+def store_oversized(collection, rid, document, overflow):
+    """Handles a report over the BSON limit: stored as header + chunks with --overflow
+    (src/db_mongo/overflow.py), otherwise skipped and logged. Returns True if it was stored."""
+    if overflow:
+        try:
+            write_overflow(collection, document)
+            return True
+        except errors.DocumentTooLarge:
+            logging.warning(f"Header of report {rid} is still over the limit without its drugs and reactions")
+    record_oversized(rid)
+    return False
+
+
+def ensure_unique_id_index(collection):
+    collection.create_index("safetyreportid", unique=True)
+
+
+def create_query_indexes(collection):
+    """Builds QUERY_INDEXES; run after the bulk load so inserts do not maintain them."""
+    for keys in QUERY_INDEXES:
+        start = time.perf_counter()
+        name = collection.create_index(keys)
+        logging.info(f"Index {name} ready in {time.perf_counter() - start:.1f} s")
+
+
+def ingest_collection(db, collection_name):
+    """Per-report {_id: safetyreportid, version, hash} state used by --incremental."""
+    return db[f"{collection_name}_ingest"]
+
+
+def generation_collection(db):
+    """{_id: collection name, generation: n, database_id: random}, bumped after every batch that
+    wrote reports; query result caches (src/analytics/query_cache.py) key on both, since the
+    counter starts over when the database is dropped."""
+    return db["ingest_generation"]
+
+
+def bump_generation(collection):
+    generation_collection(collection.database).update_one(
+        {"_id": collection.name}, {"$inc": {"generation": 1}, "$setOnInsert": {"database_id": uuid.uuid4().hex}},
+        upsert=True)
+
+
+def read_generation(collection):
+    """(database id, ingest generation); (None, 0) before the first load."""
+    doc = generation_collection(collection.database).find_one({"_id": collection.name})
+    return (doc.get("database_id"), doc["generation"]) if doc else (None, 0)
+
+
+def select_changed(collection, ingest, batch):
+    """Drops unchanged and stale reports from `batch` (see src/parser/incremental.py) with one
+    $in lookup per batch. Returns (changed batch, {rid: (version, hash)})."""
+    rids = list(batch)
+    states = {rid: (batch[rid].get("safetyreportversion"), content_hash(batch[rid])) for rid in rids}
+    stored = {doc["_id"]: (doc.get("version"), doc.get("hash")) for doc in ingest.find({"_id": {"$in": rids}})}
+    legacy = [rid for rid in rids if rid not in stored]
+    if legacy:
+        # Loaded before the ingest collection existed: only the version is known
+        for doc in collection.find({"safetyreportid": {"$in": legacy}}, {"safetyreportid": 1, "safetyreportversion": 1}):
+            stored[doc["safetyreportid"]] = (doc.get("safetyreportversion"), None)
+    changed = {}
+    for rid in rids:
+        status = classify(stored.get(rid), *states[rid])
+        if status in (NEW, CHANGED):
+            changed[rid] = batch[rid]
+        elif status == UNCHANGED and stored[rid][1] is None:
+            changed[rid] = batch[rid]  # rewrite legacy reports once so their hash gets recorded
+    logging.debug(f"Incremental batch: {len(changed)} of {len(rids)} reports new or changed")
+    return changed, states
+
+
+def write_documents(collection, batch, overflow=False):
+    """Sends one unordered bulk_write of ReplaceOne upserts. `batch` maps safetyreportid to
+    its document (a later duplicate in the same batch replaces the earlier one). Oversized
+    documents are pulled out of the errors and chunked (overflow=True) or logged; returns the
+    rids that were not written. With overflow=True, chunked reports replaced by a normal-size
+    copy have their chunks deleted."""
+    rids = list(batch)
+    previously_chunked = overflowed_ids(collection, rids) if overflow else set()
+    failed, chunked = set(), set()
+    ops = [ReplaceOne({"safetyreportid": rid}, batch[rid], upsert=True) for rid in rids]
     try:
-        for k in keys[:-1]:
-            obj = obj.get(k, {}) if isinstance(obj, dict) else {}
-        if isinstance(obj, dict) and keys[-1] in obj:
-            original = obj[keys[-1]]
-            converted = converter(original)
-            obj[keys[-1]] = converted
-            logging.debug(f"✅ Converted {'.'.join(keys)}: {original} → {converted}")
-        else:
-            logging.debug(f"⚠️ Key {keys[-1]} not in object for {'.'.join(keys)}")
-    except Exception as e:
-        logging.warning(f"Failed to convert {'.'.join(keys)}: {e}")
-
-def transform_report(report):
-    # Convert safetyreportid explicitly
-    report["safetyreportid"] = safe_int(report.get("safetyreportid"))
-
-    # -------- Top-level or nested fields (non-list paths) --------
-    for path, func in [
-        (['patient', 'patientagegroup'], safe_int),
-        (['patient', 'patientonsetage'], safe_int),
-        (['patient', 'patientonsetageunit'], safe_int),
-        (['patient', 'patientsex'], safe_int),
-        (['patient', 'patientweight'], safe_float),
-        (['safetyreportversion'], safe_int),
-        (['receivedateformat'], safe_int),
-        (['receiptdateformat'], safe_int),
-        (['transmissiondateformat'], safe_int),
-        (['reporttype'], safe_int),
-        (['fulfillexpeditecriteria'], safe_int),
-        (['serious'], safe_int),
-        (['seriousnessdeath'], safe_int),
-        (['seriousnesslifethreatening'], safe_int),
-        (['seriousnesshospitalization'], safe_int),
-        (['seriousnessdisabling'], safe_int),
-        (['seriousnesscongenitalanomali'], safe_int),
-        (['seriousnessother'], safe_int),
-        (['duplicate'], safe_int),
-        (['primarysource', 'qualification'], safe_int),
-        (['sender', 'sendertype'], safe_int),
-        (['receiver', 'receivertype'], safe_int),
-    ]:
-        set_nested_safe(report, path, func)
-
-    # -------- Dates (normalize) --------
-    for date_path in [
-        ['receivedate'], ['receiptdate'], ['transmissiondate']
-    ]:
-        set_nested_safe(report, date_path, normalize_date_iso)
-
-    # -------- Extract case_event_date_extracted --------
-    summary = report.get("patient", {}).get("summary", {})
-    if isinstance(summary, dict):
-        narrative = summary.get("narrativeincludeclinical")
-        extracted = extract_case_event_date(narrative)
-        if extracted:
-            summary["case_event_date_extracted"] = extracted
-            logging.debug(f"Extracted case_event_date: {extracted}")
-
-    # -------- patient.drug (list of dicts) --------
-    for drug in report.get("patient", {}).get("drug", []):
-        for path, func in [
-            (["drugcharacterization"], safe_int),
-            (["drugauthorizationnumb"], safe_int),
-            (["drugadministrationroute"], safe_int),
-            (["actiondrug"], safe_int),
-            (["drugadditional"], safe_int),
-            (["drugintervaldosagedefinition"], safe_int),
-            (["drugcumulativedosagenumb"], safe_float),
-            (["drugcumulativedosageunit"], safe_int),
-            (["drugenddateformat"], safe_int),
-            (["drugintervaldosageunitnumb"], safe_float),
-            (["drugrecurreadministration"], safe_int),
-            (["drugseparatedosagenumb"], safe_float),
-            (["drugstartdateformat"], safe_int),
-            (["drugstructuredosagenumb"], safe_float),
-            (["drugstructuredosageunit"], safe_int),
-            (["drugtreatmentduration"], safe_float),
-            (["drugtreatmentdurationunit"], safe_int),
-            (["drugstartdate"], normalize_date_iso),
-            (["drugenddate"], normalize_date_iso),
-        ]:
-            set_nested_safe(drug, path, func)
-
-    # -------- patient.reaction (list of dicts) --------
-    for reaction in report.get("patient", {}).get("reaction", []):
-        set_nested_safe(reaction, ["reactionmeddraversionpt"], safe_float)
-        set_nested_safe(reaction, ["reactionoutcome"], safe_int)
-
-    return report
-
-
-def insert_reports(db, collection_name, reports, limit=None):
+        collection.bulk_write(ops, ordered=False)
+    except errors.DocumentTooLarge:
+        # Raised client-side before anything is sent for the op; redo this batch one by one
+        for rid in rids:
+            try:
+                collection.replace_one({"safetyreportid": rid}, batch[rid], upsert=True)
+            except errors.DocumentTooLarge:
+                if store_oversized(collection, rid, batch[rid], overflow):
+                    chunked.add(rid)
+                else:
+                    failed.add(rid)
+            except errors.PyMongoError as e:
+                logging.error(f"Failed to insert report {rid}: {e}")
+                failed.add(rid)
+    except errors.BulkWriteError as bwe:
+        for err in bwe.details.get("writeErrors", []):
+            rid = rids[err["index"]]
+            if err.get("code") in TOO_LARGE_CODES:
+                if store_oversized(collection, rid, batch[rid], overflow):
+                    chunked.add(rid)
+                    continue
+            else:
+                logging.error(f"Failed to insert report {rid}: {err.get('errmsg')}")
+            failed.add(rid)
+    delete_chunks(collection, previously_chunked - failed - chunked)
+    return failed
+
+
+def write_batch(collection, batch, ingest=None, overflow=False, catalog=None):
+    """Writes a batch (see write_documents); returns the number of reports written. With an
+    ingest collection only new or changed reports are written, and their state is recorded.
+    With a drug catalog (src/db_mongo/drug_catalog.py), the drugs of the reports' previous
+    copies are read first and the catalog gets the difference. Batches that wrote anything
+    bump the collection's ingest generation. Both happen before the catalog update, so a
+    failed update leaves only the catalog behind (drug_catalog.py --rebuild) and is re-raised."""
+    states = None
+    if ingest is not None:
+        batch, states = select_changed(collection, ingest, batch)
+        if not batch:
+            return 0
+    if catalog is not None:
+        old = previous_contributions(collection, batch)
+    failed = write_documents(collection, batch, overflow)
+    stored = [rid for rid in batch if rid not in failed]
+    if states is not None and stored:
+        ingest.bulk_write([ReplaceOne({"_id": rid}, {"version": states[rid][0], "hash": states[rid][1]}, upsert=True)
+                           for rid in stored], ordered=False)
+    if stored:
+        bump_generation(collection)
+    if catalog is not None:
+        try:
+            update_drug_catalog(catalog, [old[rid] for rid in stored if rid in old],
+                                [drug_contributions(batch[rid]) for rid in stored])
+        except errors.PyMongoError:
+            logging.error(f"{catalog.name} is out of date; run src/db_mongo/drug_catalog.py --rebuild")
+            raise
+    return len(stored)
+
+
+def timed_write_batch(metrics, collection, batch, ingest=None, overflow=False, catalog=None):
+    """write_batch, with its latency and the documents written reported to `metrics`."""
+    if not metrics.enabled:
+        return write_batch(collection, batch, ingest, overflow, catalog)
+    start = time.perf_counter()
+    written = write_batch(collection, batch, ingest, overflow, catalog)
+    metrics.observe("write", time.perf_counter() - start)
+    metrics.add_rows(collection.name, written)
+    return written
+
+
+def insert_reports(db, collection_name, reports, limit=None, checkpoint=None, batch_size=1000, ingest=None,
+                   metrics=NULL_METRICS, overflow=False, catalog=None):
+    """Upserts reports with unordered bulk writes of `batch_size` documents; returns the number
+    written. With a Checkpoint (whose track() feeds `reports`), the position is saved after
+    every batch; a batch that fails is re-raised before the checkpoint moves past it, so
+    --resume retries it. With an `ingest` collection (--incremental), unchanged reports are skipped."""
     collection = db[collection_name]
+    ensure_unique_id_index(collection)
+    transform = metrics.timed_call("transform", transform_report)
     inserted = 0
-    for i, report in enumerate(reports):
-        if limit and inserted >= limit:
-            break
-        report = transform_report(report)
+    pending = 0
+    batch = {}
+    for report in reports:
+        report = transform(report)
         rid = report.get("safetyreportid")
         if not rid:
             logging.warning("Skipping report with missing ID.")
             continue
+        batch[rid] = report
+        pending += 1
+        if len(batch) >= batch_size or (limit and inserted + pending >= limit):
+            try:
+                with metrics.stage("write"):
+                    written = timed_write_batch(metrics, collection, batch, ingest, overflow, catalog)
+            except errors.PyMongoError as e:
+                logging.error(f"Failed to insert batch of {len(batch)} reports: {e}")
+                raise
+            inserted += written
+            metrics.count(written)
+            batch = {}
+            pending = 0
+            if checkpoint:
+                checkpoint.save()
+            logging.info(f"Inserted {inserted} reports so far...")
+            if limit and inserted >= limit:
+                break
+    if batch:
         try:
-            collection.replace_one({"safetyreportid": rid}, report, upsert=True)
-            inserted += 1
-            if inserted % 1000 == 0:
-                logging.info(f"Inserted {inserted} reports so far...")
-        except errors.DocumentTooLarge:
-            logging.warning(f"Skipped oversized report {rid}")
-            os.makedirs("reports/evaluation_results", exist_ok=True)
-            with open("reports/evaluation_results/oversized_reports_skipped.json", "a") as f:
-                f.write(json.dumps({"safetyreportid": rid}) + "\n")
-            continue
+            with metrics.stage("write"):
+                written = timed_write_batch(metrics, collection, batch, ingest, overflow, catalog)
         except errors.PyMongoError as e:
-            logging.error(f"Failed to insert report {rid}: {{e}}")
+            logging.error(f"Failed to insert batch of {len(batch)} reports: {e}")
+            raise
+        inserted += written
+        metrics.count(written)
 
-    logging.info(f"Inserted or updated {{inserted}} reports.")
+    logging.info(f"Inserted or updated {inserted} reports.")
+    return inserted
 
-def main(uri, db_name, collection_name, json_path, limit):
-    client = MongoClient(uri)
+def insert_reports_concurrent(db, collection_name, reports, limit=None, checkpoint=None, batch_size=1000,
+                              concurrency=4, ingest=None, metrics=NULL_METRICS, overflow=False, catalog=None):
+    """Like insert_reports, but keeps up to `concurrency` bulk_write batches in flight on a thread
+    pool (sharing the client's connection pool) while the next batch is parsed and transformed.
+    Batches are acknowledged in submission order, so checkpoints only cover finished batches; a
+    failed batch is re-raised without saving one. A batch sharing reports with one in flight
+    waits for it to finish, so a later copy of a report is never overwritten by an earlier one
+    (and drug catalog deltas are taken against the copy actually stored)."""
+    collection = db[collection_name]
+    ensure_unique_id_index(collection)
+    transform = metrics.timed_call("transform", transform_report)
+    inserted = 0
+    submitted = 0
+    in_flight = deque()  # (future, checkpoint snapshot taken when the batch was submitted, rids)
+
+    def collect_oldest():
+        nonlocal inserted
+        future, state, _ = in_flight.popleft()
+        try:
+            with metrics.stage("write_wait"):  # main thread blocked on the oldest batch
+                written = future.result()
+        except errors.PyMongoError as e:
+            logging.error(f"Failed to insert batch: {e}")
+            raise
+        inserted += written
+        metrics.count(written)
+        if checkpoint:
+            checkpoint.save(state)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        def submit(batch):
+            nonlocal submitted
+            if len(in_flight) >= concurrency:
+                collect_oldest()  # backpressure: wait for the oldest batch before sending another
+            # A report is never in two writes at once: unordered batches could land out of order
+            while in_flight and any(rids & batch.keys() for _, _, rids in in_flight):
+                collect_oldest()
+            in_flight.append((pool.submit(timed_write_batch, metrics, collection, batch, ingest, overflow, catalog),
+                              checkpoint.state() if checkpoint else None, batch.keys()))
+            submitted += len(batch)
+            if submitted % (batch_size * 10) < batch_size:
+                logging.info(f"Submitted {submitted} reports so far...")
+
+        batch = {}
+        for report in reports:
+            report = transform(report)
+            rid = report.get("safetyreportid")
+            if not rid:
+                logging.warning("Skipping report with missing ID.")
+                continue
+            batch[rid] = report
+            if len(batch) >= batch_size or (limit and submitted + len(batch) >= limit):
+                submit(batch)
+                batch = {}
+                if limit and submitted >= limit:
+                    break
+        if batch:
+            submit(batch)
+        while in_flight:
+            collect_oldest()
+
+    logging.info(f"Inserted or updated {inserted} reports.")
+    return inserted
+
+
+def main(uri, db_name, collection_name, json_path, limit, readers=1, unordered=False,
+         checkpoint_path=None, resume=False, batch_size=1000, concurrency=1, incremental=False,
+         metrics=NULL_METRICS, metrics_json=None, overflow=False, drug_catalog=False, indexes=False):
+    client = MongoClient(uri, maxPoolSize=max(100, concurrency))
     db = client[db_name]
-    logging.info(f"Connected to MongoDB database: {{db_name}}, collection: {{collection_name}}")
-    reports = iterate_reports_ijson(json_path)
-    insert_reports(db, collection_name, reports, limit=limit)
+    logging.info(f"Connected to MongoDB database: {db_name}, collection: {collection_name}")
+    logging.info(f"ijson backend: {IJSON_BACKEND}")
+
+    # Checkpoints track file order, so they are only kept for ordered reads
+    checkpoint = None
+    if not unordered:
+        checkpoint_path = checkpoint_path or f"data/{db_name}.{collection_name}.checkpoint.json"
+        if resume:
+            checkpoint = Checkpoint.load(checkpoint_path, source=json_path)
+        else:
+            checkpoint = Checkpoint(checkpoint_path, source=json_path)
+    elif resume:
+        raise ValueError("--resume cannot be combined with --unordered")
+    if readers > 1:
+        # "read" is the time spent waiting for the reader processes
+        positions = metrics.timed("read", iterate_reports_parallel(json_path, readers, ordered=not unordered,
+                                                                   with_positions=True, resume=checkpoint))
+    else:
+        positions = metrics.timed("parse", iterate_report_positions(json_path, resume=checkpoint))
+    reports = checkpoint.track(positions) if checkpoint else (report for _, _, report in positions)
+    ingest = ingest_collection(db, collection_name) if incremental else None
+    catalog = None
+    if drug_catalog:
+        collection = db[collection_name]
+        catalog = drug_catalog_collection(collection)
+        if catalog.estimated_document_count() == 0 and collection.estimated_document_count() > 0:
+            # Deltas need a catalog that matches the reports already stored
+            logging.info(f"Building {catalog.name} from the existing reports...")
+            rebuild_drug_catalog(collection)
+        ensure_catalog_indexes(catalog)
+    start = time.perf_counter()
+    if concurrency > 1:
+        inserted = insert_reports_concurrent(db, collection_name, reports, limit=limit, checkpoint=checkpoint,
+                                             batch_size=batch_size, concurrency=concurrency, ingest=ingest,
+                                             metrics=metrics, overflow=overflow, catalog=catalog)
+    else:
+        inserted = insert_reports(db, collection_name, reports, limit=limit, checkpoint=checkpoint,
+                                  batch_size=batch_size, ingest=ingest, metrics=metrics, overflow=overflow,
+                                  catalog=catalog)
+    elapsed = time.perf_counter() - start
+    logging.info(f"Throughput: {inserted} reports in {elapsed:.1f} s ({inserted / elapsed if elapsed else 0:.0f} reports/sec,"
+                 f" batch_size={batch_size}, concurrency={concurrency})")
+    positions.close()  # stops reader processes if --limit ended the load early
+    if indexes:
+        create_query_indexes(db[collection_name])
+    if checkpoint:
+        if not (limit and inserted >= limit):
+            checkpoint.finish()
+        checkpoint.save()
     client.close()
     logging.info("MongoDB connection closed.")
+    metrics.finish(metrics_json)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
@@ -185,9 +392,26 @@ if __name__ == "__main__":
     parser.add_argument("--collection", default="full_reports", help="Target collection name")
     parser.add_argument("--json_path", default="data/raw/source_data", help="Path to JSON directory")
     parser.add_argument("--limit", type=int, default=None, help="Maximum number of reports to insert")
+    parser.add_argument("--readers", type=int, default=1, help="Processes parsing JSON files in parallel")
+    parser.add_argument("--unordered", action="store_true", help="With --readers, insert reports in whatever order files finish")
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint file (default: data/<db>.<collection>.checkpoint.json)")
+    parser.add_argument("--resume", action="store_true", help="Skip files/reports loaded by the previous run")
+    parser.add_argument("--batch_size", type=int, default=1000, help="Reports per unordered bulk_write")
+    parser.add_argument("--concurrency", type=int, default=1, help="bulk_write batches kept in flight at once")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only write reports that are new or changed since the last load (state in <collection>_ingest)")
+    add_metrics_arguments(parser)
+    parser.add_argument("--overflow", action="store_true",
+                        help="Store reports over 16 MB as a header plus chunked drugs/reactions in <collection>_chunks")
+    parser.add_argument("--drug_catalog", action="store_true",
+                        help="Maintain per-drug report counts in <collection>_drug_catalog during the load")
+    parser.add_argument("--indexes", action="store_true",
+                        help="Build the query indexes (drug name, serious+receivedate, reaction term) after the load")
     parser.add_argument("--verbose", action="store_true", help="Enable debug logging") # added for debugging
     args = parser.parse_args()
 
     # logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
     logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
-    main(args.uri, args.db, args.collection, args.json_path, args.limit)
+    main(args.uri, args.db, args.collection, args.json_path, args.limit, args.readers, args.unordered,
+         args.checkpoint, args.resume, args.batch_size, args.concurrency, args.incremental,
+         metrics_from_args("mongo", args), args.metrics_json, args.overflow, args.drug_catalog, args.indexes)
@@ -0,0 +1,143 @@
+"""
+Overflow storage for reports over MongoDB's 16 MB document limit (--overflow on the loader).
+
+The report header (everything except patient.drug and patient.reaction) stays in the main
+collection with an `_overflow` marker holding the array lengths. The arrays go to
+`<collection>_chunks` in ordered chunks of at most CHUNK_BYTES of BSON each:
+
+    {report_id, field: "drug" | "reaction", seq, start, items: [...]}
+
+Queries on header fields never read the chunks. read_report() / find_reports() return headers
+whose arrays are ChunkedArray stand-ins that fetch their chunks only when iterated or indexed.
+"""
+
+import logging
+from collections.abc import Sequence
+
+import bson
+
+OVERFLOW_FIELDS = ("drug", "reaction")  # patient.<field> arrays moved out of the header
+CHUNK_BYTES = 4 * 1024 * 1024  # BSON budget per chunk, well under the 16 MB limit
+MARKER = "_overflow"
+
+
+def chunks_collection(collection):
+    return collection.database[f"{collection.name}_chunks"]
+
+
+def split_report(report, chunk_bytes=CHUNK_BYTES):
+    """Returns (header, chunk documents); `report` itself is left unchanged."""
+    rid = report["safetyreportid"]
+    patient = dict(report.get("patient") or {})
+    header = {**report, "patient": patient}
+    lengths = {}
+    chunks = []
+    for field in OVERFLOW_FIELDS:
+        items = patient.get(field)
+        if not isinstance(items, list):
+            continue
+        del patient[field]
+        lengths[field] = len(items)
+        seq = start = size = 0
+        current = []
+        for i, item in enumerate(items):
+            item_size = len(bson.encode({"i": item}))
+            if current and size + item_size > chunk_bytes:
+                chunks.append({"report_id": rid, "field": field, "seq": seq, "start": start, "items": current})
+                seq, start, size, current = seq + 1, i, 0, []
+            current.append(item)
+            size += item_size
+        if current:
+            chunks.append({"report_id": rid, "field": field, "seq": seq, "start": start, "items": current})
+    header[MARKER] = lengths
+    return header, chunks
+
+
+def write_overflow(collection, report):
+    """Stores an oversized report as header + chunks, replacing any earlier copy; returns the
+    number of chunks. The header can still be too large (pymongo's DocumentTooLarge)."""
+    header, chunks = split_report(report)
+    rid = header["safetyreportid"]
+    store = chunks_collection(collection)
+    store.create_index([("report_id", 1), ("field", 1), ("seq", 1)], unique=True)
+    store.delete_many({"report_id": rid})
+    if chunks:
+        store.insert_many(chunks, ordered=True)
+    collection.replace_one({"safetyreportid": rid}, header, upsert=True)
+    logging.info(f"Stored oversized report {rid} as a header and {len(chunks)} chunks")
+    return len(chunks)
+
+
+def overflowed_ids(collection, rids):
+    """The ids among `rids` whose stored copy is a header with chunks."""
+    return {doc["safetyreportid"] for doc in collection.find(
+        {"safetyreportid": {"$in": list(rids)}, MARKER: {"$exists": True}}, {"safetyreportid": 1})}
+
+
+def delete_chunks(collection, rids):
+    """Removes the chunks of reports that were replaced by a normal-size copy."""
+    if rids:
+        chunks_collection(collection).delete_many({"report_id": {"$in": list(rids)}})
+
+
+class ChunkedArray(Sequence):
+    """Lazy patient.<field> of an overflowed report. Iterating streams the chunks in order;
+    the first index access loads them all and keeps them."""
+
+    def __init__(self, chunks, rid, field, length):
+        self.chunks = chunks
+        self.rid = rid
+        self.field = field
+        self.length = length
+        self._items = None
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        if self._items is not None:
+            yield from self._items
+            return
+        for chunk in self.chunks.find({"report_id": self.rid, "field": self.field}).sort("seq", 1):
+            yield from chunk["items"]
+
+    def __getitem__(self, index):
+        if self._items is None:
+            self._items = list(iter(self))
+        return self._items[index]
+
+    def __repr__(self):
+        return f"<ChunkedArray {self.field} of report {self.rid}: {self.length} items>"
+
+
+def attach_overflow(collection, report):
+    """Replaces the moved arrays of an overflowed report (if it is one) with ChunkedArrays."""
+    lengths = report.get(MARKER) if report else None
+    if lengths:
+        patient = report.setdefault("patient", {})
+        chunks = chunks_collection(collection)
+        for field, length in lengths.items():
+            patient[field] = ChunkedArray(chunks, report["safetyreportid"], field, length)
+    return report
+
+
+def read_report(collection, rid, projection=None):
+    """One report by safetyreportid; arrays of overflowed reports are loaded on first use."""
+    return attach_overflow(collection, collection.find_one({"safetyreportid": rid}, projection))
+
+
+def find_reports(collection, filter=None, projection=None):
+    """Like collection.find(), with lazy arrays for overflowed reports (the projection has to
+    keep safetyreportid and _overflow for them to be attached)."""
+    for report in collection.find(filter or {}, projection):
+        yield attach_overflow(collection, report)
+
+
+def materialize(report):
+    """Turns the lazy arrays of a report into plain lists (the full report in memory)."""
+    patient = report.get("patient")
+    if isinstance(patient, dict):
+        for field in OVERFLOW_FIELDS:
+            if isinstance(patient.get(field), ChunkedArray):
+                patient[field] = list(patient[field])
+    return report
@@ -0,0 +1,173 @@
+# Benchmark queries from notebooks/final_performance_evaluation.ipynb (MongoDB side).
+# Each takes the full_reports collection; the SQLite counterparts are in src/db_sql/queries.py.
+
+
+def count_reports(collection):
+    return collection.count_documents({})
+
+
+def distinct_drugs(collection):
+    pipeline = [
+        {"$unwind": "$patient.drug"},
+        {"$group": {"_id": "$patient.drug.medicinalproduct"}},
+        {"$sort": {"_id": 1}},
+    ]
+    return [doc["_id"] for doc in collection.aggregate(pipeline)]
+
+
+def aspirin_reports(collection):
+    return collection.count_documents({
+        "patient.drug.medicinalproduct": "ASPIRIN"
+    })
+
+
+def serious_by_year(collection):
+    pipeline = [
+        {"$match": {"serious": 1}},
+        {"$project": {"year": {"$substr": ["$receivedate", 0, 4]}}},
+        {"$group": {"_id": "$year", "count": {"$sum": 1}}},
+        {"$sort": {"_id": 1}}
+    ]
+    return list(collection.aggregate(pipeline))
+
+
+def top_reactions(collection):
+    pipeline = [
+        {"$unwind": "$patient.reaction"},
+        {"$group": {"_id": "$patient.reaction.reactionmeddrapt", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1}},
+    ]
+    return list(collection.aggregate(pipeline))
+
+
+def avg_weight_by_agegroup(collection):
+    pipeline = [
+        {"$match": {
+            "patient.patientagegroup": {"$ne": None},
+            "patient.patientweight": {"$ne": None}
+        }},
+        {"$group": {
+            "_id": "$patient.patientagegroup",
+            "avg_weight": {"$avg": "$patient.patientweight"}
+        }},
+        {"$sort": {"_id": 1}}
+    ]
+    return list(collection.aggregate(pipeline))
+
+
+def top_suspect_drugs(collection):
+    pipeline = [
+        {"$unwind": "$patient.drug"},
+        {"$match": {"patient.drug.drugcharacterization": 1}},
+        {"$group": {"_id": "$patient.drug.medicinalproduct", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1}},
+    ]
+    return list(collection.aggregate(pipeline))
+
+
+def avg_reactions_by_year(collection):
+    pipeline = [
+        {"$project": {
+            "year": {"$substr": ["$receivedate", 0, 4]},
+            "reaction_count": {"$size": {"$ifNull": ["$patient.reaction", []]}}
+        }},
+        {"$group": {"_id": "$year", "avg_reactions": {"$avg": "$reaction_count"}}},
+        {"$sort": {"_id": 1}}
+    ]
+    return list(collection.aggregate(pipeline))
+
+
+def litrefs_serious_aspirin(collection):
+    pipeline = [
+        {"$match": {"serious": 1, "patient.drug.medicinalproduct": "ASPIRIN"}},
+        {"$project": {"primarysource.literaturereference": 1}},
+        {"$unwind": "$primarysource.literaturereference"},
+        {"$group": {"_id": "$primarysource.literaturereference"}}
+    ]
+    return list(collection.aggregate(pipeline))
+
+
+def reactions_with_death_flag(collection):
+    pipeline = [
+        {"$match": {"seriousnessdeath": 1}},
+        {"$unwind": "$patient.reaction"},
+        {"$group": {"_id": "$patient.reaction.reactionmeddrapt", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1}},
+    ]
+    return list(collection.aggregate(pipeline))
+
+
+def multiple_suspect(collection):
+    pipeline = [
+        {"$project": {
+            "suspect_count": {
+                "$size": {
+                    "$filter": {
+                        "input": {"$ifNull": ["$patient.drug", []]},
+                        "as": "d",
+                        "cond": {"$eq": ["$$d.drugcharacterization", 1]}
+                    }
+                }
+            }
+        }},
+        {"$match": {"suspect_count": {"$gt": 1}}},
+        {"$count": "multi_suspect_reports"}
+    ]
+    return list(collection.aggregate(pipeline))
+
+
+def non_suspect_drugs(collection):
+    # Phase 1: All suspect drugs
+    suspect_drugs = set([
+        d["_id"] for d in collection.aggregate([
+            {"$unwind": "$patient.drug"},
+            {"$match": {"patient.drug.drugcharacterization": 1}},
+            {"$group": {"_id": "$patient.drug.medicinalproduct"}}
+        ])
+    ])
+    # Phase 2: All drugs
+    all_drugs = set([
+        d["_id"] for d in collection.aggregate([
+            {"$unwind": "$patient.drug"},
+            {"$group": {"_id": "$patient.drug.medicinalproduct"}}
+        ])
+    ])
+    # Phase 3: Set difference
+    return sorted(all_drugs - suspect_drugs, key=str)
+
+
+def dist_serious_route(collection):
+    pipeline = [
+        {"$match": {"serious": 1}},
+        {"$unwind": "$patient.drug"},
+        {"$unwind": "$patient.drug.openfda.route"},
+        {"$group": {
+            "_id": {
+                "report_id": "$safetyreportid",
+                "route": "$patient.drug.openfda.route"
+            }
+        }},
+        {"$group": {
+            "_id": "$_id.route",
+            "count": {"$sum": 1}
+        }},
+        {"$sort": {"count": -1}}
+    ]
+    return list(collection.aggregate(pipeline))
+
+
+MONGO_QUERIES = {
+    "Q1": count_reports,
+    "Q2": distinct_drugs,
+    "Q3": aspirin_reports,
+    "Q4": serious_by_year,
+    "Q5": top_reactions,
+    "Q6": avg_weight_by_agegroup,
+    "Q7": top_suspect_drugs,
+    "Q8": avg_reactions_by_year,
+    "Q9": litrefs_serious_aspirin,
+    "Q10": reactions_with_death_flag,
+    "Q11": multiple_suspect,
+    "Q12": non_suspect_drugs,
+    "Q13": dist_serious_route,
+}
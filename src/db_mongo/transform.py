@@ -0,0 +1,138 @@
+"""
+Table-driven report transformer for the MongoDB pipeline.
+
+The conversion spec below mirrors reports/evaluation_results/Conversion-Ready_Field_List.csv.
+compile_transformer() turns it into one specialized function (generated source, compiled once)
+so the per-report hot path has no per-field path walking, list building or debug logging.
+"""
+
+import logging
+from collections import OrderedDict
+
+# (path, type) for fields reached from the report root
+REPORT_FIELDS = [
+    (("patient", "patientagegroup"), "int"),
+    (("patient", "patientonsetage"), "int"),
+    (("patient", "patientonsetageunit"), "int"),
+    (("patient", "patientsex"), "int"),
+    (("patient", "patientweight"), "float"),
+    (("safetyreportversion",), "int"),
+    (("receivedateformat",), "int"),
+    (("receiptdateformat",), "int"),
+    (("transmissiondateformat",), "int"),
+    (("reporttype",), "int"),
+    (("fulfillexpeditecriteria",), "int"),
+    (("serious",), "int"),
+    (("seriousnessdeath",), "int"),
+    (("seriousnesslifethreatening",), "int"),
+    (("seriousnesshospitalization",), "int"),
+    (("seriousnessdisabling",), "int"),
+    (("seriousnesscongenitalanomali",), "int"),
+    (("seriousnessother",), "int"),
+    (("duplicate",), "int"),
+    (("primarysource", "qualification"), "int"),
+    (("sender", "sendertype"), "int"),
+    (("receiver", "receivertype"), "int"),
+    (("receivedate",), "date"),
+    (("receiptdate",), "date"),
+    (("transmissiondate",), "date"),
+]
+
+# (key, type) for every dict in patient.drug
+DRUG_FIELDS = [
+    ("drugcharacterization", "int"),
+    ("drugauthorizationnumb", "int"),
+    ("drugadministrationroute", "int"),
+    ("actiondrug", "int"),
+    ("drugadditional", "int"),
+    ("drugintervaldosagedefinition", "int"),
+    ("drugcumulativedosagenumb", "float"),
+    ("drugcumulativedosageunit", "int"),
+    ("drugenddateformat", "int"),
+    ("drugintervaldosageunitnumb", "float"),
+    ("drugrecurreadministration", "int"),
+    ("drugseparatedosagenumb", "float"),
+    ("drugstartdateformat", "int"),
+    ("drugstructuredosagenumb", "float"),
+    ("drugstructuredosageunit", "int"),
+    ("drugtreatmentduration", "float"),
+    ("drugtreatmentdurationunit", "int"),
+    ("drugstartdate", "date"),
+    ("drugenddate", "date"),
+]
+
+# (key, type) for every dict in patient.reaction
+REACTION_FIELDS = [
+    ("reactionmeddraversionpt", "float"),
+    ("reactionoutcome", "int"),
+]
+
+
+def _conversion_lines(obj, key, conv, label, indent):
+    pad = " " * indent
+    return [
+        f"{pad}if {key!r} in {obj}:",
+        f"{pad}    try:",
+        f"{pad}        {obj}[{key!r}] = {conv}({obj}[{key!r}])",
+        f"{pad}    except Exception as e:",
+        f"{pad}        _failed({label!r}, e)",
+    ]
+
+
+def transformer_source(report_fields=REPORT_FIELDS, drug_fields=DRUG_FIELDS, reaction_fields=REACTION_FIELDS):
+    """Python source of the specialized transform_report function for the given spec."""
+    lines = [
+        "def transform_report(report):",
+        "    report['safetyreportid'] = conv_int(report.get('safetyreportid'))",
+    ]
+
+    # Group nested fields by parent so each parent dict is looked up once
+    groups = OrderedDict()
+    for path, kind in report_fields:
+        groups.setdefault(path[:-1], []).append((path[-1], kind, ".".join(path)))
+    for n, (parent, fields) in enumerate(groups.items()):
+        if not parent:
+            for key, kind, label in fields:
+                lines += _conversion_lines("report", key, f"conv_{kind}", label, 4)
+            continue
+        obj = f"_o{n}"
+        lines.append(f"    {obj} = report")
+        for k in parent:
+            lines.append(f"    {obj} = {obj}.get({k!r}, {{}}) if isinstance({obj}, dict) else {{}}")
+        lines.append(f"    if isinstance({obj}, dict):")
+        for key, kind, label in fields:
+            lines += _conversion_lines(obj, key, f"conv_{kind}", label, 8)
+
+    lines += [
+        "    summary = report.get('patient', {}).get('summary', {})",
+        "    if isinstance(summary, dict):",
+        "        extracted = extract_case_event_date(summary.get('narrativeincludeclinical'))",
+        "        if extracted:",
+        "            summary['case_event_date_extracted'] = extracted",
+        "    for drug in report.get('patient', {}).get('drug', []):",
+        "        if isinstance(drug, dict):",
+    ]
+    for key, kind in drug_fields:
+        lines += _conversion_lines("drug", key, f"conv_{kind}", key, 12)
+    lines += [
+        "    for reaction in report.get('patient', {}).get('reaction', []):",
+        "        if isinstance(reaction, dict):",
+    ]
+    for key, kind in reaction_fields:
+        lines += _conversion_lines("reaction", key, f"conv_{kind}", key, 12)
+    lines.append("    return report")
+    return "\n".join(lines) + "\n"
+
+
+def _failed(label, error):
+    logging.warning(f"Failed to convert {label}: {error}")
+
+
+def compile_transformer(converters, extract_case_event_date, **spec):
+    """Compiles the conversion spec into a transform_report(report) function.
+    `converters` maps the spec types ('int', 'float', 'date') to conversion functions."""
+    namespace = {f"conv_{kind}": func for kind, func in converters.items()}
+    namespace["extract_case_event_date"] = extract_case_event_date
+    namespace["_failed"] = _failed
+    exec(compile(transformer_source(**spec), "<compiled transform_report>", "exec"), namespace)
+    return namespace["transform_report"]
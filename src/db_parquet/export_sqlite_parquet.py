@@ -0,0 +1,223 @@
+"""
+Streams the normalized SQLite schema into Parquet files for columnar (scan-and-aggregate) queries:
+- one dataset directory per table, read and written in bounded-memory chunks (row groups)
+- `report` is Hive-partitioned by receive year (report/receive_year=2014/part-0.parquet)
+- repetitive strings (reactionmeddrapt, medicinalproduct, ...) are dictionary-encoded Arrow columns
+
+Requires pyarrow. Query the result with src/db_parquet/query_duckdb.py.
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import sys
+import time
+from collections import Counter
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Loader bookkeeping, FTS shadow tables and materialized aggregates are not part of the analytical schema
+SKIP_TABLE_PREFIXES = ("sqlite_", "summary_fts", "drug_registry", "report_ingest", "ingest_generation", "agg_")
+
+# table -> (partition column name, SQL expression computing it)
+PARTITIONS = {
+    "report": ("receive_year", "SUBSTR(receivedate, 1, 4)"),
+}
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+# Low-cardinality strings stored as Arrow dictionary columns (and Parquet dictionary pages)
+DICTIONARY_COLUMNS = {
+    "reactionmeddrapt", "medicinalproduct", "activesubstancename", "drugindication", "drugseparatedosageunit",
+    "primarysourcecountry", "primarysource_reportercountry", "occurcountry", "senderorganization",
+    "receiverorganization", "duplicatesource", "product_type", "route", "brand_name", "generic_name",
+    "manufacturer_name", "pharm_class_epc", "pharm_class_cs", "pharm_class_moa", "pharm_class_pe", "substance_name",
+}
+
+# Free text that would only bloat a dictionary page before Parquet falls back to plain encoding
+NO_DICTIONARY_COLUMNS = {"narrativeincludeclinical", "literature_reference", "drugdosagetext"}
+
+DEFAULT_CHUNK_ROWS = 100_000
+
+
+def require_pyarrow():
+    if pa is None:
+        raise ImportError("The Parquet export needs pyarrow (pip install pyarrow)")
+
+
+def export_tables(conn):
+    return [name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name")
+            if not name.startswith(SKIP_TABLE_PREFIXES)]
+
+
+def arrow_type(declared):
+    declared = (declared or "").upper()
+    if "INT" in declared:
+        return pa.int64()
+    if "REAL" in declared or "FLOA" in declared or "DOUB" in declared:
+        return pa.float64()
+    if "BLOB" in declared:
+        return pa.binary()
+    return pa.string()
+
+
+def table_schema(conn, table):
+    fields = []
+    for _, name, declared, *_ in conn.execute(f"PRAGMA table_info({table})"):
+        field_type = arrow_type(declared)
+        if name in DICTIONARY_COLUMNS and field_type == pa.string():
+            field_type = pa.dictionary(pa.int32(), pa.string())
+        fields.append(pa.field(name, field_type))
+    return pa.schema(fields)
+
+
+def to_array(values, field):
+    """(Arrow array, number of values dropped) for one column chunk. SQLite columns are loosely
+    typed; values that do not fit the declared type (e.g. text in an INTEGER column) become null."""
+    value_type = field.type.value_type if pa.types.is_dictionary(field.type) else field.type
+    dropped = 0
+    try:
+        array = pa.array(values, type=value_type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+        kind = int if pa.types.is_integer(value_type) else float if pa.types.is_floating(value_type) else str
+        cleaned = [v if v is None or isinstance(v, kind) or (kind is float and isinstance(v, int)) else None
+                   for v in values]
+        dropped = sum(a is not b for a, b in zip(values, cleaned))
+        array = pa.array(cleaned, type=value_type)
+    if pa.types.is_dictionary(field.type):
+        array = array.dictionary_encode()
+    return array, dropped
+
+
+class PartitionedWriter:
+    """One ParquetWriter per partition value, opened lazily. Rows of partitioned tables are
+    buffered per value; once more than `max_buffered` rows are pending, the largest partition
+    is written out as a row group, so memory stays at about one chunk."""
+
+    def __init__(self, table_dir, schema, partition_column=None, compression="zstd", max_buffered=DEFAULT_CHUNK_ROWS):
+        self.table_dir = table_dir
+        self.schema = schema
+        self.partition_column = partition_column
+        self.compression = compression
+        self.use_dictionary = [f.name for f in schema if f.name not in NO_DICTIONARY_COLUMNS]
+        self.max_buffered = max_buffered
+        self.pending = {}  # partition value -> buffered rows
+        self.buffered = 0
+        self.writers = {}
+        self.dropped = Counter()  # column -> values exported as null
+
+    def _writer(self, value):
+        if value not in self.writers:
+            directory = self.table_dir
+            if self.partition_column:
+                directory = os.path.join(directory, f"{self.partition_column}={value}")
+            os.makedirs(directory, exist_ok=True)
+            self.writers[value] = pq.ParquetWriter(os.path.join(directory, "part-0.parquet"), self.schema,
+                                                   compression=self.compression,
+                                                   use_dictionary=self.use_dictionary)
+        return self.writers[value]
+
+    def write(self, rows, partitions=None):
+        if partitions is None:
+            self._write_rows(None, rows)
+            return
+        for row, value in zip(rows, partitions):
+            self.pending.setdefault(value or NULL_PARTITION, []).append(row)
+        self.buffered += len(rows)
+        while self.buffered > self.max_buffered:
+            self._flush_partition(max(self.pending, key=lambda v: len(self.pending[v])))
+
+    def _flush_partition(self, value):
+        group = self.pending.pop(value)
+        self.buffered -= len(group)
+        self._write_rows(value, group)
+
+    def _write_rows(self, value, rows):
+        columns = list(zip(*rows))
+        arrays = []
+        for column, field in zip(columns, self.schema):
+            array, dropped = to_array(list(column), field)
+            arrays.append(array)
+            if dropped:
+                self.dropped[field.name] += dropped
+        self._writer(value).write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        for value in list(self.pending):
+            self._flush_partition(value)
+        for writer in self.writers.values():
+            writer.close()
+        return len(self.writers)
+
+
+def export_table(conn, table, output_dir, chunk_rows=DEFAULT_CHUNK_ROWS, compression="zstd"):
+    """Streams one table into output_dir/<table>/; returns the number of rows written."""
+    schema = table_schema(conn, table)
+    table_dir = os.path.join(output_dir, table)
+    if os.path.exists(table_dir):
+        shutil.rmtree(table_dir)
+    partition_column, partition_sql = PARTITIONS.get(table, (None, None))
+    columns = ", ".join(schema.names)
+    if partition_sql:
+        columns += f", {partition_sql}"
+    writer = PartitionedWriter(table_dir, schema, partition_column, compression, max_buffered=chunk_rows)
+    cursor = conn.execute(f"SELECT {columns} FROM {table}")
+    total = 0
+    while True:
+        rows = cursor.fetchmany(chunk_rows)
+        if not rows:
+            break
+        if partition_sql:
+            writer.write([row[:-1] for row in rows], [row[-1] for row in rows])
+        else:
+            writer.write(rows)
+        total += len(rows)
+    files = writer.close()
+    for column, dropped in writer.dropped.items():
+        logging.warning(f"{table}.{column}: {dropped} values do not fit the declared type and were exported as null")
+    if not files:
+        write_empty_table(table_dir, schema, compression)
+    return total
+
+
+def write_empty_table(table_dir, schema, compression="zstd"):
+    """Schema-only file, so empty tables stay queryable."""
+    os.makedirs(table_dir, exist_ok=True)
+    pq.write_table(schema.empty_table(), os.path.join(table_dir, "part-0.parquet"), compression=compression)
+
+
+def export_database(db_path, output_dir, tables=None, chunk_rows=DEFAULT_CHUNK_ROWS, compression="zstd"):
+    """Exports every analytical table (or `tables`) and writes output_dir/_export.json with row counts."""
+    require_pyarrow()
+    conn = sqlite3.connect(db_path)
+    counts = {}
+    for table in tables or export_tables(conn):
+        start = time.perf_counter()
+        counts[table] = export_table(conn, table, output_dir, chunk_rows, compression)
+        logging.info(f"{table}: {counts[table]} rows in {time.perf_counter() - start:.1f} s")
+    conn.close()
+    with open(os.path.join(output_dir, "_export.json"), "w") as f:
+        json.dump({"source": os.path.abspath(db_path), "partitions": {t: c for t, (c, _) in PARTITIONS.items()},
+                   "row_counts": counts}, f, indent=2)
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default="sql/openfda_final_v10.db")
+    parser.add_argument("--output", default="data/parquet", help="Output directory (one subdirectory per table)")
+    parser.add_argument("--tables", nargs="*", default=None, help="Subset of tables (default: all)")
+    parser.add_argument("--chunk_rows", type=int, default=DEFAULT_CHUNK_ROWS, help="Rows per fetch / row group")
+    parser.add_argument("--compression", default="zstd", help="Parquet codec (zstd, snappy, gzip, none)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    try:
+        export_database(args.db, args.output, args.tables, args.chunk_rows, args.compression)
+    except ImportError as e:
+        sys.exit(str(e))
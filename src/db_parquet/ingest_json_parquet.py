@@ -0,0 +1,259 @@
+"""
+Direct JSON -> Parquet pipeline (no SQLite inserts):
+- reports are flattened with the SQLite pipeline's own mapping (report_to_rows), so the files
+  have the same tables, columns and types as export_sqlite_parquet.py produces
+- drug_ids come from the same DrugRegistry, kept in an in-memory SQLite database
+- rows are buffered per table and written as one row group every `row_group_rows` rows,
+  so memory is bounded by the row-group size (plus the drug catalog and per-report key sets)
+
+A repeated report id is handled like the SQLite loader's INSERT OR IGNORE: tables keyed on the
+report (report, patient_*, report_authority, patient_drug_history) keep the first row per key,
+and tables with an `id` key (reaction, summary, ...) get the rows of every copy. Requires pyarrow.
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from src.parser.iterate_reports import iterate_reports_ijson, IJSON_BACKEND
+from src.parser.parallel_reader import iterate_reports_parallel
+from src.db_sql.create_final_sql_schema_split_openfda_indexed import create_tables
+from src.db_sql.insert_final_refactored_openfda import report_to_rows, write_report_rows
+from src.db_sql.drug_registry import DrugRegistry, DEFAULT_CACHE_SIZE
+from src.db_parquet.export_sqlite_parquet import (
+    require_pyarrow, export_tables, table_schema, PartitionedWriter, PARTITIONS, write_empty_table)
+
+DEFAULT_ROW_GROUP_ROWS = 100_000
+
+# Tables whose rows are unique per key in SQLite (PRIMARY KEY / unique index + INSERT OR IGNORE);
+# the key is the whole row unless listed here
+DRUG_TABLE_KEYS = {"drug_fda_product_type": ("drug_id",)}
+
+
+class IdBitmap:
+    """Set of non-negative report ids in one bit each (12.5 MB per 100M id range)."""
+
+    def __init__(self):
+        self.bits = bytearray()
+        self.overflow = set()  # ids too large for the bitmap
+
+    def add(self, n):
+        """Adds n; returns False if it was already present."""
+        if n >= 1 << 33:
+            if n in self.overflow:
+                return False
+            self.overflow.add(n)
+            return True
+        byte, bit = divmod(n, 8)
+        if byte >= len(self.bits):
+            self.bits.extend(bytes(max(byte + 1 - len(self.bits), len(self.bits))))
+        if self.bits[byte] >> bit & 1:
+            return False
+        self.bits[byte] |= 1 << bit
+        return True
+
+
+class InstanceKeys:
+    """Set of (report id, instance index) pairs. A report's indexes are normally 0..n-1, stored
+    as n in one byte per id; other index sets (gaps, 255+ instances, huge ids) go to a dict."""
+
+    def __init__(self):
+        self.counts = bytearray()
+        self.other = {}
+
+    def add(self, n, index):
+        """Adds (n, index); returns False if it was already present."""
+        indexes = self.other.get(n)
+        if indexes is not None:
+            if index in indexes:
+                return False
+            indexes.add(index)
+            return True
+        dense = n < 1 << 27
+        count = self.counts[n] if dense and n < len(self.counts) else 0
+        if index < count:
+            return False
+        if dense and index == count < 255:
+            if n >= len(self.counts):
+                self.counts.extend(bytes(max(n + 1 - len(self.counts), len(self.counts))))
+            self.counts[n] = count + 1
+            return True
+        self.other[n] = set(range(count)) | {index}
+        return True
+
+
+class ParquetRowWriter:
+    """BatchWriter stand-in (add / add_row) that buffers rows per table and writes Parquet row groups."""
+
+    def __init__(self, output_dir, schemas, row_group_rows=DEFAULT_ROW_GROUP_ROWS, compression="zstd",
+                 report_keys=None):
+        self.output_dir = output_dir
+        self.schemas = schemas
+        self.row_group_rows = row_group_rows
+        self.compression = compression
+        self.columns = {table: schema.names for table, schema in schemas.items()}
+        self.positions = {}  # (table, fields) -> column index of every field
+        self.next_id = {table: 1 for table, names in self.columns.items() if names[0] == "id"}
+        self.drug_keys = {table: set() for table in schemas if table.startswith("drug_") and table != "drug_catalog"}
+        # Tables whose primary key is the report id (plus an instance index): a repeated report
+        # only adds rows for keys the earlier copies did not have
+        self.report_keys = {}
+        for table, key in (report_keys or {}).items():
+            positions = [self.columns[table].index(column) for column in key]
+            self.report_keys[table] = (positions, IdBitmap() if len(key) == 1 else InstanceKeys())
+        self.buffers = {table: [] for table in schemas}
+        self.writers = {}
+        self.rows_written = 0
+        for table in schemas:
+            table_dir = os.path.join(output_dir, table)
+            if os.path.exists(table_dir):
+                shutil.rmtree(table_dir)
+
+    def _writer(self, table):
+        if table not in self.writers:
+            partition_column = PARTITIONS.get(table, (None, None))[0]
+            self.writers[table] = PartitionedWriter(os.path.join(self.output_dir, table), self.schemas[table],
+                                                    partition_column, self.compression,
+                                                    max_buffered=self.row_group_rows)
+        return self.writers[table]
+
+    def add(self, table, fields, values):
+        fields = tuple(fields)
+        self.add_row(table, fields, tuple(values[f] for f in fields))
+
+    def add_row(self, table, fields, row):
+        key = (table, fields)
+        positions = self.positions.get(key)
+        if positions is None:
+            positions = self.positions[key] = [self.columns[table].index(f) for f in fields]
+        full = [None] * len(self.columns[table])
+        for position, value in zip(positions, row):
+            full[position] = value
+        if table in self.next_id:
+            full[0] = self.next_id[table]  # INTEGER PRIMARY KEY, numbered in insertion order like SQLite
+            self.next_id[table] += 1
+        if table in self.drug_keys:
+            unique = self.drug_keys[table]
+            names = DRUG_TABLE_KEYS.get(table)
+            drug_key = tuple(full[self.columns[table].index(n)] for n in names) if names else tuple(full)
+            if drug_key in unique:
+                return
+            unique.add(drug_key)
+        elif table in self.report_keys:
+            positions, seen = self.report_keys[table]
+            if not seen.add(*(full[position] for position in positions)):
+                return
+        buffer = self.buffers[table]
+        buffer.append(tuple(full))
+        if len(buffer) >= self.row_group_rows:
+            self.flush_table(table)
+
+    def flush_table(self, table):
+        rows = self.buffers[table]
+        if not rows:
+            return
+        self.buffers[table] = []
+        partitions = None
+        if table == "report":
+            receivedate = self.columns[table].index("receivedate")
+            partitions = [row[receivedate][:4] if row[receivedate] else None for row in rows]  # SUBSTR(receivedate, 1, 4)
+        self._writer(table).write(rows, partitions)
+        self.rows_written += len(rows)
+
+    def close(self):
+        for table in self.schemas:
+            self.flush_table(table)
+            if table in self.writers:
+                self.writers[table].close()
+            else:
+                write_empty_table(os.path.join(self.output_dir, table), self.schemas[table], self.compression)
+        for table, writer in self.writers.items():
+            for column, dropped in writer.dropped.items():
+                logging.warning(f"{table}.{column}: {dropped} values do not fit the declared type and were written as null")
+
+
+def report_primary_keys(conn, tables):
+    """{table: primary key columns} of the tables whose primary key starts with safetyreportid."""
+    keys = {}
+    for table in tables:
+        columns = sorted((pk, name) for _, name, _, _, _, pk in conn.execute(f"PRAGMA table_info({table})") if pk)
+        if columns and columns[0][1] == "safetyreportid":
+            keys[table] = tuple(name for _, name in columns)
+    return keys
+
+
+def main(json_path, output_dir, limit=None, workers=1, row_group_rows=DEFAULT_ROW_GROUP_ROWS, compression="zstd",
+         registry_cache=DEFAULT_CACHE_SIZE):
+    require_pyarrow()
+    logging.info(f"ijson backend: {IJSON_BACKEND}")
+    # The schema (and so the Arrow types) is taken from the SQLite DDL; the same in-memory
+    # database holds the drug registry
+    conn = sqlite3.connect(":memory:")
+    create_tables(conn)
+    schemas = {table: table_schema(conn, table) for table in export_tables(conn)}
+    registry = DrugRegistry(cache_size=registry_cache).load(conn)
+    os.makedirs(output_dir, exist_ok=True)
+    writer = ParquetRowWriter(output_dir, schemas, row_group_rows, compression, report_primary_keys(conn, schemas))
+
+    if workers > 1:
+        logging.info(f"Parsing and transforming with {workers} worker processes")
+        results = iterate_reports_parallel(json_path, workers, transform=report_to_rows)
+    else:
+        results = (report_to_rows(report) for report in iterate_reports_ijson(json_path))
+    seen = IdBitmap()
+    inserted = repeated = 0
+    start = time.perf_counter()
+    for rid, _, rows, drugs, error in results:
+        if rows is None:
+            print(f"skipped report {rid}")
+            continue
+        if rid is None or rid < 0:
+            logging.error(f"Error on report {rid}: no usable safetyreportid")
+            continue
+        if not seen.add(rid):
+            repeated += 1
+        write_report_rows(writer, registry, rid, rows, drugs)
+        if error:
+            logging.error(f"Error on report {rid}: {error}")
+            continue
+        inserted += 1
+        if inserted % 10000 == 0:
+            logging.info(f"Converted {inserted} reports...")
+        if limit and inserted >= limit:
+            break
+    if hasattr(results, "close"):
+        results.close()
+    writer.close()
+    conn.close()
+    elapsed = time.perf_counter() - start
+    with open(os.path.join(output_dir, "_export.json"), "w") as f:
+        json.dump({"source": os.path.abspath(json_path), "partitions": {t: c for t, (c, _) in PARTITIONS.items()},
+                   "reports": inserted, "repeated_reports": repeated}, f, indent=2)
+    logging.info(f"Finished. Converted {inserted} reports ({writer.rows_written} rows) in {elapsed:.1f} s"
+                 f" ({inserted / elapsed if elapsed else 0:.0f} reports/sec); {repeated} with a repeated report id.")
+    return inserted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--json_path", default="data/raw/source_data")
+    parser.add_argument("--output", default="data/parquet", help="Output directory (one subdirectory per table)")
+    parser.add_argument("--limit", type=int, default=None, help="Max number of reports to convert")
+    parser.add_argument("--workers", type=int, default=1, help="Processes parsing/transforming JSON files in parallel")
+    parser.add_argument("--row_group_rows", type=int, default=DEFAULT_ROW_GROUP_ROWS, help="Rows buffered per table / row group")
+    parser.add_argument("--compression", default="zstd", help="Parquet codec (zstd, snappy, gzip, none)")
+    parser.add_argument("--registry_cache", type=int, default=DEFAULT_CACHE_SIZE,
+                        help="Drug names / openFDA variants kept in memory by the drug registry")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    try:
+        main(args.json_path, args.output, args.limit, args.workers, args.row_group_rows, args.compression,
+             args.registry_cache)
+    except ImportError as e:
+        sys.exit(str(e))
@@ -0,0 +1,111 @@
+"""
+DuckDB query backend over the Parquet export (src/db_parquet/export_sqlite_parquet.py).
+
+Every exported table is exposed as a view with its SQLite name, so the benchmark queries in
+src/db_sql/queries.py run unchanged. Use from the notebook:
+
+    from src.db_parquet.query_duckdb import ParquetBackend
+    backend = ParquetBackend("data/parquet")
+    backend.query_df(SQLITE_QUERIES["Q5"])
+
+Requires duckdb (and pyarrow for query_arrow / pandas for query_df).
+"""
+
+import argparse
+import math
+import os
+import sqlite3
+import statistics
+import sys
+import time
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from src.db_sql.queries import SQLITE_QUERIES
+
+
+class ParquetBackend:
+    def __init__(self, parquet_dir, threads=None):
+        if duckdb is None:
+            raise ImportError("The Parquet query backend needs duckdb (pip install duckdb)")
+        self.parquet_dir = parquet_dir
+        self.conn = duckdb.connect()
+        if threads:
+            self.conn.execute(f"SET threads = {int(threads)}")
+        self.tables = []
+        for table in sorted(os.listdir(parquet_dir)):
+            table_dir = os.path.join(parquet_dir, table)
+            if not os.path.isdir(table_dir):
+                continue
+            pattern = os.path.join(table_dir, "**", "*.parquet").replace("'", "''")
+            self.conn.execute(f"CREATE VIEW {table} AS SELECT * FROM read_parquet('{pattern}', hive_partitioning = true)")
+            self.tables.append(table)
+
+    def query(self, sql, params=None):
+        return self.conn.execute(sql, params or []).fetchall()
+
+    def query_arrow(self, sql, params=None):
+        return self.conn.execute(sql, params or []).fetch_arrow_table()
+
+    def query_df(self, sql, params=None):
+        return self.conn.execute(sql, params or []).df()
+
+    def close(self):
+        self.conn.close()
+
+
+def time_query(run, sql, runs=3):
+    run(sql)  # warm-up (file metadata, OS page cache)
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        run(sql)
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def normalize_rows(rows):
+    """Order-insensitive, float-tolerant form of a result set for cross-engine comparison."""
+    def value(v):
+        if isinstance(v, float):
+            return round(v, 6) if not math.isnan(v) else "nan"
+        return v
+    return sorted((tuple(value(v) for v in row) for row in rows), key=repr)
+
+
+def compare_with_sqlite(backend, db_path, queries=None, runs=3):
+    """Times every query on DuckDB/Parquet and SQLite; returns rows of
+    (query id, duckdb seconds, sqlite seconds, results equal)."""
+    queries = queries or SQLITE_QUERIES
+    sqlite_conn = sqlite3.connect(db_path)
+    sqlite_run = lambda sql: sqlite_conn.execute(sql).fetchall()
+    report = []
+    for qid, sql in queries.items():
+        same = normalize_rows(backend.query(sql)) == normalize_rows(sqlite_run(sql))
+        report.append((qid, time_query(backend.query, sql, runs), time_query(sqlite_run, sql, runs), same))
+    sqlite_conn.close()
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--parquet_dir", default="data/parquet")
+    parser.add_argument("--queries", nargs="*", default=None, help="Subset of query ids, e.g. Q4 Q5 Q7")
+    parser.add_argument("--runs", type=int, default=3, help="Timed runs per query (median is reported)")
+    parser.add_argument("--compare_sqlite", default=None, help="SQLite database to time and check the results against")
+    args = parser.parse_args()
+
+    queries = {q: SQLITE_QUERIES[q] for q in args.queries} if args.queries else SQLITE_QUERIES
+    backend = ParquetBackend(args.parquet_dir)
+    if args.compare_sqlite:
+        print(f"{'query':<6}{'duckdb ms':>12}{'sqlite ms':>12}{'speedup':>9}  same result")
+        for qid, duck_s, sqlite_s, same in compare_with_sqlite(backend, args.compare_sqlite, queries, args.runs):
+            print(f"{qid:<6}{duck_s * 1000:12.1f}{sqlite_s * 1000:12.1f}{sqlite_s / duck_s if duck_s else 0:8.1f}x  {same}")
+    else:
+        for qid, sql in queries.items():
+            print(f"{qid:<6}{time_query(backend.query, sql, args.runs) * 1000:10.1f} ms")
+    backend.close()
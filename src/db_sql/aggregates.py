@@ -0,0 +1,93 @@
+"""
+Materialized aggregates for the dashboard queries Q4-Q7 (serious reports by year, top reactions,
+average weight by age group, top suspect drugs).
+
+The agg_* tables are kept in sync by triggers while the loader inserts or replaces reports, so
+each query reads a few hundred precomputed rows instead of aggregating the raw tables. Create
+them with --aggregates on the schema script (maintained during ingestion) or on the insertion
+script (built after the load), or with --rebuild here; --check compares them with the raw tables.
+"""
+
+import argparse
+import math
+import os
+import sqlite3
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from src.db_sql.create_final_sql_schema_split_openfda_indexed import (
+    AGGREGATE_SOURCES, has_aggregate_tables, create_aggregate_tables)
+
+# Same results as SQLITE_QUERIES (src/db_sql/queries.py), read from the agg_* tables
+AGGREGATE_QUERIES = {
+    "Q4": """
+        SELECT year, count
+        FROM agg_serious_by_year
+        ORDER BY year
+    """,
+    "Q5": """
+        SELECT reactionmeddrapt, count
+        FROM agg_reaction_count
+        ORDER BY count DESC
+    """,
+    "Q6": """
+        SELECT patientagegroup, weight_sum / NULLIF(weight_count, 0) AS avg_weight
+        FROM agg_weight_by_agegroup
+        ORDER BY patientagegroup
+    """,
+    "Q7": """
+        SELECT dc.medicinalproduct, SUM(a.count) AS suspect_count
+        FROM agg_suspect_drug a
+        JOIN drug_catalog dc ON a.drug_id = dc.drug_id
+        GROUP BY dc.medicinalproduct
+        ORDER BY suspect_count DESC
+    """,
+}
+
+
+def _same(stored, expected):
+    return all(math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6) if isinstance(a, float) or isinstance(b, float)
+               else a == b for a, b in zip(stored, expected))
+
+
+def check_aggregates(conn):
+    """Recomputes every agg_* table from the raw tables; returns [(table, key, stored, expected)]
+    for each key whose stored values differ (None for a missing row). Empty means consistent.
+    Running sums of weights are compared with a small float tolerance."""
+    mismatches = []
+    for table, select in AGGREGATE_SOURCES.items():
+        stored = {row[0]: row[1:] for row in conn.execute(f"SELECT * FROM {table}")}
+        expected = {row[0]: row[1:] for row in conn.execute(select)}
+        for key in stored.keys() | expected.keys():
+            if key not in stored or key not in expected or not _same(stored[key], expected[key]):
+                mismatches.append((table, key, stored.get(key), expected.get(key)))
+    return mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default="sql/openfda_final_v10.db")
+    parser.add_argument("--rebuild", action="store_true", help="Create the agg_* tables if missing and recompute them")
+    parser.add_argument("--check", action="store_true", help="Compare the agg_* tables with the raw tables")
+    parser.add_argument("--query", choices=sorted(AGGREGATE_QUERIES), help="Print one query's result from the aggregates")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    if args.rebuild:
+        create_aggregate_tables(conn)
+        print("Rebuilt " + ", ".join(AGGREGATE_SOURCES))
+    elif not has_aggregate_tables(conn):
+        sys.exit("The agg_* tables do not exist; rerun with --rebuild (or load with --aggregates)")
+    if args.query:
+        for row in conn.execute(AGGREGATE_QUERIES[args.query]):
+            print("\t".join(str(value) for value in row))
+    if args.check:
+        mismatches = check_aggregates(conn)
+        for table, key, stored, expected in mismatches[:20]:
+            print(f"{table}\t{key!r}\tstored={stored}\texpected={expected}")
+        conn.close()
+        if mismatches:
+            sys.exit(f"{len(mismatches)} aggregate rows differ from the raw tables; rerun with --rebuild")
+        print("Aggregates match the raw tables")
+    else:
+        conn.close()
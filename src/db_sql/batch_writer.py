@@ -0,0 +1,67 @@
+import logging
+
+from src.parser.metrics import NULL_METRICS
+
+
+# Buffered writer: collects rows per table and flushes them with executemany
+
+class BatchWriter:
+    """Collects rows per (table, columns) and writes them with cached
+    INSERT OR IGNORE statements via executemany once a buffer reaches batch_size.
+    Flush time and rows per table are reported to `metrics` (src/parser/metrics.py)."""
+
+    def __init__(self, conn, batch_size=5000, metrics=NULL_METRICS):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.metrics = metrics
+        self._statements = {}
+        self._buffers = {}
+        self.rows_written = 0
+
+    def _statement(self, table, fields):
+        key = (table, fields)
+        sql = self._statements.get(key)
+        if sql is None:
+            placeholders = ", ".join("?" for _ in fields)
+            sql = f"INSERT OR IGNORE INTO {table} ({', '.join(fields)}) VALUES ({placeholders})"
+            self._statements[key] = sql
+        return sql
+
+    def add(self, table, fields, values):
+        """Buffers one row. `values` is a dict keyed by field (same as insert_with_fields)."""
+        fields = tuple(fields)
+        self.add_row(table, fields, tuple(values[f] for f in fields))
+
+    def add_row(self, table, fields, row):
+        """Buffers one row that is already a tuple ordered like `fields`."""
+        key = (table, fields)
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = self._buffers[key] = []
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self._flush_key(key)
+
+    def _flush_key(self, key):
+        rows = self._buffers.get(key)
+        if not rows:
+            return
+        table, fields = key
+        try:
+            with self.metrics.stage("flush"):
+                self.conn.executemany(self._statement(table, fields), rows)
+        except Exception as e:
+            logging.error(f"Batch insert into {table} failed ({len(rows)} rows): {e}")
+            raise
+        self.rows_written += len(rows)
+        self.metrics.add_rows(table, len(rows))
+        self._buffers[key] = []
+
+    def flush(self):
+        # Tables are flushed in the order they were first written to
+        for key in list(self._buffers):
+            self._flush_key(key)
+
+    def commit(self):
+        self.flush()
+        self.conn.commit()
@@ -1,6 +1,271 @@
+import argparse
 import sqlite3
 
-def create_tables(conn):
+# Unique (drug_id, value) indexes that support INSERT OR IGNORE semantics on the drug_fda_* tables
+UNIQUE_INDEXES = [
+    ("idx_drug_application_number_unique", "drug_fda_application_number", "application_number"),
+    ("idx_drug_brand_name_unique", "drug_fda_brand_name", "brand_name"),
+    ("idx_drug_generic_name_unique", "drug_fda_generic_name", "generic_name"),
+    ("idx_drug_manufacturer_name_unique", "drug_fda_manufacturer_name", "manufacturer_name"),
+    ("idx_drug_product_ndc_unique", "drug_fda_product_ndc", "product_ndc"),
+    ("idx_drug_package_ndc_unique", "drug_fda_package_ndc", "package_ndc"),
+    ("idx_drug_pharm_class_epc_unique", "drug_fda_pharm_class_epc", "pharm_class_epc"),
+    ("idx_drug_pharm_class_cs_unique", "drug_fda_pharm_class_cs", "pharm_class_cs"),
+    ("idx_drug_pharm_class_moa_unique", "drug_fda_pharm_class_moa", "pharm_class_moa"),
+    ("idx_drug_pharm_class_pe_unique", "drug_fda_pharm_class_pe", "pharm_class_pe"),
+    ("idx_drug_rxcui_unique", "drug_fda_rxcui", "rxcui"),
+    ("idx_drug_unii_unique", "drug_fda_unii", "unii"),
+    ("idx_drug_route_unique", "drug_fda_route", "route"),
+    ("idx_drug_spl_id_unique", "drug_fda_spl_id", "spl_id"),
+    ("idx_drug_spl_set_id_unique", "drug_fda_spl_set_id", "spl_set_id"),
+    ("idx_drug_substance_name_unique", "drug_fda_substance", "substance_name"),
+    ("idx_drug_product_type_unique", "drug_fda_product_type", "product_type"),
+]
+
+# Optional "query" index profile for the benchmark queries (see src/db_sql/index_advisor.py)
+QUERY_INDEXES = [
+    ("idx_reaction_safetyreportid", "reaction", "safetyreportid"),
+    ("idx_reaction_meddrapt", "reaction", "reactionmeddrapt"),
+    ("idx_pdh_drug_id", "patient_drug_history", "drug_id"),
+    ("idx_pdh_characterization_drug", "patient_drug_history", "drugcharacterization, drug_id"),
+    ("idx_drug_catalog_medicinalproduct", "drug_catalog", "medicinalproduct"),
+    ("idx_report_receivedate", "report", "receivedate"),
+    ("idx_report_serious_receivedate", "report", "serious, receivedate"),
+    ("idx_literature_safetyreportid", "primarysource_literature_reference", "safetyreportid"),
+]
+
+# Persistent state of the insertion pipeline's DrugRegistry (see src/db_sql/drug_registry.py):
+# normalized medicinalproduct key -> drug_id, and the openFDA payload fingerprints stored per drug
+REGISTRY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS drug_registry (
+    name_key TEXT PRIMARY KEY,
+    drug_id INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS drug_registry_variant (
+    drug_id INTEGER,
+    fingerprint BLOB,
+    PRIMARY KEY (drug_id, fingerprint)
+) WITHOUT ROWID;
+"""
+
+# Last loaded (safetyreportversion, content hash) per report, for --incremental loads, and the
+# ingest generation: bumped by every loader commit that changed data (query result caches key on it).
+# database_id is random per database, so a file rebuilt at the same path (counter back at 0) is told apart
+INGEST_SCHEMA = """
+CREATE TABLE IF NOT EXISTS report_ingest (
+    safetyreportid INTEGER PRIMARY KEY,
+    safetyreportversion INTEGER,
+    content_hash BLOB
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS ingest_generation (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    generation INTEGER NOT NULL,
+    database_id TEXT
+);
+INSERT OR IGNORE INTO ingest_generation (id, generation) VALUES (1, 0);
+UPDATE ingest_generation SET database_id = lower(hex(randomblob(16))) WHERE database_id IS NULL;
+"""
+
+# Tables holding one report's rows, all keyed on safetyreportid (replaced together by --incremental)
+REPORT_TABLES = [
+    "report", "report_authority", "primarysource_literature_reference", "patient_age", "patient_age_group",
+    "patient_weight", "summary", "reaction", "report_duplicate", "patient_drug_history",
+]
+
+# safetyreportid indexes for the REPORT_TABLES whose key is not already safetyreportid,
+# so replacing a changed report deletes its old rows without table scans
+INGEST_INDEXES = [
+    ("idx_reaction_safetyreportid", "reaction", "safetyreportid"),
+    ("idx_report_duplicate_safetyreportid", "report_duplicate", "safetyreportid"),
+    ("idx_summary_safetyreportid", "summary", "safetyreportid"),
+    ("idx_literature_safetyreportid", "primarysource_literature_reference", "safetyreportid"),
+]
+
+# Optional FTS5 index over the clinical narratives (external content: the text stays in summary)
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS summary_fts USING fts5(
+    narrativeincludeclinical,
+    content='summary',
+    content_rowid='id',
+    tokenize='porter unicode61 remove_diacritics 2'
+);
+"""
+
+# Keep summary_fts in sync with every insert/delete/update on summary
+FTS_TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS summary_fts_ai AFTER INSERT ON summary BEGIN
+    INSERT INTO summary_fts(rowid, narrativeincludeclinical) VALUES (new.id, new.narrativeincludeclinical);
+END;
+
+CREATE TRIGGER IF NOT EXISTS summary_fts_ad AFTER DELETE ON summary BEGIN
+    INSERT INTO summary_fts(summary_fts, rowid, narrativeincludeclinical)
+    VALUES ('delete', old.id, old.narrativeincludeclinical);
+END;
+
+CREATE TRIGGER IF NOT EXISTS summary_fts_au AFTER UPDATE ON summary BEGIN
+    INSERT INTO summary_fts(summary_fts, rowid, narrativeincludeclinical)
+    VALUES ('delete', old.id, old.narrativeincludeclinical);
+    INSERT INTO summary_fts(rowid, narrativeincludeclinical) VALUES (new.id, new.narrativeincludeclinical);
+END;
+"""
+
+FTS_TRIGGER_NAMES = ["summary_fts_ai", "summary_fts_ad", "summary_fts_au"]
+
+# Optional materialized aggregates behind Q4-Q7 (see src/db_sql/aggregates.py). Keys may be NULL
+# (GROUP BY keeps a NULL group), so they have unique indexes rather than primary keys and are
+# matched with IS.
+AGGREGATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS agg_serious_by_year (
+    year TEXT,
+    count INTEGER NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_agg_serious_by_year ON agg_serious_by_year(year);
+
+CREATE TABLE IF NOT EXISTS agg_reaction_count (
+    reactionmeddrapt TEXT,
+    count INTEGER NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_agg_reaction_count ON agg_reaction_count(reactionmeddrapt);
+
+CREATE TABLE IF NOT EXISTS agg_weight_by_agegroup (
+    patientagegroup INTEGER,
+    reports INTEGER NOT NULL,
+    weight_sum REAL NOT NULL,
+    weight_count INTEGER NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_agg_weight_by_agegroup ON agg_weight_by_agegroup(patientagegroup);
+
+CREATE TABLE IF NOT EXISTS agg_suspect_drug (
+    drug_id INTEGER,
+    count INTEGER NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_agg_suspect_drug ON agg_suspect_drug(drug_id);
+"""
+
+# aggregate table -> SELECT recomputing its rows from the raw tables (rebuilds and --check)
+AGGREGATE_SOURCES = {
+    "agg_serious_by_year": """
+        SELECT SUBSTR(receivedate, 1, 4), COUNT(*)
+        FROM report
+        WHERE serious = 1
+        GROUP BY 1""",
+    "agg_reaction_count": """
+        SELECT reactionmeddrapt, COUNT(*)
+        FROM reaction
+        GROUP BY reactionmeddrapt""",
+    "agg_weight_by_agegroup": """
+        SELECT ag.patientagegroup, COUNT(*), TOTAL(w.patientweight), COUNT(w.patientweight)
+        FROM patient_age_group ag
+        JOIN patient_weight w ON ag.safetyreportid = w.safetyreportid
+        GROUP BY ag.patientagegroup""",
+    "agg_suspect_drug": """
+        SELECT drug_id, COUNT(*)
+        FROM patient_drug_history
+        WHERE drugcharacterization = 1
+        GROUP BY drug_id""",
+}
+
+# Keep the aggregates in sync with every insert/delete on their source tables. The loaders never
+# update rows in place (--incremental deletes and reinserts), and INSERT OR IGNORE skips the
+# triggers for ignored rows, so the aggregates count exactly the rows stored.
+AGGREGATE_TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS agg_report_ai AFTER INSERT ON report WHEN new.serious = 1 BEGIN
+    INSERT INTO agg_serious_by_year (year, count)
+    SELECT SUBSTR(new.receivedate, 1, 4), 0
+    WHERE NOT EXISTS (SELECT 1 FROM agg_serious_by_year WHERE year IS SUBSTR(new.receivedate, 1, 4));
+    UPDATE agg_serious_by_year SET count = count + 1 WHERE year IS SUBSTR(new.receivedate, 1, 4);
+END;
+
+CREATE TRIGGER IF NOT EXISTS agg_report_ad AFTER DELETE ON report WHEN old.serious = 1 BEGIN
+    UPDATE agg_serious_by_year SET count = count - 1 WHERE year IS SUBSTR(old.receivedate, 1, 4);
+    DELETE FROM agg_serious_by_year WHERE year IS SUBSTR(old.receivedate, 1, 4) AND count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS agg_reaction_ai AFTER INSERT ON reaction BEGIN
+    INSERT INTO agg_reaction_count (reactionmeddrapt, count)
+    SELECT new.reactionmeddrapt, 0
+    WHERE NOT EXISTS (SELECT 1 FROM agg_reaction_count WHERE reactionmeddrapt IS new.reactionmeddrapt);
+    UPDATE agg_reaction_count SET count = count + 1 WHERE reactionmeddrapt IS new.reactionmeddrapt;
+END;
+
+CREATE TRIGGER IF NOT EXISTS agg_reaction_ad AFTER DELETE ON reaction BEGIN
+    UPDATE agg_reaction_count SET count = count - 1 WHERE reactionmeddrapt IS old.reactionmeddrapt;
+    DELETE FROM agg_reaction_count WHERE reactionmeddrapt IS old.reactionmeddrapt AND count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS agg_pdh_ai AFTER INSERT ON patient_drug_history WHEN new.drugcharacterization = 1 BEGIN
+    INSERT INTO agg_suspect_drug (drug_id, count)
+    SELECT new.drug_id, 0
+    WHERE NOT EXISTS (SELECT 1 FROM agg_suspect_drug WHERE drug_id IS new.drug_id);
+    UPDATE agg_suspect_drug SET count = count + 1 WHERE drug_id IS new.drug_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS agg_pdh_ad AFTER DELETE ON patient_drug_history WHEN old.drugcharacterization = 1 BEGIN
+    UPDATE agg_suspect_drug SET count = count - 1 WHERE drug_id IS old.drug_id;
+    DELETE FROM agg_suspect_drug WHERE drug_id IS old.drug_id AND count <= 0;
+END;
+
+-- Q6 joins patient_age_group with patient_weight: whichever row of a report arrives second adds
+-- the pair, whichever is deleted first removes it
+CREATE TRIGGER IF NOT EXISTS agg_age_group_ai AFTER INSERT ON patient_age_group
+WHEN EXISTS (SELECT 1 FROM patient_weight WHERE safetyreportid = new.safetyreportid) BEGIN
+    INSERT INTO agg_weight_by_agegroup (patientagegroup, reports, weight_sum, weight_count)
+    SELECT new.patientagegroup, 0, 0.0, 0
+    WHERE NOT EXISTS (SELECT 1 FROM agg_weight_by_agegroup WHERE patientagegroup IS new.patientagegroup);
+    UPDATE agg_weight_by_agegroup
+    SET reports = reports + 1,
+        weight_sum = weight_sum + (SELECT TOTAL(patientweight) FROM patient_weight WHERE safetyreportid = new.safetyreportid),
+        weight_count = weight_count + (SELECT COUNT(patientweight) FROM patient_weight WHERE safetyreportid = new.safetyreportid)
+    WHERE patientagegroup IS new.patientagegroup;
+END;
+
+CREATE TRIGGER IF NOT EXISTS agg_age_group_ad AFTER DELETE ON patient_age_group
+WHEN EXISTS (SELECT 1 FROM patient_weight WHERE safetyreportid = old.safetyreportid) BEGIN
+    UPDATE agg_weight_by_agegroup
+    SET reports = reports - 1,
+        weight_sum = weight_sum - (SELECT TOTAL(patientweight) FROM patient_weight WHERE safetyreportid = old.safetyreportid),
+        weight_count = weight_count - (SELECT COUNT(patientweight) FROM patient_weight WHERE safetyreportid = old.safetyreportid)
+    WHERE patientagegroup IS old.patientagegroup;
+    DELETE FROM agg_weight_by_agegroup WHERE patientagegroup IS old.patientagegroup AND reports <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS agg_weight_ai AFTER INSERT ON patient_weight
+WHEN EXISTS (SELECT 1 FROM patient_age_group WHERE safetyreportid = new.safetyreportid) BEGIN
+    INSERT INTO agg_weight_by_agegroup (patientagegroup, reports, weight_sum, weight_count)
+    SELECT ag.patientagegroup, 0, 0.0, 0
+    FROM patient_age_group ag
+    WHERE ag.safetyreportid = new.safetyreportid
+      AND NOT EXISTS (SELECT 1 FROM agg_weight_by_agegroup WHERE patientagegroup IS ag.patientagegroup);
+    UPDATE agg_weight_by_agegroup
+    SET reports = reports + 1,
+        weight_sum = weight_sum + IFNULL(new.patientweight, 0.0),
+        weight_count = weight_count + (new.patientweight IS NOT NULL)
+    WHERE patientagegroup IS (SELECT patientagegroup FROM patient_age_group WHERE safetyreportid = new.safetyreportid);
+END;
+
+CREATE TRIGGER IF NOT EXISTS agg_weight_ad AFTER DELETE ON patient_weight
+WHEN EXISTS (SELECT 1 FROM patient_age_group WHERE safetyreportid = old.safetyreportid) BEGIN
+    UPDATE agg_weight_by_agegroup
+    SET reports = reports - 1,
+        weight_sum = weight_sum - IFNULL(old.patientweight, 0.0),
+        weight_count = weight_count - (old.patientweight IS NOT NULL)
+    WHERE patientagegroup IS (SELECT patientagegroup FROM patient_age_group WHERE safetyreportid = old.safetyreportid);
+    DELETE FROM agg_weight_by_agegroup
+    WHERE patientagegroup IS (SELECT patientagegroup FROM patient_age_group WHERE safetyreportid = old.safetyreportid)
+      AND reports <= 0;
+END;
+"""
+
+AGGREGATE_TRIGGER_NAMES = ["agg_report_ai", "agg_report_ad", "agg_reaction_ai", "agg_reaction_ad", "agg_pdh_ai",
+                           "agg_pdh_ad", "agg_age_group_ai", "agg_age_group_ad", "agg_weight_ai", "agg_weight_ad"]
+
+
+def create_tables(conn, with_indexes=True, query_indexes=False, fts=False, aggregates=False):
+    """Creates all tables; with_indexes=False leaves out the secondary indexes (bulk load),
+    query_indexes=True also creates the QUERY_INDEXES profile, fts=True the summary_fts index,
+    aggregates=True the materialized agg_* tables."""
     with conn:
         conn.executescript("""
 
@@ -234,32 +499,120 @@ CREATE TABLE primarysource_literature_reference (
     literature_reference TEXT,
     FOREIGN KEY (safetyreportid) REFERENCES report(safetyreportid)
 );
-                           
-
--- Create unique indexes to support INSERT OR IGNORE semantics
-CREATE UNIQUE INDEX idx_drug_application_number_unique ON drug_fda_application_number(drug_id, application_number);
-CREATE UNIQUE INDEX idx_drug_brand_name_unique ON drug_fda_brand_name(drug_id, brand_name);
-CREATE UNIQUE INDEX idx_drug_generic_name_unique ON drug_fda_generic_name(drug_id, generic_name);
-CREATE UNIQUE INDEX idx_drug_manufacturer_name_unique ON drug_fda_manufacturer_name(drug_id, manufacturer_name);
-CREATE UNIQUE INDEX idx_drug_product_ndc_unique ON drug_fda_product_ndc(drug_id, product_ndc);
-CREATE UNIQUE INDEX idx_drug_package_ndc_unique ON drug_fda_package_ndc(drug_id, package_ndc);
-CREATE UNIQUE INDEX idx_drug_pharm_class_epc_unique ON drug_fda_pharm_class_epc(drug_id, pharm_class_epc);
-CREATE UNIQUE INDEX idx_drug_pharm_class_cs_unique ON drug_fda_pharm_class_cs(drug_id, pharm_class_cs);
-CREATE UNIQUE INDEX idx_drug_pharm_class_moa_unique ON drug_fda_pharm_class_moa(drug_id, pharm_class_moa);
-CREATE UNIQUE INDEX idx_drug_pharm_class_pe_unique ON drug_fda_pharm_class_pe(drug_id, pharm_class_pe);
-CREATE UNIQUE INDEX idx_drug_rxcui_unique ON drug_fda_rxcui(drug_id, rxcui);
-CREATE UNIQUE INDEX idx_drug_unii_unique ON drug_fda_unii(drug_id, unii);
-CREATE UNIQUE INDEX idx_drug_route_unique ON drug_fda_route(drug_id, route);
-CREATE UNIQUE INDEX idx_drug_spl_id_unique ON drug_fda_spl_id(drug_id, spl_id);
-CREATE UNIQUE INDEX idx_drug_spl_set_id_unique ON drug_fda_spl_set_id(drug_id, spl_set_id);
-CREATE UNIQUE INDEX idx_drug_substance_name_unique ON drug_fda_substance(drug_id, substance_name);
-CREATE UNIQUE INDEX idx_drug_product_type_unique ON drug_fda_product_type(drug_id, product_type);
-        
+
 """)
-        
+    create_registry_tables(conn)
+    create_ingest_tables(conn)
+    if with_indexes:
+        create_indexes(conn)
+    if query_indexes:
+        create_query_indexes(conn)
+    if fts:
+        create_fts_index(conn, rebuild=False)
+    if aggregates:
+        create_aggregate_tables(conn, rebuild=False)
+
+
+def create_registry_tables(conn):
+    """Creates the DrugRegistry tables (also used to upgrade databases created without them)."""
+    with conn:
+        conn.executescript(REGISTRY_SCHEMA)
+
+
+def create_ingest_tables(conn):
+    """Creates report_ingest and ingest_generation (also used to upgrade databases created without them)."""
+    with conn:
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(ingest_generation)")]
+        if columns and "database_id" not in columns:
+            conn.execute("ALTER TABLE ingest_generation ADD COLUMN database_id TEXT")
+        conn.executescript(INGEST_SCHEMA)
+
+
+def create_indexes(conn):
+    with conn:
+        for name, table, column in UNIQUE_INDEXES:
+            conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {name} ON {table}(drug_id, {column})")
+
+
+def drop_indexes(conn):
+    with conn:
+        for name, _, _ in UNIQUE_INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+def create_query_indexes(conn, indexes=None):
+    with conn:
+        for name, table, columns in indexes or QUERY_INDEXES:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({columns})")
+
+
+def drop_query_indexes(conn, indexes=None):
+    with conn:
+        for name, _, _ in indexes or QUERY_INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+def has_fts_index(conn):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'summary_fts'").fetchone() is not None
+
+
+def create_fts_index(conn, rebuild=True):
+    """Creates summary_fts and its sync triggers; rebuild=True (re)indexes the existing summary rows."""
+    with conn:
+        conn.executescript(FTS_SCHEMA + FTS_TRIGGERS)
+        if rebuild:
+            conn.execute("INSERT INTO summary_fts(summary_fts) VALUES ('rebuild')")
+
+
+def drop_fts_triggers(conn):
+    """Stops syncing summary_fts row by row (bulk loads rebuild it in one pass at the end)."""
+    with conn:
+        for name in FTS_TRIGGER_NAMES:
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def has_aggregate_tables(conn):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'agg_reaction_count'").fetchone() is not None
+
+
+def create_aggregate_tables(conn, rebuild=True):
+    """Creates the agg_* tables and their sync triggers; rebuild=True recomputes them from the raw tables."""
+    with conn:
+        conn.executescript(AGGREGATE_SCHEMA + AGGREGATE_TRIGGERS)
+        if rebuild:
+            for table, select in AGGREGATE_SOURCES.items():
+                conn.execute(f"DELETE FROM {table}")
+                conn.execute(f"INSERT INTO {table} {select}")
+
+
+def drop_aggregate_triggers(conn):
+    """Stops maintaining the aggregates row by row (bulk loads rebuild them in one pass at the end)."""
+    with conn:
+        for name in AGGREGATE_TRIGGER_NAMES:
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def deduplicate_indexed_tables(conn):
+    """Removes duplicate (drug_id, value) rows so the unique indexes can be built after a bulk load."""
+    with conn:
+        for _, table, column in UNIQUE_INDEXES:
+            conn.execute(f"""
+                DELETE FROM {table} WHERE rowid NOT IN (
+                    SELECT MIN(rowid) FROM {table} GROUP BY drug_id, {column})""")
+
+
 if __name__ == "__main__":
-    db_path = "sql/openfda_final_v10.db"
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default="sql/openfda_final_v10.db")
+    parser.add_argument("--no_indexes", action="store_true", help="Skip the unique indexes (build them after a bulk load)")
+    parser.add_argument("--query_indexes", action="store_true", help="Also create the query index profile (QUERY_INDEXES)")
+    parser.add_argument("--fts", action="store_true", help="Also create the summary_fts full-text index, synced during ingestion")
+    parser.add_argument("--aggregates", action="store_true",
+                        help="Also create the materialized Q4-Q7 aggregates, maintained during ingestion")
+    args = parser.parse_args()
+    db_path = args.db
     conn = sqlite3.connect(db_path)
-    create_tables(conn)
+    create_tables(conn, with_indexes=not args.no_indexes, query_indexes=args.query_indexes, fts=args.fts,
+                  aggregates=args.aggregates)
     print("✅ Redesigned tables created successfully in", db_path)
     conn.close()
@@ -0,0 +1,171 @@
+from collections import OrderedDict
+
+from src.parser.incremental import content_hash
+from src.parser.normalize import normalize_name_key
+from src.db_sql.create_final_sql_schema_split_openfda_indexed import create_registry_tables
+
+# openFDA list field -> normalized drug_fda_* table (product_type is flattened separately)
+OPENFDA_TABLES = [
+    ("application_number", "drug_fda_application_number"),
+    ("brand_name", "drug_fda_brand_name"),
+    ("generic_name", "drug_fda_generic_name"),
+    ("manufacturer_name", "drug_fda_manufacturer_name"),
+    ("product_ndc", "drug_fda_product_ndc"),
+    ("package_ndc", "drug_fda_package_ndc"),
+    ("pharm_class_epc", "drug_fda_pharm_class_epc"),
+    ("pharm_class_cs", "drug_fda_pharm_class_cs"),
+    ("pharm_class_moa", "drug_fda_pharm_class_moa"),
+    ("pharm_class_pe", "drug_fda_pharm_class_pe"),
+    ("rxcui", "drug_fda_rxcui"),
+    ("unii", "drug_fda_unii"),
+    ("route", "drug_fda_route"),
+    ("spl_id", "drug_fda_spl_id"),
+    ("spl_set_id", "drug_fda_spl_set_id"),
+    ("substance_name", "drug_fda_substance")
+]
+
+DEFAULT_CACHE_SIZE = 100_000
+
+
+def drug_fingerprint(drug):
+    """16-byte hash of a drug's activesubstance + openfda payload, or None if it has neither.
+    Cheap enough to compute in worker processes (see report_to_rows)."""
+    actives, openfda = drug.get("activesubstance"), drug.get("openfda")
+    if not actives and not openfda:
+        return None
+    return content_hash([actives, openfda])
+
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used key."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.data = OrderedDict()
+
+    def get(self, key):
+        value = self.data.get(key)
+        if value is not None:
+            self.data.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.data[key] = value
+        self.data.move_to_end(key)
+        if len(self.data) > self.max_size:
+            self.data.popitem(last=False)
+
+
+class DrugRegistry:
+    """Assigns drug_ids and stores each drug's metadata once per distinct openFDA variant.
+
+    Drugs are keyed on the normalized medicinalproduct name (normalize_name_key), so spellings
+    that only differ in case or whitespace share a drug_id; drug_catalog keeps the first spelling.
+    Every distinct activesubstance/openfda payload seen for a drug is fingerprinted and recorded in
+    drug_registry_variant, and its values are added to the drug_* tables (INSERT OR IGNORE keeps
+    them unique). The state lives in the database itself; only recently used names and
+    fingerprints are cached, so memory stays bounded whatever the catalog size.
+    """
+
+    def __init__(self, cache_size=DEFAULT_CACHE_SIZE):
+        self.conn = None
+        self.next_id = 1
+        self.names = LRUCache(cache_size)
+        self.variants = LRUCache(cache_size)
+        self.new_drugs = 0
+        self.new_variants = 0
+
+    def load(self, conn):
+        """Attaches the registry to a database, creating its tables and backfilling the name keys
+        of databases loaded before the registry was persisted."""
+        self.conn = conn
+        create_registry_tables(conn)
+        if not conn.execute("SELECT 1 FROM drug_registry LIMIT 1").fetchone():
+            conn.create_function("name_key", 1, normalize_name_key, deterministic=True)
+            with conn:
+                conn.execute("""
+                    INSERT OR IGNORE INTO drug_registry (name_key, drug_id)
+                    SELECT name_key(medicinalproduct), drug_id FROM drug_catalog ORDER BY drug_id""")
+        max_id = conn.execute("""
+            SELECT MAX(m) FROM (SELECT MAX(drug_id) AS m FROM drug_catalog
+                                UNION ALL SELECT MAX(drug_id) FROM drug_registry)""").fetchone()[0]
+        self.next_id = (max_id or 0) + 1
+        return self
+
+    def lookup(self, key):
+        drug_id = self.names.get(key)
+        if drug_id is None:
+            row = self.conn.execute("SELECT drug_id FROM drug_registry WHERE name_key = ?", (key,)).fetchone()
+            if row:
+                drug_id = row[0]
+                self.names.put(key, drug_id)
+        return drug_id
+
+    def _is_new_variant(self, drug_id, fingerprint):
+        if self.variants.get((drug_id, fingerprint)):
+            return False
+        self.variants.put((drug_id, fingerprint), True)
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO drug_registry_variant (drug_id, fingerprint) VALUES (?, ?)", (drug_id, fingerprint))
+        return cursor.rowcount == 1
+
+    def get_or_create(self, writer, drug, fingerprint=None):
+        name = drug.get("medicinalproduct")
+        if not name:
+            return None
+
+        key = normalize_name_key(name)
+        drug_id = self.lookup(key)
+        if drug_id is None:
+            # Create new drug_id and register in drug_catalog
+            drug_id = self.next_id
+            self.next_id += 1
+            self.new_drugs += 1
+            self.conn.execute("INSERT INTO drug_registry (name_key, drug_id) VALUES (?, ?)", (key, drug_id))
+            self.names.put(key, drug_id)
+            writer.add("drug_catalog", ["drug_id", "medicinalproduct"], {"drug_id": drug_id, "medicinalproduct": name})
+
+        if fingerprint is None:
+            fingerprint = drug_fingerprint(drug)
+        if fingerprint is not None and self._is_new_variant(drug_id, fingerprint):
+            self.new_variants += 1
+            insert_drug_metadata(writer, drug_id, drug)
+        return drug_id
+
+
+def insert_drug_metadata(writer, drug_id, drug):
+    # Insert activesubstance(s)
+    seen = set()
+    actives = drug.get("activesubstance")
+    if isinstance(actives, dict):
+        val = actives.get("activesubstancename")
+        if val:
+            writer.add("drug_activesubstance", ["drug_id", "activesubstancename"], {
+                "drug_id": drug_id, "activesubstancename": val})
+    elif isinstance(actives, list):
+        for a in actives:
+            val = a.get("activesubstancename") if isinstance(a, dict) else None
+            if val and val not in seen:
+                seen.add(val)
+                writer.add("drug_activesubstance", ["drug_id", "activesubstancename"], {
+                    "drug_id": drug_id, "activesubstancename": val})
+
+    # Insert openfda metadata (split into normalized tables)
+    openfda = drug.get("openfda", {})
+    if isinstance(openfda, dict):
+        for field, table in OPENFDA_TABLES:
+            values = openfda.get(field, [])
+            if isinstance(values, list):
+                seen = set()  # openFDA lists repeat values; dedupe here instead of relying on the unique index
+                for val in values:
+                    if isinstance(val, str) and val.strip() and val not in seen:
+                        seen.add(val)
+                        writer.add(table, ["drug_id", field], {"drug_id": drug_id, field: val})
+
+        # Flatten product_type list into a single string
+        product_type = openfda.get("product_type", [])
+        if isinstance(product_type, list):
+            flat_type = ", ".join([pt.strip() for pt in product_type if pt.strip()])
+            if flat_type:
+                writer.add("drug_fda_product_type", ["drug_id", "product_type"], {
+                    "drug_id": drug_id, "product_type": flat_type})
@@ -0,0 +1,112 @@
+"""
+Index advisor for the benchmark queries:
+- runs every query under EXPLAIN QUERY PLAN and flags full table scans and temp B-trees
+- times each query with and without every candidate index and reports the speedup
+
+Candidate indexes are created and dropped again, so the database ends up unchanged
+(unless --keep is given, which leaves the indexes that sped up at least one query).
+"""
+
+import argparse
+import csv
+import os
+import re
+import sqlite3
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from src.db_sql.queries import SQLITE_QUERIES
+from src.db_sql.create_final_sql_schema_split_openfda_indexed import QUERY_INDEXES
+
+FULL_SCAN = re.compile(r"^SCAN (\w+)\b(?! USING (?:COVERING )?INDEX)")
+
+
+def explain(conn, sql):
+    """Returns (plan lines, full scans, temp B-trees) for one query."""
+    plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+    scans = [m.group(1) for m in (FULL_SCAN.match(line) for line in plan) if m]
+    temp_btrees = [line for line in plan if "USE TEMP B-TREE" in line]
+    return plan, scans, temp_btrees
+
+
+def time_query(conn, sql, runs=3):
+    conn.execute(sql).fetchall()  # warm the page cache
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        conn.execute(sql).fetchall()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def advise(conn, queries=None, candidates=None, runs=3, keep=False):
+    queries = queries or SQLITE_QUERIES
+    candidates = candidates or QUERY_INDEXES
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    conn.execute("ANALYZE")
+
+    report = {"plans": {}, "baseline": {}, "speedups": []}
+    for qid, sql in queries.items():
+        plan, scans, temp_btrees = explain(conn, sql)
+        report["plans"][qid] = {"plan": plan, "full_scans": scans, "temp_btrees": temp_btrees}
+        report["baseline"][qid] = time_query(conn, sql, runs)
+
+    for name, table, columns in candidates:
+        if name in existing:
+            continue
+        conn.execute(f"CREATE INDEX {name} ON {table}({columns})")
+        conn.execute(f"ANALYZE {table}")
+        useful = False
+        for qid, sql in queries.items():
+            plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+            if not any(name in line for line in plan):
+                continue  # the planner ignores this index for this query
+            seconds = time_query(conn, sql, runs)
+            speedup = report["baseline"][qid] / seconds if seconds else float("inf")
+            useful = useful or speedup > 1.1
+            report["speedups"].append({"index": name, "table": table, "columns": columns, "query": qid,
+                                       "baseline_ms": report["baseline"][qid] * 1000,
+                                       "indexed_ms": seconds * 1000, "speedup": speedup})
+        if not (keep and useful):
+            conn.execute(f"DROP INDEX {name}")
+    conn.execute("ANALYZE")
+    conn.commit()
+    return report
+
+
+def print_report(report):
+    print("=== Query plans ===")
+    for qid, info in report["plans"].items():
+        flags = []
+        if info["full_scans"]:
+            flags.append(f"full scan: {', '.join(info['full_scans'])}")
+        if info["temp_btrees"]:
+            flags.append(f"{len(info['temp_btrees'])} temp B-tree(s)")
+        print(f"{qid:<4} {report['baseline'][qid] * 1000:8.1f} ms  {'; '.join(flags) or 'ok'}")
+    print("\n=== Candidate indexes ===")
+    for row in sorted(report["speedups"], key=lambda r: -r["speedup"]):
+        print(f"{row['index']:<36} {row['query']:<4} {row['baseline_ms']:8.1f} ms -> {row['indexed_ms']:8.1f} ms"
+              f"  x{row['speedup']:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default="sql/openfda_final_v10.db")
+    parser.add_argument("--runs", type=int, default=3, help="Timed runs per query (median is reported)")
+    parser.add_argument("--queries", nargs="*", default=None, help="Subset of query ids, e.g. Q3 Q5 Q7")
+    parser.add_argument("--keep", action="store_true", help="Keep candidate indexes that gave a >10%% speedup")
+    parser.add_argument("--output", default=None, help="Optional CSV with the per-index speedups")
+    args = parser.parse_args()
+
+    queries = {q: SQLITE_QUERIES[q] for q in args.queries} if args.queries else None
+    conn = sqlite3.connect(args.db)
+    report = advise(conn, queries=queries, runs=args.runs, keep=args.keep)
+    conn.close()
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["index", "table", "columns", "query", "baseline_ms", "indexed_ms", "speedup"])
+            writer.writeheader()
+            writer.writerows(report["speedups"])
@@ -0,0 +1,90 @@
+import sqlite3
+
+from src.parser.incremental import classify, NEW, CHANGED, UNCHANGED, STALE
+from src.db_sql.create_final_sql_schema_split_openfda_indexed import (
+    REPORT_TABLES, INGEST_INDEXES, create_ingest_tables, create_query_indexes)
+
+# Rids remembered as "possibly still in the writer's buffers" before a precautionary flush
+MAX_UNFLUSHED = 100_000
+
+
+class IngestState:
+    """Per-report (safetyreportversion, content hash) state in report_ingest.
+
+    Full loads only append state rows through the BatchWriter (INSERT OR IGNORE, like every other
+    table). Incremental loads classify each report first: unchanged and stale copies are skipped,
+    and a changed report has all its rows in REPORT_TABLES deleted before the new ones are written.
+    """
+
+    def __init__(self, conn, writer, incremental=False):
+        self.conn = conn
+        self.writer = writer
+        self.incremental = incremental
+        self.unflushed = set()  # rids written since the last precautionary flush
+        self.counts = {NEW: 0, CHANGED: 0, UNCHANGED: 0, STALE: 0}
+        create_ingest_tables(conn)
+        if incremental:
+            create_query_indexes(conn, INGEST_INDEXES)
+        self.committed_changes = conn.total_changes
+
+    def stored(self, rid):
+        row = self.conn.execute(
+            "SELECT safetyreportversion, content_hash FROM report_ingest WHERE safetyreportid = ?", (rid,)).fetchone()
+        if row is None:
+            # Loaded before report_ingest existed: only the version is known
+            row = self.conn.execute(
+                "SELECT safetyreportversion, NULL FROM report WHERE safetyreportid = ?", (rid,)).fetchone()
+        return row
+
+    def prepare(self, rid, version, digest):
+        """Classifies a report (see src/parser/incremental.py) and, if it changed, deletes its old rows.
+        Returns the status; only NEW and CHANGED reports should be written."""
+        if not self.incremental:
+            return NEW
+        stored = self.stored(rid)
+        status = classify(stored, version, digest)
+        self.counts[status] += 1
+        if status == UNCHANGED and stored[1] is None:
+            self.record(rid, version, digest)  # adopt legacy reports so the next run can compare hashes
+        elif status == CHANGED:
+            if rid in self.unflushed:
+                # The same report appeared earlier in this run and may still sit in the buffers
+                self.writer.flush()
+                self.unflushed.clear()
+            for table in REPORT_TABLES:
+                self.conn.execute(f"DELETE FROM {table} WHERE safetyreportid = ?", (rid,))
+        return status
+
+    def record(self, rid, version, digest):
+        if not self.incremental:
+            self.writer.add_row("report_ingest", ("safetyreportid", "safetyreportversion", "content_hash"),
+                                (rid, version, digest))
+            return
+        if len(self.unflushed) >= MAX_UNFLUSHED:
+            self.writer.flush()
+            self.unflushed.clear()
+        self.unflushed.add(rid)
+        self.conn.execute("INSERT OR REPLACE INTO report_ingest (safetyreportid, safetyreportversion, content_hash)"
+                          " VALUES (?, ?, ?)", (rid, version, digest))
+
+    def commit(self):
+        """Flushes and commits the writer. If any row changed since the last commit, the ingest
+        generation is bumped in the same transaction, invalidating cached query results."""
+        self.writer.flush()
+        if self.conn.total_changes != self.committed_changes:
+            self.conn.execute("UPDATE ingest_generation SET generation = generation + 1")
+        self.conn.commit()
+        self.committed_changes = self.conn.total_changes
+
+
+def read_generation(conn):
+    """(database id, ingest generation): (None, 0) for databases created before the counter
+    existed, and a None id for those created before the id."""
+    try:
+        row = conn.execute("SELECT database_id, generation FROM ingest_generation").fetchone()
+    except sqlite3.OperationalError:
+        try:
+            row = conn.execute("SELECT NULL, generation FROM ingest_generation").fetchone()
+        except sqlite3.OperationalError:
+            return None, 0
+    return tuple(row) if row else (None, 0)
@@ -4,60 +4,34 @@ import logging
 import os
 import sqlite3
 import sys
-import re
-from datetime import datetime
-from collections import defaultdict
+from functools import partial
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
-from src.parser.iterate_reports import iterate_reports_ijson
-
-def safe_int(val):
-    try: return int(val)
-    except: return None
-
-def safe_float(val):
-    try: return float(val)
-    except: return None
-
-def normalize_date(date_str, fmt_code):
-    if not date_str or not fmt_code:
-        return None
-    try:
-        if fmt_code == "102" and len(date_str) == 8:
-            return f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:]}"
-        elif fmt_code == "610" and len(date_str) == 6:
-            return f"{date_str[:4]}-{date_str[4:6]}-01"
-        elif fmt_code == "602" and len(date_str) == 4:
-            return f"{date_str}-01-01"
-    except:
-        return None
-    return None
-
-def extract_case_event_date(text):
-    match = re.search(r'CASE EVENT DATE[:\s]*?(\d{8})', str(text))
-    if match:
-        try:
-            raw_date = match.group(1)
-            datetime.strptime(raw_date, "%Y%m%d")
-            return f"{raw_date[:4]}-{raw_date[4:6]}-{raw_date[6:]}"
-        except ValueError:
-            return None
-    return None
+from src.parser.iterate_reports import iterate_report_positions, IJSON_BACKEND
+from src.parser.checkpoint import Checkpoint
+from src.parser.incremental import content_hash, NEW, CHANGED
+from src.parser.normalize import safe_int, safe_float, normalize_date, extract_case_event_date
+from src.parser.parallel_reader import iterate_reports_parallel
+from src.parser.metrics import NULL_METRICS, add_metrics_arguments, metrics_from_args
+from src.db_sql.batch_writer import BatchWriter
+from src.db_sql.drug_registry import DrugRegistry, drug_fingerprint, DEFAULT_CACHE_SIZE
+from src.db_sql.ingest_state import IngestState
+from src.db_sql.create_final_sql_schema_split_openfda_indexed import (
+    create_tables, create_indexes, drop_indexes, deduplicate_indexed_tables, create_query_indexes,
+    has_fts_index, create_fts_index, drop_fts_triggers,
+    has_aggregate_tables, create_aggregate_tables, drop_aggregate_triggers)
 
 def safe_get(obj, key, default=None):
     return obj.get(key) if isinstance(obj, dict) else default
 
-def insert_with_fields(conn, table, fields, values):
-    cursor = conn.cursor()
-    placeholders = ", ".join([f":{field}" for field in fields])
-    columns = ", ".join(fields)
-    sql = f"INSERT OR IGNORE INTO {table} ({columns}) VALUES ({placeholders})"
-    cursor.execute(sql, values)
+def insert_with_fields(writer, table, fields, values):
+    # Rows are buffered per table and flushed with executemany (see BatchWriter)
+    writer.add(table, fields, values)
 
 
 
 
-def insert_report_related(conn, report):
+def insert_report_related(writer, report):
     rid = safe_int(report.get("safetyreportid"))
     sender = safe_get(report, "sender", {})
     receiver = safe_get(report, "receiver", {})
@@ -94,26 +68,26 @@ def insert_report_related(conn, report):
         "patientsex": safe_int(patient.get("patientsex")),
         "duplicate": safe_int(report.get("duplicate"))
     }
-    insert_with_fields(conn, "report", list(report_data.keys()), report_data)
+    insert_with_fields(writer, "report", list(report_data.keys()), report_data)
 
     literature = primarysource.get("literaturereference")
     if isinstance(literature, str):
-        insert_with_fields(conn, "primarysource_literature_reference",
+        insert_with_fields(writer, "primarysource_literature_reference",
                        ["safetyreportid", "literature_reference"],
                        {"safetyreportid": rid, "literature_reference": literature})
     elif isinstance(literature, list):
         for ref in literature:
-            insert_with_fields(conn, "primarysource_literature_reference",
+            insert_with_fields(writer, "primarysource_literature_reference",
                            ["safetyreportid", "literature_reference"],
                            {"safetyreportid": rid, "literature_reference": ref})
             
     if report.get("authoritynumb"):
-                insert_with_fields(conn, "report_authority", ["safetyreportid", "authoritynumb"], {
+                insert_with_fields(writer, "report_authority", ["safetyreportid", "authoritynumb"], {
                     "safetyreportid": rid,
                     "authoritynumb": report["authoritynumb"]
                 })
 
-def insert_patient_age(conn, report):
+def insert_patient_age(writer, report):
     patient = safe_get(report, "patient", {})
     if not isinstance(patient, dict): return
     data = {
@@ -122,9 +96,9 @@ def insert_patient_age(conn, report):
         "patientonsetageunit": safe_int(patient.get("patientonsetageunit")),
     }
     if "patientonsetage" in patient:
-        insert_with_fields(conn, "patient_age", list(data.keys()), data)
+        insert_with_fields(writer, "patient_age", list(data.keys()), data)
 
-def insert_patient_agegroup(conn, report):
+def insert_patient_agegroup(writer, report):
     patient = safe_get(report, "patient", {})
     if not isinstance(patient, dict): return
     data = {
@@ -132,9 +106,9 @@ def insert_patient_agegroup(conn, report):
         "patientagegroup": safe_int(patient.get("patientagegroup"))
     }
     if "patientagegroup" in patient:
-        insert_with_fields(conn, "patient_age_group", list(data.keys()), data)
+        insert_with_fields(writer, "patient_age_group", list(data.keys()), data)
 
-def insert_patient_weight(conn, report):
+def insert_patient_weight(writer, report):
     patient = safe_get(report, "patient", {})
     if not isinstance(patient, dict): return
     data = {
@@ -142,10 +116,10 @@ def insert_patient_weight(conn, report):
         "patientweight": safe_float(patient.get("patientweight"))
     }
     if "patientweight" in patient:
-        insert_with_fields(conn, "patient_weight", list(data.keys()), data)
+        insert_with_fields(writer, "patient_weight", list(data.keys()), data)
 
 
-def insert_summary(conn, report):
+def insert_summary(writer, report):
     patient = report.get("patient", {})
     summary = patient.get("summary") if isinstance(patient, dict) else None
 
@@ -160,9 +134,9 @@ def insert_summary(conn, report):
         "narrativeincludeclinical": narrative,
         "case_event_date_extracted": extracted
     }
-    insert_with_fields(conn, "summary", list(data.keys()), data)
+    insert_with_fields(writer, "summary", list(data.keys()), data)
 
-def insert_reactions(conn, report):
+def insert_reactions(writer, report):
     patient = safe_get(report, "patient", {})
     if not isinstance(patient, dict): return
     reactions = patient.get("reaction", [])
@@ -175,9 +149,9 @@ def insert_reactions(conn, report):
             "reactionmeddraversionpt": safe_float(reaction.get("reactionmeddraversionpt")),
             "reactionoutcome": safe_int(reaction.get("reactionoutcome"))
         }
-        insert_with_fields(conn, "reaction", list(data.keys()), data)
+        insert_with_fields(writer, "reaction", list(data.keys()), data)
 
-def insert_reportduplicates(conn, report):
+def insert_reportduplicates(writer, report):
     duplicates = report.get("reportduplicate", [])
     if not isinstance(duplicates, list): return
     for dup in duplicates:
@@ -187,190 +161,224 @@ def insert_reportduplicates(conn, report):
             "duplicatesource": dup.get("duplicatesource"),
             "duplicatenumb": dup.get("duplicatenumb")
         }
-        insert_with_fields(conn, "report_duplicate", list(data.keys()), data)
+        insert_with_fields(writer, "report_duplicate", list(data.keys()), data)
 
 
-# In-memory drug catalog deduplication
-class DrugRegistry:
-    def __init__(self):
-        self.name_to_id = {}
-        self.next_id = 1
-        self.openfda_variants = defaultdict(set)
-        self.variant_indices = defaultdict(int)
-
-    def hydrate_existing(self, conn):
-        cursor = conn.cursor()
-        cursor.execute("SELECT drug_id, medicinalproduct FROM drug_catalog")
-        for drug_id, name in cursor.fetchall():
-            self.name_to_id[name] = drug_id
-            if drug_id >= self.next_id:
-                self.next_id = drug_id + 1
-
-
-    def _serialize_openfda(self, openfda):
-        return tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in openfda.items() if v))
-
-
-    def get_or_create(self, conn, drug):
-        name = drug.get("medicinalproduct")
-        if not name:
-            return None
-
-        # Check in-memory cache
-        if name in self.name_to_id:
-            return self.name_to_id[name]
-
-
-        # Create new drug_id and register in drug_catalog
-        drug_id = self.next_id
-        self.next_id += 1
-        self.name_to_id[name] = drug_id
-
-        insert_with_fields(conn, "drug_catalog", ["drug_id", "medicinalproduct"], {
-            "drug_id": drug_id,
-            "medicinalproduct": name
-        })
-
-        # Insert activesubstance(s)
-        seen = set()
-        actives = drug.get("activesubstance")
-        if isinstance(actives, dict):
-            val = actives.get("activesubstancename")
-            if val:
-                insert_with_fields(conn, "drug_activesubstance", ["drug_id", "activesubstancename"], {
-                    "drug_id": drug_id, "activesubstancename": val})
-        elif isinstance(actives, list):
-            for a in actives:
-                val = a.get("activesubstancename") if isinstance(a, dict) else None
-                if val and val not in seen:
-                    seen.add(val)
-                    insert_with_fields(conn, "drug_activesubstance", ["drug_id", "activesubstancename"], {
-                        "drug_id": drug_id, "activesubstancename": val})
-
-        # Insert openfda metadata (split into normalized tables)
-        openfda = drug.get("openfda", {})
-        if isinstance(openfda, dict):
-            for field, table in [
-                ("application_number", "drug_fda_application_number"),
-                ("brand_name", "drug_fda_brand_name"),
-                ("generic_name", "drug_fda_generic_name"),
-                ("manufacturer_name", "drug_fda_manufacturer_name"),
-                ("product_ndc", "drug_fda_product_ndc"),
-                ("package_ndc", "drug_fda_package_ndc"),
-                ("pharm_class_epc", "drug_fda_pharm_class_epc"),
-                ("pharm_class_cs", "drug_fda_pharm_class_cs"),
-                ("pharm_class_moa", "drug_fda_pharm_class_moa"),
-                ("pharm_class_pe", "drug_fda_pharm_class_pe"),
-                ("rxcui", "drug_fda_rxcui"),
-                ("unii", "drug_fda_unii"),
-                ("route", "drug_fda_route"),
-                ("spl_id", "drug_fda_spl_id"),
-                ("spl_set_id", "drug_fda_spl_set_id"),
-                ("substance_name", "drug_fda_substance")
-            ]:
-                values = openfda.get(field, [])
-                if isinstance(values, list):
-                    for val in values:
-                        if isinstance(val, str) and val.strip():
-                            insert_with_fields(conn, table, ["drug_id", field], {
-                                "drug_id": drug_id,
-                                field: val
-                            })
-
-            # Flatten product_type list into a single string
-            product_type = openfda.get("product_type", [])
-            if isinstance(product_type, list):
-                flat_type = ", ".join([pt.strip() for pt in product_type if pt.strip()])
-                if flat_type:
-                    insert_with_fields(conn, "drug_fda_product_type", ["drug_id", "product_type"], {
-                        "drug_id": drug_id,
-                        "product_type": flat_type
-                    })
-
-        return drug_id
-
-
-def insert_drugs(conn, report, registry):
+def drug_history_row(rid, i, drug, drug_id):
+    return {
+        "safetyreportid": rid,
+        "drug_instance_index": i,
+        "drug_id": drug_id,
+        "drugauthorizationnumb": drug.get("drugauthorizationnumb"),
+        "drugcharacterization": safe_int(drug.get("drugcharacterization")),
+        "drugstartdate": normalize_date(drug.get("drugstartdate"), drug.get("drugstartdateformat")),
+        "drugenddate": normalize_date(drug.get("drugenddate"), drug.get("drugenddateformat")),
+        "drugindication": drug.get("drugindication"),
+        "actiondrug": safe_int(drug.get("actiondrug")),
+        "drugadministrationroute": safe_int(drug.get("drugadministrationroute")),
+        "drugdosagetext": drug.get("drugdosagetext"),
+        "drugstructuredosagenumb": safe_float(drug.get("drugstructuredosagenumb")),
+        "drugstructuredosageunit": safe_int(drug.get("drugstructuredosageunit")),
+        "drugseparatedosagenumb": safe_float(drug.get("drugseparatedosagenumb")),
+        "drugintervaldosagedefinition": safe_int(drug.get("drugintervaldosagedefinition")),
+        "drugintervaldosageunitnumb": safe_float(drug.get("drugintervaldosageunitnumb")),
+        "drugseparatedosageunit": drug.get("drugseparatedosageunit"),
+        "drugcumulativedosagenumb": safe_float(drug.get("drugcumulativedosagenumb")),
+        "drugcumulativedosageunit": safe_int(drug.get("drugcumulativedosageunit")),
+        "drugbatchnumb": drug.get("drugbatchnumb"),
+        "drugtreatmentduration": safe_float(drug.get("drugtreatmentduration")),
+        "drugtreatmentdurationunit": safe_int(drug.get("drugtreatmentdurationunit")),
+        "drugadditional": safe_int(drug.get("drugadditional"))
+    }
+
+
+def insert_drugs(writer, report, registry):
     patient = safe_get(report, "patient", {})
     rid = safe_int(report.get("safetyreportid"))
     for i, drug in enumerate(patient.get("drug", [])):
         # logging.debug(f"Checking drug [{i}] in report {rid}: {drug.get('medicinalproduct')}")
         if not isinstance(drug, dict): continue
-        drug_id = registry.get_or_create(conn, drug)
+        drug_id = registry.get_or_create(writer, drug)
         if drug_id is None:
             logging.warning(f"Skipping drug [{i}] in report {rid} — no drug_id assigned")
             continue
-        else:
-            # logging.debug(f"Assigned drug_id={{drug_id}} for drug [{i}] in report {rid}")
-            if drug_id is None:
-                continue  # Skip invalid drugs
-            base = {
-                "safetyreportid": rid,
-                "drug_instance_index": i,
-                "drug_id": drug_id,
-                "drugauthorizationnumb": drug.get("drugauthorizationnumb"),
-                "drugcharacterization": safe_int(drug.get("drugcharacterization")),
-                "drugstartdate": normalize_date(drug.get("drugstartdate"), drug.get("drugstartdateformat")),
-                "drugenddate": normalize_date(drug.get("drugenddate"), drug.get("drugenddateformat")),
-                "drugindication": drug.get("drugindication"),
-                "actiondrug": safe_int(drug.get("actiondrug")),
-                "drugadministrationroute": safe_int(drug.get("drugadministrationroute")),
-                "drugdosagetext": drug.get("drugdosagetext"),
-                "drugstructuredosagenumb": safe_float(drug.get("drugstructuredosagenumb")),
-                "drugstructuredosageunit": safe_int(drug.get("drugstructuredosageunit")),
-                "drugseparatedosagenumb": safe_float(drug.get("drugseparatedosagenumb")),
-                "drugintervaldosagedefinition": safe_int(drug.get("drugintervaldosagedefinition")),
-                "drugintervaldosageunitnumb": safe_float(drug.get("drugintervaldosageunitnumb")),
-                "drugseparatedosageunit": drug.get("drugseparatedosageunit"),
-                "drugcumulativedosagenumb": safe_float(drug.get("drugcumulativedosagenumb")),
-                "drugcumulativedosageunit": safe_int(drug.get("drugcumulativedosageunit")),
-                "drugbatchnumb": drug.get("drugbatchnumb"),
-                "drugtreatmentduration": safe_float(drug.get("drugtreatmentduration")),
-                "drugtreatmentdurationunit": safe_int(drug.get("drugtreatmentdurationunit")),
-                "drugadditional": safe_int(drug.get("drugadditional"))
-            }
-            insert_with_fields(conn, "patient_drug_history", list(base.keys()), base)
-
-
-
-def main(db_path, json_path, limit):
+        base = drug_history_row(rid, i, drug, drug_id)
+        insert_with_fields(writer, "patient_drug_history", list(base.keys()), base)
+
+
+# -------- Worker mode (--workers N) --------
+# Worker processes parse and transform reports into row tuples; the main process
+# owns the connection and the DrugRegistry, so drug_id assignment stays in file/report order.
+
+class RowCollector:
+    """Writer stand-in used inside worker processes: records rows instead of inserting them."""
+
+    def __init__(self):
+        self.rows = []
+
+    def add(self, table, fields, values):
+        fields = tuple(fields)
+        self.rows.append((table, fields, tuple(values[f] for f in fields)))
+
+
+def report_to_rows(report, with_hash=False):
+    """Runs the insert_* functions against a RowCollector. Returns (rid, state, rows, drugs, error);
+    state is (safetyreportversion, content hash) for report_ingest, with the hash left None unless
+    with_hash (only --incremental compares it), drugs are (index, catalog fields, openFDA
+    fingerprint, history row without drug_id) resolved by the writer."""
+    rid = safe_int(report.get("safetyreportid"))
+    if rid == 11090837:
+        return rid, None, None, None, None
+    state = (safe_int(report.get("safetyreportversion")), content_hash(report) if with_hash else None)
+    collector = RowCollector()
+    drugs = []
+    try:
+        insert_report_related(collector, report)
+        insert_patient_age(collector, report)
+        insert_patient_agegroup(collector, report)
+        insert_patient_weight(collector, report)
+        insert_summary(collector, report)
+        insert_reactions(collector, report)
+        insert_reportduplicates(collector, report)
+        patient = safe_get(report, "patient", {})
+        for i, drug in enumerate(patient.get("drug", [])):
+            if not isinstance(drug, dict): continue
+            catalog = {k: drug[k] for k in ("medicinalproduct", "activesubstance", "openfda") if k in drug}
+            drugs.append((i, catalog, drug_fingerprint(drug), drug_history_row(rid, i, drug, None)))
+    except Exception as e:
+        return rid, state, collector.rows, drugs, str(e)
+    return rid, state, collector.rows, drugs, None
+
+
+def write_report_rows(writer, registry, rid, rows, drugs):
+    for table, fields, row in rows:
+        writer.add_row(table, fields, row)
+    for i, catalog, fingerprint, base in drugs:
+        drug_id = registry.get_or_create(writer, catalog, fingerprint)
+        if drug_id is None:
+            logging.warning(f"Skipping drug [{i}] in report {rid} — no drug_id assigned")
+            continue
+        base["drug_id"] = drug_id
+        insert_with_fields(writer, "patient_drug_history", list(base.keys()), base)
+
+
+# -------- Bulk load (--bulk) --------
+# Fresh loads skip the drug_fda_* unique indexes while inserting (duplicates are filtered in
+# memory by the registry) and build them in one pass at the end; the same goes for summary_fts
+# and the agg_* aggregates.
+
+def prepare_bulk_load(conn, resume=False):
+    has_schema = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'report'").fetchone()
+    if not has_schema:
+        create_tables(conn, with_indexes=False)
+    elif not resume and conn.execute("SELECT 1 FROM report LIMIT 1").fetchone():
+        raise ValueError("--bulk expects a fresh database (use --resume to continue an interrupted bulk load)")
+    drop_indexes(conn)
+    drop_fts_triggers(conn)
+    drop_aggregate_triggers(conn)
+
+
+def finish_bulk_load(conn):
+    logging.info("Building indexes...")
+    deduplicate_indexed_tables(conn)
+    create_indexes(conn)
+    if has_fts_index(conn):
+        create_fts_index(conn)
+    if has_aggregate_tables(conn):
+        create_aggregate_tables(conn)
+    conn.execute("ANALYZE")
+    conn.commit()
+
+
+def main(db_path, json_path, limit, batch_size=5000, workers=1, checkpoint_path=None, resume=False, bulk=False,
+         query_indexes=False, registry_cache=DEFAULT_CACHE_SIZE, incremental=False, fts=False,
+         aggregates=False, metrics=NULL_METRICS, metrics_json=None):
+    if bulk and incremental:
+        raise ValueError("--bulk loads a fresh database; it cannot be combined with --incremental")
     conn = sqlite3.connect(db_path)
     conn.execute("PRAGMA synchronous = OFF")
     conn.execute("PRAGMA journal_mode = MEMORY")  
     print(f"Connected to DB at: {db_path}")
-    registry = DrugRegistry()
-    registry.hydrate_existing(conn)
+    if bulk:
+        prepare_bulk_load(conn, resume)
+    logging.info(f"ijson backend: {IJSON_BACKEND}")
+    writer = BatchWriter(conn, batch_size=batch_size, metrics=metrics)
+    registry = DrugRegistry(cache_size=registry_cache).load(conn)
+    ingest = IngestState(conn, writer, incremental=incremental)
+
+    # Checkpoints are written at every commit; --resume skips what the last run committed
+    checkpoint_path = checkpoint_path or f"{db_path}.checkpoint.json"
+    if resume:
+        checkpoint = Checkpoint.load(checkpoint_path, source=json_path)
+    else:
+        checkpoint = Checkpoint(checkpoint_path, source=json_path)
+    to_rows = partial(report_to_rows, with_hash=incremental)
+    if workers > 1:
+        logging.info(f"Parsing and transforming with {workers} worker processes")
+        # Parsing and transformation happen in the workers; "read" is the time spent waiting for them
+        positions = metrics.timed("read", iterate_reports_parallel(json_path, workers, transform=to_rows,
+                                                                   with_positions=True, resume=checkpoint))
+    else:
+        transform = metrics.timed_call("transform", to_rows)
+        positions = ((file_path, index, transform(report)) for file_path, index, report
+                     in metrics.timed("parse", iterate_report_positions(json_path, resume=checkpoint)))
     inserted = 0
-    for report in iterate_reports_ijson(json_path):
-        if safe_int(report.get("safetyreportid")) == 11090837:
-            print(f"skipped report {report.get('safetyreportid')}")
+    exhausted = True
+    for rid, state, rows, drugs, error in checkpoint.track(positions):
+        if rows is None:
+            print(f"skipped report {rid}")
             continue
         try:
-            insert_report_related(conn, report)
-            insert_patient_age(conn, report)
-            insert_patient_agegroup(conn, report)
-            insert_patient_weight(conn, report)
-            insert_summary(conn, report)
-            insert_reactions(conn, report)
-            insert_reportduplicates(conn, report)
-            insert_drugs(conn, report, registry)
-
+            with metrics.stage("write"):
+                if ingest.prepare(rid, *state) not in (NEW, CHANGED):
+                    continue  # --incremental: already loaded (same content or a newer version)
+                write_report_rows(writer, registry, rid, rows, drugs)
+                if error:
+                    raise ValueError(error)
+                ingest.record(rid, *state)
 
             inserted += 1
+            metrics.count()
             if limit and inserted >= limit:
-                    conn.commit()  # Final commit
+                    with metrics.stage("commit", latency=True):
+                        ingest.commit()  # Final commit
+                    exhausted = False
                     break
             if inserted % 500 == 0:
-                conn.commit()  # Batch commit for speed
-                if limit and inserted >= limit:
-                    break
+                with metrics.stage("commit", latency=True):
+                    ingest.commit()  # Flush buffered rows + batch commit for speed
+                checkpoint.save()
                 if inserted % 1000 == 0:
                     logging.info(f"Inserted {inserted} reports...")
         except Exception as e:
-            logging.error(f"Error on report {report.get('safetyreportid')}: {e}")
-    conn.commit()
+            logging.error(f"Error on report {rid}: {e}")
+    positions.close()  # stop worker processes if --limit ended the loop early
+    with metrics.stage("commit", latency=True):
+        ingest.commit()
+    if exhausted:
+        checkpoint.finish()
+    checkpoint.save()
+    with metrics.stage("finalize"):  # index builds after the load
+        if bulk:
+            finish_bulk_load(conn)
+        if fts and not has_fts_index(conn):
+            logging.info("Building the narrative full-text index...")
+            create_fts_index(conn)  # later loads keep it in sync through its triggers
+        if aggregates and not has_aggregate_tables(conn):
+            logging.info("Building the materialized aggregates...")
+            create_aggregate_tables(conn)  # maintained by triggers from now on
+        if query_indexes:
+            logging.info("Building query indexes...")
+            create_query_indexes(conn)
+            conn.execute("ANALYZE")
+            conn.commit()
+    ingest.commit()  # finalize may have changed rows (deduplication, aggregate rebuilds)
     conn.close()
-    logging.info(f"Finished. Inserted {inserted} reports.")
+    logging.info(f"Finished. Inserted {inserted} reports ({writer.rows_written} rows).")
+    logging.info(f"Drug registry: {registry.new_drugs} new drugs, {registry.new_variants} new openFDA variants.")
+    if incremental:
+        logging.info("Incremental: " + ", ".join(f"{n} {status}" for status, n in ingest.counts.items()))
+    metrics.finish(metrics_json)
 
 
 
@@ -380,8 +388,22 @@ if __name__ == "__main__":
     parser.add_argument("--db", default="sql/openfda_final_v10.db")
     parser.add_argument("--json_path", default="data/raw/source_data")
     parser.add_argument("--limit", type=int, default= None, help="Max number of reports to insert")
+    parser.add_argument("--batch_size", type=int, default=5000, help="Rows buffered per table before executemany")
+    parser.add_argument("--workers", type=int, default=1, help="Processes parsing/transforming JSON files in parallel")
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint file (default: <db>.checkpoint.json)")
+    parser.add_argument("--resume", action="store_true", help="Skip files/reports committed by the previous run")
+    parser.add_argument("--bulk", action="store_true", help="Fresh load: insert without indexes, build them + ANALYZE at the end")
+    parser.add_argument("--query_indexes", action="store_true", help="Build the query index profile after loading")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Skip reports already loaded with the same content or a newer version; replace changed ones")
+    parser.add_argument("--fts", action="store_true", help="Build the summary_fts narrative index after loading (if missing)")
+    parser.add_argument("--aggregates", action="store_true",
+                        help="Build the materialized Q4-Q7 aggregates after loading (if missing)")
+    parser.add_argument("--registry_cache", type=int, default=DEFAULT_CACHE_SIZE,
+                        help="Drug names / openFDA variants kept in memory by the drug registry")
+    add_metrics_arguments(parser)
     args = parser.parse_args()
     logging.basicConfig(level=logging.DEBUG, format="%(asctime)s [%(levelname)s] %(message)s")
-    main(args.db, args.json_path, args.limit)
-
-
+    main(args.db, args.json_path, args.limit, args.batch_size, args.workers, args.checkpoint, args.resume, args.bulk,
+         args.query_indexes, args.registry_cache, args.incremental, args.fts,
+         args.aggregates, metrics_from_args("sqlite", args), args.metrics_json)
@@ -0,0 +1,79 @@
+"""
+Ranked full-text search over the clinical narratives (summary.narrativeincludeclinical).
+
+Uses the summary_fts FTS5 index; create it with --fts on the schema script (synced during
+ingestion) or on the insertion script (built after the load), or with --build here.
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from src.db_sql.create_final_sql_schema_split_openfda_indexed import has_fts_index, create_fts_index
+
+TOKEN = re.compile(r"\w+")
+
+
+def match_expression(text, phrase=False):
+    """FTS5 MATCH expression for plain user input: all keywords (implicit AND) or one exact phrase.
+    Tokens are quoted, so characters like '-', ':' or '*' never reach the FTS5 query parser."""
+    tokens = TOKEN.findall(text)
+    if not tokens:
+        raise ValueError(f"No searchable words in {text!r}")
+    if phrase:
+        return '"' + " ".join(tokens) + '"'
+    return " ".join(f'"{token}"' for token in tokens)
+
+
+def search_narratives(conn, text, limit=50, phrase=False, raw=False, snippets=False):
+    """Returns [(safetyreportid, score)] best match first (score is FTS5 bm25; lower is better),
+    or [(safetyreportid, score, snippet)] with snippets=True. raw=True passes `text` to MATCH
+    unchanged, for FTS5 syntax such as OR, NEAR(...) or prefix* queries."""
+    expression = text if raw else match_expression(text, phrase)
+    # One row per report, at its best-scoring summary row (SQLite takes the bare f.id from the MIN() row),
+    # before the LIMIT, so reports with several summary rows take one slot
+    best = """
+        SELECT s.safetyreportid, MIN(f.score) AS score, f.id
+        FROM (
+            SELECT rowid AS id, rank AS score
+            FROM summary_fts
+            WHERE summary_fts MATCH ?
+        ) f
+        JOIN summary s ON s.id = f.id
+        GROUP BY s.safetyreportid
+        ORDER BY score, s.safetyreportid
+        LIMIT ?
+    """
+    if not snippets:
+        return [row[:2] for row in conn.execute(best, (expression, limit))]
+    # Snippets only for the rows returned
+    return conn.execute(f"""
+        SELECT b.safetyreportid, b.score, snippet(summary_fts, 0, '[', ']', '...', 12)
+        FROM ({best}) b
+        JOIN summary_fts ON summary_fts.rowid = b.id
+        WHERE summary_fts MATCH ?
+        ORDER BY b.score, b.safetyreportid
+    """, (expression, limit, expression)).fetchall()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", default="sql/openfda_final_v10.db")
+    parser.add_argument("--query", required=True, help="Keywords (all must match) or, with --phrase, an exact phrase")
+    parser.add_argument("--phrase", action="store_true", help="Match the words as one phrase")
+    parser.add_argument("--raw", action="store_true", help="Pass --query to FTS5 MATCH unchanged (OR, NEAR, prefix*)")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--build", action="store_true", help="Create and populate summary_fts if it is missing")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    if not has_fts_index(conn):
+        if not args.build:
+            sys.exit("summary_fts does not exist; rerun with --build (or load with --fts)")
+        create_fts_index(conn)
+    for rid, score, snippet in search_narratives(conn, args.query, args.limit, args.phrase, args.raw, snippets=True):
+        print(f"{rid}\t{score:.3f}\t{snippet}")
+    conn.close()
@@ -0,0 +1,100 @@
+# Benchmark queries from notebooks/final_performance_evaluation.ipynb (SQLite side)
+
+SQLITE_QUERIES = {
+    "Q1": "SELECT COUNT(*) FROM report",
+    "Q2": """
+        SELECT DISTINCT medicinalproduct
+        FROM drug_catalog
+        ORDER BY medicinalproduct
+    """,
+    "Q3": """
+        SELECT COUNT(DISTINCT safetyreportid)
+        FROM patient_drug_history
+        JOIN drug_catalog USING(drug_id)
+        WHERE medicinalproduct = 'ASPIRIN'
+    """,
+    "Q4": """
+        SELECT SUBSTR(receivedate, 1, 4) AS year, COUNT(*) AS count
+        FROM report
+        WHERE serious = 1
+        GROUP BY year
+        ORDER BY year
+    """,
+    "Q5": """
+        SELECT reactionmeddrapt, COUNT(*) AS count
+        FROM reaction
+        GROUP BY reactionmeddrapt
+        ORDER BY count DESC
+    """,
+    "Q6": """
+        SELECT ag.patientagegroup, AVG(w.patientweight) AS avg_weight
+        FROM patient_age_group ag
+        JOIN patient_weight w ON ag.safetyreportid = w.safetyreportid
+        GROUP BY ag.patientagegroup
+        ORDER BY ag.patientagegroup
+    """,
+    "Q7": """
+        SELECT dc.medicinalproduct, COUNT(*) AS suspect_count
+        FROM patient_drug_history pdh
+        JOIN drug_catalog dc ON pdh.drug_id = dc.drug_id
+        WHERE pdh.drugcharacterization = 1
+        GROUP BY dc.medicinalproduct
+        ORDER BY suspect_count DESC
+    """,
+    "Q8": """
+        SELECT SUBSTR(r.receivedate, 1, 4) AS year, AVG(rx.count) AS avg_reactions
+        FROM report r
+        JOIN (
+            SELECT safetyreportid, COUNT(*) AS count
+            FROM reaction
+            GROUP BY safetyreportid
+        ) rx ON r.safetyreportid = rx.safetyreportid
+        GROUP BY year
+        ORDER BY year
+    """,
+    "Q9": """
+        SELECT DISTINCT pr.literature_reference
+        FROM report r
+        JOIN patient_drug_history pdh ON r.safetyreportid = pdh.safetyreportid
+        JOIN drug_catalog dc ON pdh.drug_id = dc.drug_id
+        JOIN primarysource_literature_reference pr ON r.safetyreportid = pr.safetyreportid
+        WHERE dc.medicinalproduct = 'ASPIRIN' AND r.serious = 1
+    """,
+    "Q10": """
+        SELECT r.reactionmeddrapt, COUNT(*) AS count
+        FROM report rep
+        JOIN reaction r ON rep.safetyreportid = r.safetyreportid
+        WHERE rep.seriousnessdeath = 1
+        GROUP BY r.reactionmeddrapt
+        ORDER BY count DESC
+    """,
+    "Q11": """
+        SELECT COUNT(*)
+        FROM (
+            SELECT safetyreportid
+            FROM patient_drug_history
+            WHERE drugcharacterization = 1
+            GROUP BY safetyreportid
+            HAVING COUNT(*) > 1
+        )
+    """,
+    "Q12": """
+        SELECT DISTINCT dc.medicinalproduct
+        FROM patient_drug_history pdh
+        JOIN drug_catalog dc ON pdh.drug_id = dc.drug_id
+        WHERE dc.drug_id NOT IN (
+            SELECT drug_id
+            FROM patient_drug_history
+            WHERE drugcharacterization = 1
+        )
+    """,
+    "Q13": """
+        SELECT o.route, COUNT(DISTINCT r.safetyreportid) AS serious_count
+        FROM report r
+        JOIN patient_drug_history pdh ON r.safetyreportid = pdh.safetyreportid
+        JOIN drug_fda_route o ON pdh.drug_id = o.drug_id
+        WHERE r.serious = 1
+        GROUP BY o.route
+        ORDER BY serious_count DESC
+    """,
+}
@@ -0,0 +1,74 @@
+"""
+Parser backend benchmark: reports/sec and peak RSS per ijson backend
+(plus the whole-file orjson/json path) on a sample file.
+
+Each backend runs in a fresh (spawned) process so peak RSS is not shared between runs.
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import resource
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from src.parser.iterate_reports import IJSON_BACKENDS, IJSON_BACKEND, iterate_file, select_ijson_backend, fast_json
+
+WHOLE_FILE = "whole_file"
+
+
+def _run(file_path, backend_name, result_queue):
+    if backend_name == WHOLE_FILE:
+        reports = iterate_file(file_path, whole_file_budget_mb=float("inf"))
+    else:
+        _, backend = select_ijson_backend(backend_name)
+        reports = iterate_file(file_path, backend=backend)
+    start = time.perf_counter()
+    count = sum(1 for _ in reports)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is in KB on Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    result_queue.put({"backend": backend_name, "reports": count, "seconds": elapsed,
+                      "reports_per_sec": count / elapsed if elapsed else None, "peak_rss_mb": peak_mb})
+
+
+def available_backends():
+    names = []
+    for name in IJSON_BACKENDS:
+        try:
+            select_ijson_backend(name)
+            names.append(name)
+        except ImportError:
+            continue
+    return names + [WHOLE_FILE]
+
+
+def benchmark(file_path, backends=None):
+    ctx = mp.get_context("spawn")
+    results = []
+    for name in backends or available_backends():
+        result_queue = ctx.Queue()
+        proc = ctx.Process(target=_run, args=(file_path, name, result_queue))
+        proc.start()
+        results.append(result_queue.get())
+        proc.join()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file", required=True, help="Sample openFDA JSON file")
+    parser.add_argument("--backends", nargs="*", default=None, help=f"Subset of {list(IJSON_BACKENDS) + [WHOLE_FILE]}")
+    parser.add_argument("--output", default=None, help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    print(f"Active ijson backend: {IJSON_BACKEND}; whole-file parser: {fast_json.__name__}")
+    results = benchmark(args.file, args.backends)
+    for r in results:
+        print(f"{r['backend']:<12} {r['reports']:>8} reports  {r['reports_per_sec']:>10.1f} reports/sec  "
+              f"peak RSS {r['peak_rss_mb']:.1f} MB")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,83 @@
+import json
+import logging
+import os
+
+
+# Per-file ingestion checkpoints for --resume
+
+class Checkpoint:
+    """Records which source files are fully loaded and how many reports of the current
+    file were consumed when the loader last committed.
+
+    `track()` wraps an iterator of (file_path, index, item) positions and keeps the last
+    consumed position; `save()` is called at a commit boundary, so everything up to that
+    position is durable in the target database.
+    """
+
+    def __init__(self, path, source=None):
+        self.path = path
+        self.source = source
+        self.done_files = []
+        self.current_file = None
+        self.position = 0
+
+    @classmethod
+    def load(cls, path, source=None):
+        checkpoint = cls(path, source)
+        if not os.path.exists(path):
+            logging.info(f"No checkpoint at {path}; starting from the first file.")
+            return checkpoint
+        with open(path) as f:
+            state = json.load(f)
+        if source and state.get("source") and os.path.abspath(state["source"]) != os.path.abspath(source):
+            raise ValueError(f"Checkpoint {path} was written for {state['source']}, not {source}")
+        checkpoint.done_files = state.get("done_files", [])
+        checkpoint.current_file = state.get("current_file")
+        checkpoint.position = state.get("position", 0)
+        logging.info(f"Resuming after {len(checkpoint.done_files)} finished files"
+                     f" and {checkpoint.position} reports of {checkpoint.current_file}")
+        return checkpoint
+
+    def offset(self, file_path):
+        """Number of leading reports to skip in file_path, or None if the file is finished."""
+        if file_path in self.done_files:
+            return None
+        if file_path == self.current_file:
+            return self.position
+        return 0
+
+    def track(self, positions):
+        """Yields the items of (file_path, index, item) tuples, remembering each position."""
+        for file_path, index, item in positions:
+            if file_path != self.current_file:
+                if self.current_file is not None and self.current_file not in self.done_files:
+                    self.done_files.append(self.current_file)
+                self.current_file = file_path
+            self.position = index + 1
+            yield item
+
+    def finish(self):
+        """Marks the current file as done (call once the source is exhausted)."""
+        if self.current_file is not None and self.current_file not in self.done_files:
+            self.done_files.append(self.current_file)
+        self.current_file = None
+        self.position = 0
+
+    def state(self):
+        """Snapshot of the current position, for loaders that commit asynchronously."""
+        return {
+            "source": self.source,
+            "done_files": list(self.done_files),
+            "current_file": self.current_file,
+            "position": self.position,
+        }
+
+    def save(self, state=None):
+        """Writes the current position, or an earlier snapshot from state() once everything
+        up to it has been committed."""
+        state = state or self.state()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.path)  # atomic, so a crash never leaves half a checkpoint
@@ -0,0 +1,45 @@
+"""
+Change detection for incremental loads, shared by the SQLite and MongoDB pipelines.
+
+Each loaded report is remembered as (safetyreportversion, content hash). A re-delivered report
+is classified against that state so unchanged and stale copies can be skipped cheaply and only
+changed reports are rewritten.
+"""
+
+import hashlib
+
+from src.parser.iterate_reports import fast_json
+
+NEW, CHANGED, UNCHANGED, STALE = "new", "changed", "unchanged", "stale"
+
+
+def _dumps_sorted(obj):
+    if fast_json.__name__ == "orjson":
+        return fast_json.dumps(obj, option=fast_json.OPT_SORT_KEYS)
+    return fast_json.dumps(obj, sort_keys=True, default=str).encode()
+
+
+def content_hash(obj):
+    """16-byte blake2b digest of a JSON-like object, independent of dict key order."""
+    try:
+        payload = _dumps_sorted(obj)
+    except TypeError:
+        payload = repr(obj).encode()
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+def classify(stored, version, digest):
+    """Compares an incoming report with the stored (version, hash), or None if it was never loaded.
+    A higher safetyreportversion always replaces, a lower one is stale; otherwise the hashes decide.
+    Stored state without a hash (loaded before hashes were kept) counts as unchanged."""
+    if stored is None:
+        return NEW
+    stored_version, stored_hash = stored
+    if isinstance(version, int) and isinstance(stored_version, int):
+        if version < stored_version:
+            return STALE
+        if version > stored_version:
+            return CHANGED
+    if stored_hash is None:
+        return UNCHANGED
+    return UNCHANGED if stored_hash == digest else CHANGED
@@ -1,23 +1,127 @@
 import os
-import glob
+import io
+import gzip
+import zipfile
 import ijson
 
+try:
+    import orjson as fast_json
+except ImportError:
+    import json as fast_json
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# ijson backends in order of preference (C extension first, pure Python last)
+IJSON_BACKENDS = ("yajl2_c", "yajl2_cffi", "python")
+
+# Rough ratio between in-memory Python objects and JSON bytes for openFDA reports
+JSON_MEMORY_FACTOR = 8
+
+# Source partitions may be plain JSON or compressed; the format is detected from magic bytes
+REPORT_FILE_SUFFIXES = (".json", ".zip", ".gz", ".zst")
+MAGIC_BYTES = {
+    b"PK\x03\x04": "zip",
+    b"\x1f\x8b": "gzip",
+    b"\x28\xb5\x2f\xfd": "zstd",
+}
+READ_BUFFER_SIZE = 4 * 1024 * 1024
+IJSON_BUF_SIZE = 1024 * 1024
+
+
+def select_ijson_backend(preferred=None):
+    """Returns (name, backend module) for the fastest ijson backend that imports,
+    or for `preferred` if one is given."""
+    for name in ((preferred,) if preferred else IJSON_BACKENDS):
+        try:
+            return name, ijson.get_backend(name)
+        except ImportError:
+            continue
+    raise ImportError(f"No usable ijson backend (tried {preferred or IJSON_BACKENDS})")
+
+
+IJSON_BACKEND, _ijson_backend = select_ijson_backend()
+
+
+def list_report_files(path):
+    """Returns the sorted list of report files (.json, .json.zip, .json.gz, .json.zst)
+    behind `path` (a directory or a single file)."""
+    if os.path.isdir(path):
+        return sorted(os.path.join(path, name) for name in os.listdir(path)
+                      if name.endswith(REPORT_FILE_SUFFIXES) and os.path.isfile(os.path.join(path, name)))
+    return [path]
+
+
+def detect_compression(file_path):
+    """Returns 'zip', 'gzip', 'zstd' or None (plain JSON) based on the file's first bytes."""
+    with open(file_path, 'rb') as f:
+        head = f.read(4)
+    for magic, kind in MAGIC_BYTES.items():
+        if head.startswith(magic):
+            return kind
+    return None
+
+
+def iter_json_streams(file_path):
+    """Yields (binary stream, uncompressed size or None) for every JSON document in file_path.
+    Compressed files are decompressed on the fly; nothing is written to disk."""
+    kind = detect_compression(file_path)
+    if kind == "zip":
+        with zipfile.ZipFile(file_path) as archive:
+            for info in sorted(archive.infolist(), key=lambda i: i.filename):
+                if info.is_dir():
+                    continue
+                with archive.open(info) as member:
+                    yield io.BufferedReader(member, READ_BUFFER_SIZE), info.file_size
+    elif kind == "gzip":
+        with open(file_path, 'rb', buffering=READ_BUFFER_SIZE) as raw, gzip.GzipFile(fileobj=raw) as f:
+            yield f, None
+    elif kind == "zstd":
+        if zstandard is None:
+            raise ImportError(f"{file_path} is zstd-compressed; install the 'zstandard' package")
+        with open(file_path, 'rb', buffering=READ_BUFFER_SIZE) as raw:
+            with zstandard.ZstdDecompressor().stream_reader(raw, read_size=READ_BUFFER_SIZE) as f:
+                yield io.BufferedReader(f, READ_BUFFER_SIZE), None
+    else:
+        with open(file_path, 'rb', buffering=READ_BUFFER_SIZE) as f:
+            yield f, os.path.getsize(file_path)
+
+
+def iterate_file(file_path, backend=None, whole_file_budget_mb=None):
+    """Yields the reports of one (possibly compressed) file. Documents whose estimated
+    in-memory size fits under `whole_file_budget_mb` are loaded at once with orjson (or json);
+    everything else, including streams of unknown size, is streamed with the ijson backend."""
+    items = (backend or _ijson_backend).items
+    for stream, size in iter_json_streams(file_path):
+        if whole_file_budget_mb and size is not None and size * JSON_MEMORY_FACTOR <= whole_file_budget_mb * 1024 * 1024:
+            yield from fast_json.loads(stream.read()).get('results', [])
+            continue
+        for report in items(stream, 'results.item', buf_size=IJSON_BUF_SIZE):
+            yield report
+
 
 # generator for iterating over JSON reports
 
-def iterate_reports_ijson(path):
+def iterate_reports_ijson(path, whole_file_budget_mb=None):
     """Yields one report at a time from the 'results' array inside the full dataset,
-    iterating over all .json files if a directory is provided."""
-    
-    def yield_file(file_path):
-        with open(file_path, 'rb') as f:
-            parser = ijson.items(f, 'results.item')
-            for report in parser:
-                yield report
+    iterating over all report files (plain or compressed) if a directory is provided."""
 
     # If path is a directory, iterate over all JSON files inside
-    if os.path.isdir(path):
-        for file_path in sorted(glob.glob(os.path.join(path, '*.json'))):
-            yield from yield_file(file_path)
-    else:
-        yield from yield_file(path)
\ No newline at end of file
+    for file_path in list_report_files(path):
+        yield from iterate_file(file_path, whole_file_budget_mb=whole_file_budget_mb)
+
+
+def iterate_report_positions(path, resume=None, whole_file_budget_mb=None):
+    """Like iterate_reports_ijson, but yields (file_path, index, report) so loaders can checkpoint.
+    With `resume` (a Checkpoint), finished files are not opened at all and the leading reports
+    of the interrupted file are parsed but not yielded."""
+    for file_path in list_report_files(path):
+        offset = resume.offset(file_path) if resume else 0
+        if offset is None:
+            continue
+        for index, report in enumerate(iterate_file(file_path, whole_file_budget_mb=whole_file_budget_mb)):
+            if index >= offset:
+                yield file_path, index, report
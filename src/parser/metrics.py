@@ -0,0 +1,286 @@
+import cProfile
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import nullcontext
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# Stage timings and throughput counters for the loaders (--metrics)
+
+DEFAULT_LOG_INTERVAL = 30.0  # seconds between structured progress lines
+LATENCY_SAMPLES = 4096  # per latency series; percentiles are taken from this reservoir
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KB on Linux
+
+
+class Latency:
+    """Count, mean, max and reservoir-sampled percentiles of one kind of operation (e.g. commits)."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = []
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        if len(self.samples) < LATENCY_SAMPLES:
+            self.samples.append(seconds)
+        else:
+            slot = random.randrange(self.count)
+            if slot < LATENCY_SAMPLES:
+                self.samples[slot] = seconds
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        pick = lambda p: ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000 if ordered else None
+        return {"count": self.count, "mean_ms": self.total / self.count * 1000 if self.count else None,
+                "p50_ms": pick(0.50), "p95_ms": pick(0.95), "max_ms": self.max * 1000}
+
+
+class _Stage:
+    __slots__ = ("metrics", "name", "latency", "start")
+
+    def __init__(self, metrics, name, latency):
+        self.metrics = metrics
+        self.name = name
+        self.latency = latency
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        self.metrics.add_time(self.name, seconds)
+        if self.latency:
+            self.metrics.observe(self.name, seconds)
+        return False
+
+
+class LoadMetrics:
+    """Collects per-stage wall time, reports/sec, rows per table, operation latencies and peak RSS.
+
+    Stages may overlap (e.g. "flush" happens inside "write" and "commit"), so their shares of the
+    run need not add up to 100%. Every `log_interval` seconds count() logs one `metrics {...}`
+    JSON line; finish() logs and optionally writes the final summary.
+    """
+
+    enabled = True
+
+    def __init__(self, name, log_interval=DEFAULT_LOG_INTERVAL, cprofile_path=None, tracemalloc_top=0):
+        self.name = name
+        self.log_interval = log_interval
+        self.cprofile_path = cprofile_path
+        self.tracemalloc_top = tracemalloc_top
+        self.stages = defaultdict(float)
+        self.calls = Counter()
+        self.rows = Counter()
+        self.latencies = defaultdict(Latency)
+        self.reports = 0
+        self._lock = threading.Lock()  # stages, rows and latencies are also updated from writer threads
+        self._profiler = None
+        if cprofile_path:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        if tracemalloc_top:
+            import tracemalloc
+            tracemalloc.start()
+        self.start = self._last_log = time.perf_counter()
+        self._last_reports = 0
+        self._last_rows = 0
+
+    def stage(self, name, latency=False):
+        """Context manager adding the enclosed wall time to `name` (and, with latency=True,
+        recording it as one operation of the `name` latency series)."""
+        return _Stage(self, name, latency)
+
+    def add_time(self, name, seconds):
+        with self._lock:
+            self.stages[name] += seconds
+            self.calls[name] += 1
+
+    def timed(self, name, iterator):
+        """Wraps an iterator, charging the time spent producing each item to `name`.
+        Closing the wrapper closes the iterator (e.g. stops reader processes)."""
+        source = iter(iterator)
+        clock = time.perf_counter
+        try:
+            while True:
+                start = clock()
+                try:
+                    item = next(source)
+                except StopIteration:
+                    self.add_time(name, clock() - start)
+                    return
+                self.add_time(name, clock() - start)
+                yield item
+        finally:
+            if hasattr(source, "close"):
+                source.close()
+
+    def timed_call(self, name, func):
+        """Wraps a function, charging its run time to `name`."""
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add_time(name, time.perf_counter() - start)
+        return wrapper
+
+    def observe(self, name, seconds):
+        """Records one operation's latency (e.g. a batch commit or bulk_write)."""
+        with self._lock:
+            self.latencies[name].add(seconds)
+
+    def add_rows(self, table, n):
+        with self._lock:
+            self.rows[table] += n
+
+    def count(self, n=1):
+        """Counts finished reports; logs a progress line once per log_interval."""
+        self.reports += n
+        now = time.perf_counter()
+        if now - self._last_log >= self.log_interval:
+            self.log_progress(now)
+
+    def log_progress(self, now=None):
+        now = now or time.perf_counter()
+        interval = now - self._last_log
+        with self._lock:
+            rows = sum(self.rows.values())
+            stages = {k: round(v, 2) for k, v in self.stages.items()}
+            p95 = {f"{name}_p95_ms": latency.summary()["p95_ms"] for name, latency in self.latencies.items()}
+        line = {
+            "loader": self.name,
+            "elapsed_s": round(now - self.start, 1),
+            "reports": self.reports,
+            "reports_per_sec": round((self.reports - self._last_reports) / interval, 1) if interval else None,
+            "rows_per_sec": round((rows - self._last_rows) / interval, 1) if interval else None,
+            "stages_s": stages,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+        line.update(p95)
+        logging.info("metrics " + json.dumps(line))
+        self._last_log, self._last_reports, self._last_rows = now, self.reports, rows
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.start
+        rate = lambda n: n / elapsed if elapsed else None
+        summary = {
+            "loader": self.name,
+            "elapsed_s": elapsed,
+            "reports": self.reports,
+            "reports_per_sec": rate(self.reports),
+            "stages": {name: {"seconds": seconds, "share": seconds / elapsed if elapsed else None,
+                              "calls": self.calls[name]}
+                       for name, seconds in sorted(self.stages.items(), key=lambda kv: -kv[1])},
+            "rows": {table: {"rows": n, "rows_per_sec": rate(n)} for table, n in self.rows.most_common()},
+            "rows_total": sum(self.rows.values()),
+            "latency": {name: latency.summary() for name, latency in self.latencies.items()},
+            "peak_rss_mb": peak_rss_mb(),
+        }
+        if self.tracemalloc_top:
+            import tracemalloc
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            summary["tracemalloc"] = {
+                "current_mb": current / 1024 / 1024,
+                "peak_mb": peak / 1024 / 1024,
+                "top": [{"where": str(stat.traceback[0]), "size_mb": stat.size / 1024 / 1024, "blocks": stat.count}
+                        for stat in snapshot.statistics("lineno")[:self.tracemalloc_top]],
+            }
+        if self.cprofile_path:
+            summary["cprofile"] = self.cprofile_path
+        return summary
+
+    def finish(self, json_path=None):
+        """Stops the profilers, logs the summary and writes it to json_path; returns it."""
+        if self._profiler:
+            self._profiler.disable()
+            self._profiler.dump_stats(self.cprofile_path)
+            logging.info(f"cProfile stats written to {self.cprofile_path} (python -m pstats {self.cprofile_path})")
+        summary = self.summary()
+        if self.tracemalloc_top:
+            import tracemalloc
+            tracemalloc.stop()
+        logging.info("metrics summary " + json.dumps(summary, default=str))
+        if json_path:
+            with open(json_path, "w") as f:
+                json.dump(summary, f, indent=2)
+        return summary
+
+
+class NullMetrics:
+    """LoadMetrics stand-in when instrumentation is off: every hook is a no-op or returns its input."""
+
+    enabled = False
+    _null = nullcontext()
+
+    def stage(self, name, latency=False):
+        return self._null
+
+    def add_time(self, name, seconds):
+        pass
+
+    def timed(self, name, iterator):
+        return iterator
+
+    def timed_call(self, name, func):
+        return func
+
+    def observe(self, name, seconds):
+        pass
+
+    def add_rows(self, table, n):
+        pass
+
+    def count(self, n=1):
+        pass
+
+    def finish(self, json_path=None):
+        return None
+
+
+NULL_METRICS = NullMetrics()
+
+
+def create_metrics(name, enabled=False, log_interval=DEFAULT_LOG_INTERVAL, cprofile_path=None, tracemalloc_top=0):
+    """LoadMetrics if any instrumentation was asked for, NULL_METRICS otherwise."""
+    if not (enabled or cprofile_path or tracemalloc_top):
+        return NULL_METRICS
+    return LoadMetrics(name, log_interval, cprofile_path, tracemalloc_top)
+
+
+def add_metrics_arguments(parser):
+    """The loaders' shared instrumentation flags."""
+    parser.add_argument("--metrics", action="store_true",
+                        help="Log per-stage timings, rows/sec and latencies periodically and at the end")
+    parser.add_argument("--metrics_json", default=None, help="Also write the final metrics summary here (implies --metrics)")
+    parser.add_argument("--metrics_interval", type=float, default=DEFAULT_LOG_INTERVAL,
+                        help="Seconds between metrics log lines")
+    parser.add_argument("--cprofile", default=None, help="Profile the run with cProfile and dump the stats here")
+    parser.add_argument("--tracemalloc", type=int, default=0, metavar="N",
+                        help="Trace allocations and report the top N allocation sites in the summary")
+
+
+def metrics_from_args(name, args):
+    return create_metrics(name, args.metrics or bool(args.metrics_json), args.metrics_interval,
+                          args.cprofile, args.tracemalloc)
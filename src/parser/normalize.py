@@ -0,0 +1,136 @@
+"""
+Value normalization shared by the SQLite and MongoDB pipelines.
+
+Where the backends need different semantics there are two variants:
+- SQLite: failed numeric conversions become None, dates become 'YYYY-MM-DD' strings
+- MongoDB: failed numeric conversions keep the raw value, dates become datetime objects
+
+Date strings repeat constantly (millions of drug rows share a few thousand dates),
+so the date parsers are memoized.
+"""
+
+import re
+from datetime import datetime
+from functools import lru_cache
+
+DATE_CACHE_SIZE = 1 << 16
+
+# SQLite accepts 'CASE EVENT DATE 20120101' as well; MongoDB requires the colon
+CASE_EVENT_DATE_SQL = re.compile(r'CASE EVENT DATE[:\s]*?(\d{8})')
+CASE_EVENT_DATE_MONGO = re.compile(r"CASE EVENT DATE:\s*(\d{8})")
+
+
+# -------- Numbers --------
+
+def safe_int(val):
+    """int(val), or None if it cannot be converted."""
+    if type(val) is int:
+        return val
+    if type(val) is str and val.isdecimal():
+        return int(val)
+    try: return int(val)
+    except: return None
+
+def safe_float(val):
+    """float(val), or None if it cannot be converted."""
+    if type(val) is float:
+        return val
+    try: return float(val)
+    except: return None
+
+def safe_int_or_raw(val):
+    """int(val), or val unchanged if it cannot be converted."""
+    if type(val) is int:
+        return val
+    if type(val) is str and val.isdecimal():
+        return int(val)
+    try: return int(val)
+    except: return val
+
+def safe_float_or_raw(val):
+    """float(val), or val unchanged if it cannot be converted."""
+    if type(val) is float:
+        return val
+    try: return float(val)
+    except: return val
+
+
+# -------- Dates --------
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_yyyymmdd(date_str):
+    """datetime for an 8-digit YYYYMMDD string, or None if it is not a valid date."""
+    try:
+        if date_str.isascii():
+            return datetime(int(date_str[:4]), int(date_str[4:6]), int(date_str[6:8]))
+        return datetime.strptime(date_str, "%Y%m%d")
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _normalize_date_str(date_str, fmt_code):
+    if fmt_code == "102" and len(date_str) == 8:
+        return f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:]}"
+    elif fmt_code == "610" and len(date_str) == 6:
+        return f"{date_str[:4]}-{date_str[4:6]}-01"
+    elif fmt_code == "602" and len(date_str) == 4:
+        return f"{date_str}-01-01"
+    return None
+
+def normalize_date(date_str, fmt_code):
+    """SQLite: 'YYYY-MM-DD' text for an openFDA date and its format code (102/610/602), else None."""
+    if not date_str or not fmt_code:
+        return None
+    if type(date_str) is str and type(fmt_code) is str:
+        return _normalize_date_str(date_str, fmt_code)
+    try:
+        if fmt_code == "102" and len(date_str) == 8:
+            return f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:]}"
+        elif fmt_code == "610" and len(date_str) == 6:
+            return f"{date_str[:4]}-{date_str[4:6]}-01"
+        elif fmt_code == "602" and len(date_str) == 4:
+            return f"{date_str}-01-01"
+    except:
+        return None
+    return None
+
+def normalize_date_iso(date_str):
+    """MongoDB: datetime for an 8, 6 or 4 digit openFDA date (missing parts default to 01), else None."""
+    if not isinstance(date_str, str) or not date_str.isdigit():
+        return None
+    if len(date_str) == 8:
+        return parse_yyyymmdd(date_str)
+    elif len(date_str) == 6:
+        return parse_yyyymmdd(date_str + "01")
+    elif len(date_str) == 4:
+        return parse_yyyymmdd(date_str + "0101")
+    return None
+
+
+# -------- Names --------
+
+def normalize_name_key(name):
+    """Lookup key for a drug name: case-folded, surrounding whitespace stripped and inner runs collapsed."""
+    return " ".join(str(name).split()).casefold()
+
+
+# -------- Narrative --------
+
+def extract_case_event_date(text):
+    """SQLite: 'YYYY-MM-DD' of the CASE EVENT DATE in a narrative, or None."""
+    match = CASE_EVENT_DATE_SQL.search(str(text))
+    if match:
+        raw_date = match.group(1)
+        if parse_yyyymmdd(raw_date) is None:
+            return None
+        return f"{raw_date[:4]}-{raw_date[4:6]}-{raw_date[6:]}"
+    return None
+
+def extract_case_event_datetime(text):
+    """MongoDB: datetime of the CASE EVENT DATE in a narrative, or None."""
+    if isinstance(text, str):
+        match = CASE_EVENT_DATE_MONGO.search(text)
+        if match:
+            return normalize_date_iso(match.group(1))
+    return None
@@ -0,0 +1,167 @@
+import multiprocessing as mp
+import queue as queue_module
+from collections import deque
+
+from src.parser.iterate_reports import iterate_file, list_report_files
+
+
+# Parallel parse (+ optional transform) stage: JSON files are sharded across worker processes
+
+class WorkerError:
+    """Sent through the queue when a worker fails, so the consumer can re-raise it."""
+
+    def __init__(self, file_path, message):
+        self.file_path = file_path
+        self.message = message
+
+
+def _read_file(file_path, out_queue, transform, chunk_size, stop, offset=0, with_positions=False):
+    """Parses one file and puts its reports on out_queue in chunks. Returns False if stopped."""
+    chunk = []
+    for index, report in enumerate(iterate_file(file_path)):
+        if index < offset:
+            continue
+        item = transform(report) if transform else report
+        chunk.append((file_path, index, item) if with_positions else item)
+        if len(chunk) >= chunk_size:
+            if stop.is_set():
+                return False
+            out_queue.put(chunk)  # blocks while the queue is full (backpressure)
+            chunk = []
+    if chunk and not stop.is_set():
+        out_queue.put(chunk)
+    return not stop.is_set()
+
+
+def _ordered_worker(file_path, out_queue, transform, chunk_size, stop, offset, with_positions):
+    try:
+        if _read_file(file_path, out_queue, transform, chunk_size, stop, offset, with_positions):
+            out_queue.put(None)  # end-of-file sentinel
+    except Exception as e:
+        out_queue.put(WorkerError(file_path, repr(e)))
+
+
+def _unordered_worker(task_queue, out_queue, transform, chunk_size, stop, with_positions):
+    while not stop.is_set():
+        task = task_queue.get()
+        if task is None:
+            break
+        file_path, offset = task
+        try:
+            if not _read_file(file_path, out_queue, transform, chunk_size, stop, offset, with_positions):
+                return
+        except Exception as e:
+            out_queue.put(WorkerError(file_path, repr(e)))
+            return
+    out_queue.put(None)  # this worker has no files left
+
+
+def _shutdown(procs, queues, stop, timeout=5):
+    """Stops workers after an early exit (e.g. --limit): signal, unblock their puts, join."""
+    stop.set()
+    for proc in procs:
+        while proc.is_alive():
+            for q in queues:
+                try:
+                    while True:
+                        q.get_nowait()
+                except (queue_module.Empty, OSError, ValueError):
+                    pass
+            proc.join(timeout=0.05)
+            timeout -= 0.05
+            if timeout <= 0:
+                proc.terminate()
+                proc.join()
+                break
+
+
+def _iterate_ordered(files, ctx, workers, transform, chunk_size, queue_size, stop, with_positions):
+    # One bounded queue per file; at most `workers` files are parsed ahead of the consumer
+    running = deque()
+    next_file = 0
+    try:
+        while running or next_file < len(files):
+            while len(running) < workers and next_file < len(files):
+                q = ctx.Queue(queue_size)
+                file_path, offset = files[next_file]
+                proc = ctx.Process(target=_ordered_worker, daemon=True,
+                                   args=(file_path, q, transform, chunk_size, stop, offset, with_positions))
+                proc.start()
+                running.append((proc, q))
+                next_file += 1
+            proc, q = running[0]
+            while True:
+                item = q.get()
+                if item is None:
+                    break
+                if isinstance(item, WorkerError):
+                    raise RuntimeError(f"Failed to parse {item.file_path}: {item.message}")
+                yield from item
+            proc.join()
+            running.popleft()
+    finally:
+        if running:
+            _shutdown([p for p, _ in running], [q for _, q in running], stop)
+
+
+def _iterate_unordered(files, ctx, workers, transform, chunk_size, queue_size, stop, with_positions):
+    # Long-lived workers pull file paths from a task queue and share one bounded output queue
+    task_queue = ctx.Queue()
+    for task in files:
+        task_queue.put(task)
+    workers = min(workers, len(files))
+    for _ in range(workers):
+        task_queue.put(None)
+    out_queue = ctx.Queue(queue_size)
+    procs = [ctx.Process(target=_unordered_worker, daemon=True,
+                         args=(task_queue, out_queue, transform, chunk_size, stop, with_positions))
+             for _ in range(workers)]
+    for proc in procs:
+        proc.start()
+    finished = 0
+    try:
+        while finished < workers:
+            item = out_queue.get()
+            if item is None:
+                finished += 1
+                continue
+            if isinstance(item, WorkerError):
+                raise RuntimeError(f"Failed to parse {item.file_path}: {item.message}")
+            yield from item
+        for proc in procs:
+            proc.join()
+    finally:
+        if any(proc.is_alive() for proc in procs):
+            _shutdown(procs, [out_queue, task_queue], stop)
+
+
+def iterate_reports_parallel(path, workers, transform=None, ordered=True, chunk_size=256, queue_size=8,
+                             with_positions=False, resume=None):
+    """Yields reports (or transform(report) results) from all JSON files behind `path`,
+    parsing up to `workers` files at once in separate processes.
+
+    - ordered=True yields in exactly the order of iterate_reports_ijson (file by file);
+      ordered=False yields chunks as soon as any worker produces them.
+    - `transform` runs inside the worker and must be a picklable top-level function.
+    - Queues hold at most `queue_size` chunks of `chunk_size` reports, so workers that run
+      ahead of the consumer block instead of buffering whole files (backpressure).
+    - Closing the generator early (break, --limit) stops and joins all workers.
+    - with_positions=True yields (file_path, index, item) like iterate_report_positions,
+      and `resume` (a Checkpoint) skips finished files and already loaded reports.
+
+    Sharding is per file: an openFDA partition is a single JSON document, so it cannot be
+    split into byte ranges without parsing it from the start.
+    """
+    files = []
+    for file_path in list_report_files(path):
+        offset = resume.offset(file_path) if resume else 0
+        if offset is not None:
+            files.append((file_path, offset))
+    if not files:
+        return
+    ctx = mp.get_context()
+    stop = ctx.Event()
+    if ordered:
+        yield from _iterate_ordered(files, ctx, workers, transform, chunk_size, queue_size, stop, with_positions)
+    else:
+        yield from _iterate_unordered(files, ctx, workers, transform, chunk_size, queue_size, stop, with_positions)